@@ -0,0 +1,378 @@
+# adherence.py - Daily adherence log (which routine items were done)
+# One bit per routine item per day, kept in memory-mapped month files:
+#   adherence/users.txt       one user ID per line (line number = user slot)
+#   adherence/YYYY-MM.bin     per slot 31 days x (planned, done) 64-bit masks
+#   adherence/summary.bin     per slot (last streak day, streak length)
+# Every query reads a fixed number of records for one user, so it costs
+# the same with a hundred users or millions
+
+import mmap
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+ROUTINE_SECTIONS = ('morning', 'workout', 'meals', 'evening')
+
+# 16 bits per section -> one 64-bit mask per day; items past 16 aren't tracked
+ITEMS_PER_SECTION = 16
+
+MONTH_DAYS = 31
+MONTH_RECORD_WORDS = MONTH_DAYS * 2     # planned + done mask per day
+SUMMARY_RECORD_WORDS = 2                # last streak day (ordinal), streak length
+
+# Files grow by this many user slots at a time
+GROW_SLOTS = 4096
+
+# A day counts toward the streak when at least this share of its items was done
+STREAK_MIN_SHARE = 0.5
+
+# How far back a streak is recounted after editing an older day
+STREAK_LOOKBACK_DAYS = 366
+
+USERS_FILE = "users.txt"
+SUMMARY_FILE = "summary.bin"
+
+def open_adherence_log(path="adherence"):
+    """
+    Open (or create) an adherence log folder
+    Returns a log dictionary used by the other functions
+    """
+
+    os.makedirs(path, exist_ok=True)
+
+    users = {}
+    users_path = os.path.join(path, USERS_FILE)
+    if os.path.exists(users_path):
+        with open(users_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                users[line.rstrip("\n")] = len(users)
+
+    return {
+        'path': path,
+        'users': users,                     # user ID -> slot
+        'users_file': open(users_path, 'a', encoding='utf-8'),
+        'months': {},                       # (year, month) -> mapped file
+        'summary': _open_mapped(os.path.join(path, SUMMARY_FILE), 'I', SUMMARY_RECORD_WORDS, create=True)
+    }
+
+def close_adherence_log(log):
+    """Flush and close every mapped file"""
+
+    log['users_file'].close()
+    for mapped in list(log['months'].values()) + [log['summary']]:
+        if mapped is not None:
+            _close_mapped(mapped)
+    log['months'] = {}
+
+def _open_mapped(path, word_format, record_words, create=False):
+    """
+    Map a file of fixed-size per-slot records as an array of words
+    Returns None for a missing file unless create is set
+    """
+
+    if not os.path.exists(path):
+        if not create:
+            return None
+        open(path, 'wb').close()
+
+    mapped = {'path': path, 'format': word_format, 'record_words': record_words,
+              'file': open(path, 'r+b'), 'map': None, 'words': None, 'slots': 0}
+    _remap(mapped)
+    return mapped
+
+def _remap(mapped):
+    """(Re)create the mapping after the file size changed"""
+
+    if mapped['words'] is not None:
+        mapped['words'].release()
+        mapped['map'].close()
+        mapped['words'] = mapped['map'] = None
+
+    size = os.fstat(mapped['file'].fileno()).st_size
+    record_bytes = mapped['record_words'] * (8 if mapped['format'] == 'Q' else 4)
+    mapped['slots'] = size // record_bytes
+    if size:
+        mapped['map'] = mmap.mmap(mapped['file'].fileno(), size)
+        mapped['words'] = memoryview(mapped['map']).cast(mapped['format'])
+
+def _grow(mapped, slot):
+    """Make room for slot (new space reads as zeros)"""
+
+    slots = (slot // GROW_SLOTS + 1) * GROW_SLOTS
+    record_bytes = mapped['record_words'] * (8 if mapped['format'] == 'Q' else 4)
+    mapped['file'].truncate(slots * record_bytes)
+    _remap(mapped)
+
+def _close_mapped(mapped):
+    """Flush and unmap"""
+
+    if mapped['words'] is not None:
+        mapped['words'].release()
+        mapped['map'].flush()
+        mapped['map'].close()
+    mapped['file'].close()
+
+def _month_file(log, year, month, create=False):
+    """Mapped month file, or None if nothing was recorded that month"""
+
+    key = (year, month)
+    mapped = log['months'].get(key)
+    # Missing months are remembered as None so queries don't keep checking
+    if mapped is None and (create or key not in log['months']):
+        path = os.path.join(log['path'], f"{year:04d}-{month:02d}.bin")
+        mapped = log['months'][key] = _open_mapped(path, 'Q', MONTH_RECORD_WORDS, create)
+    return mapped
+
+def user_slot(log, user_id, create=False):
+    """Slot number of a user (None for an unknown user unless create is set)"""
+
+    slot = log['users'].get(user_id)
+    if slot is None and create:
+        if "\n" in user_id:
+            raise ValueError("User ID can't contain a line break")
+        slot = log['users'][user_id] = len(log['users'])
+        log['users_file'].write(user_id + "\n")
+        log['users_file'].flush()
+    return slot
+
+def item_bit(section, position):
+    """Bit number of a routine item (None if it isn't tracked)"""
+
+    if section not in ROUTINE_SECTIONS or not 0 <= position < ITEMS_PER_SECTION:
+        return None
+    return ROUTINE_SECTIONS.index(section) * ITEMS_PER_SECTION + position
+
+def bit_item(bit):
+    """(section, position) for a bit number"""
+    return ROUTINE_SECTIONS[bit // ITEMS_PER_SECTION], bit % ITEMS_PER_SECTION
+
+def routine_mask(routine):
+    """Mask with a bit for every tracked item of a routine"""
+
+    mask = 0
+    for section_number, section in enumerate(ROUTINE_SECTIONS):
+        count = min(len(routine.get(section, [])), ITEMS_PER_SECTION)
+        mask |= ((1 << count) - 1) << (section_number * ITEMS_PER_SECTION)
+    return mask
+
+def _day_masks(log, slot, day):
+    """(planned, done) masks of one user on one day - zeros if not recorded"""
+
+    mapped = _month_file(log, day.year, day.month)
+    if mapped is None or slot >= mapped['slots']:
+        return 0, 0
+    index = slot * MONTH_RECORD_WORDS + (day.day - 1) * 2
+    words = mapped['words']
+    return words[index], words[index + 1]
+
+def _day_counts(planned, done):
+    """Does a day count toward the streak"""
+
+    planned_count = planned.bit_count()
+    return planned_count > 0 and (done & planned).bit_count() >= planned_count * STREAK_MIN_SHARE
+
+def set_day(log, user_id, day, planned, done):
+    """
+    Store the planned and done item masks of one user on one day
+    Replaces whatever was recorded for that day before
+    """
+
+    slot = user_slot(log, user_id, create=True)
+    mapped = _month_file(log, day.year, day.month, create=True)
+    if slot >= mapped['slots']:
+        _grow(mapped, slot)
+
+    index = slot * MONTH_RECORD_WORDS + (day.day - 1) * 2
+    mapped['words'][index] = planned
+    mapped['words'][index + 1] = done & planned
+
+    _update_streak(log, slot, day, _day_counts(planned, done))
+
+def record_day(log, user_id, day, routine, completed):
+    """
+    Record a day of a routine: completed lists (section, position) pairs of
+    the items that were done (positions count from 0 within each section)
+    """
+
+    done = 0
+    for section, position in completed:
+        bit = item_bit(section, position)
+        if bit is not None:
+            done |= 1 << bit
+    set_day(log, user_id, day, routine_mask(routine), done)
+
+def _update_streak(log, slot, day, counts):
+    """
+    Keep (last streak day, streak length) current after one day changed
+    Recording today or the next day is constant time; editing an older day
+    recounts backwards from the last streak day
+    """
+
+    summary = log['summary']
+    if slot >= summary['slots']:
+        _grow(summary, slot)
+
+    words = summary['words']
+    index = slot * SUMMARY_RECORD_WORDS
+    last, streak = words[index], words[index + 1]
+    ordinal = day.toordinal()
+
+    if counts and ordinal > last:
+        streak = streak + 1 if ordinal == last + 1 and streak else 1
+        last = ordinal
+    elif last - streak <= ordinal <= last:
+        last, streak = _recount_streak(log, slot, date.fromordinal(last))
+    else:
+        return  # Days after or well before the streak don't change it
+
+    words[index], words[index + 1] = last, streak
+
+def _recount_streak(log, slot, newest):
+    """Latest counting day at or before newest and its streak, read from the log"""
+
+    day = newest
+    oldest = newest - timedelta(days=STREAK_LOOKBACK_DAYS)
+    while day > oldest and not _day_counts(*_day_masks(log, slot, day)):
+        day -= timedelta(days=1)
+    if day <= oldest:
+        return 0, 0
+
+    last = day
+    streak = 0
+    while _day_counts(*_day_masks(log, slot, day)):
+        streak += 1
+        day -= timedelta(days=1)
+    return last.toordinal(), streak
+
+def current_streak(log, user_id, today):
+    """
+    Days in a row the user kept to the routine, ending today or yesterday
+    (today may still be in progress)
+    """
+
+    slot = user_slot(log, user_id)
+    summary = log['summary']
+    if slot is None or slot >= summary['slots']:
+        return 0
+    last, streak = summary['words'][slot * SUMMARY_RECORD_WORDS:(slot + 1) * SUMMARY_RECORD_WORDS]
+    return streak if today.toordinal() - last <= 1 else 0
+
+def _window_records(log, slot, today, days):
+    """
+    Yield the user's records for the last days (ending today), one slice
+    of interleaved planned/done words per month (None for unrecorded months)
+    """
+
+    day = today - timedelta(days=days - 1)
+    while day <= today:
+        month_end = min(today, date(day.year + day.month // 12, day.month % 12 + 1, 1) - timedelta(days=1))
+        count = (month_end - day).days + 1
+        mapped = _month_file(log, day.year, day.month)
+        if mapped is None or slot >= mapped['slots']:
+            yield None
+        else:
+            start = slot * MONTH_RECORD_WORDS + (day.day - 1) * 2
+            yield mapped['words'][start:start + count * 2]
+        day = month_end + timedelta(days=1)
+
+# '0'/'1' characters -> byte values 0/1 (see most_skipped)
+_BIT_BYTES = bytes.maketrans(b"01", b"\x00\x01")
+
+def completion_rate(log, user_id, today, days=30):
+    """Share of planned items done over the last days (0.0 with nothing planned)"""
+
+    slot = user_slot(log, user_id)
+    if slot is None:
+        return 0.0
+
+    # Whole months at a time: every other word is a planned mask
+    planned_total = done_total = 0
+    for words in _window_records(log, slot, today, days):
+        if words is not None:
+            planned_total += int.from_bytes(words[0::2].tobytes(), 'little').bit_count()
+            done_total += int.from_bytes(words[1::2].tobytes(), 'little').bit_count()
+    return done_total / planned_total if planned_total else 0.0
+
+def most_skipped(log, user_id, today, days=30, top=3):
+    """
+    Items skipped most often over the last days (at most 255)
+    Returns [((section, position), times skipped), ...]
+    """
+
+    slot = user_slot(log, user_id)
+    if slot is None:
+        return []
+
+    # Every missed mask becomes a number with one byte per bit; adding them
+    # counts all 64 items at once (a window is far below 256 days)
+    total = 0
+    for words in _window_records(log, slot, today, days):
+        if words is None:
+            continue
+        words = words.tolist()
+        for planned, done in zip(words[0::2], words[1::2]):
+            missed = planned & ~done
+            if missed:
+                total += int.from_bytes(format(missed, '064b').encode().translate(_BIT_BYTES), 'little')
+
+    # Byte i of the total is the count for bit 63 - i
+    counts = total.to_bytes(64, 'little')
+    ranked = sorted((-count, 63 - index) for index, count in enumerate(counts) if count)[:top]
+    return [(bit_item(bit), -negative) for negative, bit in ranked]
+
+def log_size(log):
+    """Bytes on disk for the whole log"""
+
+    return sum(entry.stat().st_size for entry in os.scandir(log['path']) if entry.is_file())
+
+def benchmark_adherence(users=100000, days=45, queries=100000, path="adherence_bench", seed=42):
+    """
+    Record days for many users, then time the per-user queries
+    Returns write rate, microseconds per query and bytes per user-day
+    """
+
+    import random
+    import shutil
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+
+    rng = random.Random(seed)
+    routine = {'morning': [''] * 8, 'workout': [''] * 12, 'meals': [''] * 7, 'evening': [''] * 10}
+    planned = routine_mask(routine)
+    today = date(2025, 3, 15)
+    user_ids = [f"user-{number:08d}" for number in range(users)]
+
+    results = {}
+    log = open_adherence_log(path)
+    try:
+        start = time.perf_counter()
+        for offset in range(days - 1, -1, -1):
+            day = today - timedelta(days=offset)
+            for user_id in user_ids:
+                set_day(log, user_id, day, planned, planned & rng.getrandbits(64))
+        results['days_per_sec'] = users * days / (time.perf_counter() - start)
+
+        sample = [user_ids[rng.randrange(users)] for _ in range(queries)]
+        for name, query in (('streak_us', current_streak), ('rate_30d_us', completion_rate),
+                            ('most_skipped_us', most_skipped)):
+            start = time.perf_counter()
+            for user_id in sample:
+                query(log, user_id, today)
+            results[name] = (time.perf_counter() - start) / queries * 1e6
+
+        results['bytes_per_user_day'] = log_size(log) / (users * days)
+    finally:
+        close_adherence_log(log)
+        shutil.rmtree(path)
+
+    return results
+
+if __name__ == "__main__":
+    # Usage: python adherence.py [users] [days]
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 45
+    print(f"📅 Adherence log with {users:,} users over {days} days...")
+    for name, value in benchmark_adherence(users, days).items():
+        print(f"   {name}: {value:,.2f}")
@@ -0,0 +1,331 @@
+# analytics.py - Columnar analytics over routine summaries
+# Keeps the get_routine_summary fields in compact array columns so
+# dashboards can aggregate millions of routines without summary dicts
+
+import array
+import bisect
+import operator
+import os
+import sys
+import time
+from collections import Counter
+from itertools import compress, repeat
+
+from user_input import GOAL_OPTIONS, EQUIPMENT_OPTIONS, FITNESS_LEVEL_OPTIONS
+
+# Categorical values are stored as small integer codes
+GOALS = [option['name'] for option in GOAL_OPTIONS.values()]
+LEVELS = [option['name'] for option in FITNESS_LEVEL_OPTIONS.values()]
+EQUIPMENT = list(EQUIPMENT_OPTIONS.values())
+
+GOAL_CODES = {goal: code for code, goal in enumerate(GOALS)}
+LEVEL_CODES = {level: code for code, level in enumerate(LEVELS)}
+EQUIPMENT_BITS = {item: 1 << position for position, item in enumerate(EQUIPMENT)}
+
+# Column name -> array typecode
+COLUMNS = {
+    'goal': 'B',              # index into GOALS
+    'level': 'B',             # index into LEVELS
+    'equipment_mask': 'H',    # one bit per EQUIPMENT item
+    'estimated_time': 'H',    # minutes
+    'total_activities': 'H'   # same count as get_routine_summary
+}
+
+DEFAULT_TIME_BINS = [10, 15, 20, 30, 45, 60, 90, 120, 180]
+
+# Where main.py keeps the running summary table of saved routines
+DEFAULT_TABLE_PATH = os.path.join("saved_routines", "summary_table")
+
+# Saved tables: one <column>.bin per column plus the committed row count.
+# Bytes past the count (an append cut short) are ignored and overwritten
+ROW_COUNT_FILE = "rows.txt"
+LOCK_FILE = ".lock"
+
+def new_summary_table():
+    """
+    Create an empty columnar summary table (a dict of typed arrays)
+    """
+    return {name: array.array(typecode) for name, typecode in COLUMNS.items()}
+
+def table_size(table):
+    """Number of routines stored in the table"""
+    return len(table['goal'])
+
+def append_summary(table, routine, user_data):
+    """
+    Append one routine to the table
+    Stores the same facts as get_routine_summary without building its dict
+    """
+
+    mask = 0
+    for item in user_data.get('equipment', []):
+        mask |= EQUIPMENT_BITS.get(item, 0)
+
+    table['goal'].append(GOAL_CODES.get(user_data['goal'], GOAL_CODES['general_fitness']))
+    table['level'].append(LEVEL_CODES.get(user_data['fitness_level'], 0))
+    table['equipment_mask'].append(mask)
+    table['estimated_time'].append(user_data['time'])
+    table['total_activities'].append(
+        len(routine.get('morning', [])) +
+        len(routine.get('workout', [])) +
+        len(routine.get('meals', [])) +
+        len(routine.get('evening', []))
+    )
+
+def append_summaries(table, entries):
+    """
+    Append many (routine, user_data) pairs - e.g. as routines get saved
+    Returns number of rows added
+    """
+
+    count = 0
+    for routine, user_data in entries:
+        append_summary(table, routine, user_data)
+        count += 1
+    return count
+
+def _count_codes(column, labels):
+    """Count how often each code appears in a 'B' column (runs in C via bytes.count)"""
+
+    data = column.tobytes()
+    return {label: data.count(bytes([code])) for code, label in enumerate(labels)}
+
+def _goal_selector(table, goal):
+    """Return a True/False iterator for rows with the given goal"""
+    return map(operator.eq, table['goal'], repeat(GOAL_CODES[goal]))
+
+def goal_counts(table):
+    """Number of routines per goal"""
+    return _count_codes(table['goal'], GOALS)
+
+def difficulty_distribution(table):
+    """Share of routines per fitness level (0.0 - 1.0)"""
+
+    total = table_size(table)
+    counts = _count_codes(table['level'], LEVELS)
+    return {level.title(): (count / total if total else 0.0) for level, count in counts.items()}
+
+def activities_per_goal(table):
+    """
+    Total and average activity count per goal
+    Returns {goal: {'routines': n, 'activities': sum, 'average': avg}}
+    """
+
+    # Count each distinct (goal, activities) pair once in C, then fold
+    pair_counts = Counter(zip(table['goal'], table['total_activities']))
+    result = {goal: {'routines': 0, 'activities': 0, 'average': 0.0} for goal in GOALS}
+
+    for (code, activities), count in pair_counts.items():
+        entry = result[GOALS[code]]
+        entry['routines'] += count
+        entry['activities'] += activities * count
+
+    for entry in result.values():
+        if entry['routines']:
+            entry['average'] = entry['activities'] / entry['routines']
+
+    return result
+
+def equipment_share(table, goal=None):
+    """
+    Share of routines that use each equipment item (0.0 - 1.0)
+    Optionally restricted to one goal
+    """
+
+    masks = table['equipment_mask']
+    if goal is not None:
+        masks = array.array('H', compress(masks, _goal_selector(table, goal)))
+
+    # At most 512 distinct masks exist, so count them once and fold per item
+    mask_counts = Counter(masks)
+    total = len(masks)
+    share = {}
+    for item, bit in EQUIPMENT_BITS.items():
+        used = sum(count for mask, count in mask_counts.items() if mask & bit)
+        share[item] = used / total if total else 0.0
+
+    return share
+
+def time_histogram(table, bins=DEFAULT_TIME_BINS, goal=None):
+    """
+    Histogram of daily time budgets
+    Bucket labels look like '<=10', '11-15', ... and '>180'
+    """
+
+    times = table['estimated_time']
+    if goal is not None:
+        times = compress(times, _goal_selector(table, goal))
+
+    # Count distinct minute values first, then place each value in a bucket
+    counts = Counter()
+    for minutes, count in Counter(times).items():
+        counts[bisect.bisect_left(bins, minutes)] += count
+
+    labels = []
+    low = None
+    for edge in bins:
+        labels.append(f"<={edge}" if low is None else f"{low}-{edge}")
+        low = edge + 1
+    labels.append(f">{bins[-1]}")
+
+    return {label: counts.get(position, 0) for position, label in enumerate(labels)}
+
+def _saved_rows(path):
+    """
+    Committed row count of a saved table
+    Tables saved before the count file existed: rows every column holds
+    """
+
+    count_path = os.path.join(path, ROW_COUNT_FILE)
+    if os.path.exists(count_path):
+        with open(count_path, 'r', encoding='utf-8') as file:
+            return int(file.read())
+
+    rows = None
+    for name, typecode in COLUMNS.items():
+        column_path = os.path.join(path, f"{name}.bin")
+        size = os.path.getsize(column_path) // array.array(typecode).itemsize if os.path.exists(column_path) else 0
+        rows = size if rows is None else min(rows, size)
+    return rows or 0
+
+def _commit_rows(path, rows):
+    """Record the row count - the last step of every save/append"""
+
+    from template_store import atomic_write_text
+    atomic_write_text(os.path.join(path, ROW_COUNT_FILE), str(rows))
+
+def _lock_table(path):
+    """
+    Exclusive lock on a saved table (released when the returned file is
+    closed); None where file locks aren't available
+    """
+
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        return None
+
+    lock = open(os.path.join(path, LOCK_FILE), 'a')
+    fcntl.flock(lock, fcntl.LOCK_EX)
+    return lock
+
+def save_table(table, path):
+    """
+    Save the table to a folder with one raw binary file per column
+    """
+
+    if not os.path.exists(path):
+        os.makedirs(path)
+    lock = _lock_table(path)
+    try:
+        for name, column in table.items():
+            with open(os.path.join(path, f"{name}.bin"), 'wb') as file:
+                column.tofile(file)
+                file.flush()
+                os.fsync(file.fileno())
+        _commit_rows(path, table_size(table))
+    finally:
+        if lock is not None:
+            lock.close()
+
+def append_to_saved_table(path, entries):
+    """
+    Append (routine, user_data) pairs to a table saved with save_table
+    Only the new rows are written - existing column files are never rewritten
+    Rows count once every column has them: a crash or error part way
+    leaves the table as it was (the partial rows get overwritten next time)
+    """
+
+    rows = new_summary_table()
+    append_summaries(rows, entries)
+
+    if not os.path.exists(path):
+        os.makedirs(path)
+    lock = _lock_table(path)
+    try:
+        saved = _saved_rows(path)
+        for name, column in rows.items():
+            column_path = os.path.join(path, f"{name}.bin")
+            with open(column_path, 'r+b' if os.path.exists(column_path) else 'wb') as file:
+                # Drop anything past the committed rows, then add the new ones
+                file.truncate(saved * column.itemsize)
+                file.seek(0, os.SEEK_END)
+                column.tofile(file)
+                file.flush()
+                os.fsync(file.fileno())
+        _commit_rows(path, saved + table_size(rows))
+    finally:
+        if lock is not None:
+            lock.close()
+
+    return table_size(rows)
+
+def load_table(path):
+    """
+    Load a table saved with save_table (missing folder gives an empty table)
+    Only committed rows are read
+    """
+
+    table = new_summary_table()
+    if not os.path.exists(path):
+        return table
+
+    rows = _saved_rows(path)
+    for name, column in table.items():
+        column_path = os.path.join(path, f"{name}.bin")
+        if os.path.exists(column_path):
+            with open(column_path, 'rb') as file:
+                column.frombytes(file.read(rows * column.itemsize))
+
+    return table
+
+def load_from_store(conn, table=None):
+    """
+    Build (or extend) a table from the SQLite routine history
+    """
+
+    from storage import iter_routines, get_user
+
+    table = table if table is not None else new_summary_table()
+    users = {}
+
+    for user_id, routine_date, routine in iter_routines(conn):
+        if user_id not in users:
+            users[user_id] = get_user(conn, user_id)
+        if users[user_id] is not None:
+            append_summary(table, routine, users[user_id])
+
+    return table
+
+def benchmark_analytics(rows=1_000_000):
+    """
+    Fill a table with synthetic rows and time every aggregate query
+    """
+
+    import random
+    rng = random.Random(7)
+    table = new_summary_table()
+
+    start = time.perf_counter()
+    table['goal'].extend(rng.randrange(len(GOALS)) for _ in range(rows))
+    table['level'].extend(rng.randrange(len(LEVELS)) for _ in range(rows))
+    table['equipment_mask'].extend(rng.randrange(1 << len(EQUIPMENT)) for _ in range(rows))
+    table['estimated_time'].extend(rng.randint(5, 180) for _ in range(rows))
+    table['total_activities'].extend(rng.randint(15, 35) for _ in range(rows))
+    results = {'build_s': time.perf_counter() - start}
+
+    for name, query in (('activities_per_goal', activities_per_goal),
+                        ('equipment_share', equipment_share),
+                        ('difficulty_distribution', difficulty_distribution),
+                        ('time_histogram', time_histogram)):
+        start = time.perf_counter()
+        query(table)
+        results[f"{name}_ms"] = (time.perf_counter() - start) * 1000
+
+    return results
+
+if __name__ == "__main__":
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"📊 Aggregating {row_count:,} routine summaries...")
+    for name, value in benchmark_analytics(row_count).items():
+        print(f"   {name}: {value:,.2f}")
@@ -0,0 +1,237 @@
+# batch_job.py - Checkpointed, resumable bulk routine generation
+# Reads a profile file (CSV or JSONL) in chunks, writes routines into
+# numbered output segments and records a checkpoint after every segment,
+# so a killed job restarts exactly where it stopped
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+
+from importer import detect_format
+from planner import create_routine, make_generation_context
+from structured_log import start_batch_logging, stop_batch_logging
+from template_store import atomic_write_json, atomic_write_text
+from user_input import validate_profile
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_COMMIT_INTERVAL = 5     # chunks per output segment / checkpoint
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+def segment_name(index):
+    """Output file for the index-th committed segment"""
+    return f"segment_{index:06d}.jsonl"
+
+def load_checkpoint(job_dir):
+    """Checkpoint dictionary of a job folder, or None for a new job"""
+
+    path = os.path.join(job_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def save_checkpoint(job_dir, checkpoint):
+    """Replace the checkpoint atomically - a crash leaves the old one intact"""
+    atomic_write_json(os.path.join(job_dir, CHECKPOINT_FILE), checkpoint)
+
+def read_records_from(path, file_format, offset=0):
+    """
+    Stream (end_offset, record) from a profile file starting at a byte offset
+    end_offset is where the next record starts - the value to checkpoint
+    Broken JSON lines come back as None records
+    """
+
+    with open(path, 'rb') as file:
+        if file_format == 'csv':
+            header_line = file.readline().decode('utf-8-sig')
+            header = [column.strip().lower() for column in next(csv.reader([header_line]), [])]
+            offset = max(offset, file.tell())
+        file.seek(offset)
+
+        if file_format == 'jsonl':
+            for line in iter(file.readline, b''):
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield offset, record if isinstance(record, dict) else None
+            return
+
+        # csv.reader pulls only the lines of the row it returns, so the
+        # running byte count is exact after every row (quoted newlines too)
+        position = [offset]
+
+        def lines():
+            for line in iter(file.readline, b''):
+                position[0] += len(line)
+                yield line.decode('utf-8')
+
+        for row in csv.reader(lines()):
+            if row:
+                yield position[0], dict(zip(header, row))
+
+def new_checkpoint(input_path, file_format, chunk_size, commit_interval, seed, context):
+    """Starting checkpoint for a fresh job"""
+
+    return {
+        'input': os.path.abspath(input_path),
+        'format': file_format,
+        'input_offset': 0,
+        'records': 0,
+        'valid': 0,
+        'rejected': 0,
+        'segments': [],
+        'chunk_size': chunk_size,
+        'commit_interval': commit_interval,
+        'seed': seed,
+        'created_date': context['created_date'],
+        'done': False
+    }
+
+def _commit_segment(job_dir, checkpoint, lines, end_offset, counts):
+    """Write one output segment, then move the checkpoint past it"""
+
+    name = segment_name(len(checkpoint['segments']))
+    # Same name on a retry, so a segment written just before a crash is
+    # simply replaced - never duplicated
+    atomic_write_text(os.path.join(job_dir, name), "".join(lines))
+
+    checkpoint['segments'].append(name)
+    checkpoint['input_offset'] = end_offset
+    checkpoint['records'] += counts['records']
+    checkpoint['valid'] += counts['valid']
+    checkpoint['rejected'] += counts['rejected']
+    save_checkpoint(job_dir, checkpoint)
+
+def run_job(input_path, job_dir, chunk_size=DEFAULT_CHUNK_SIZE, commit_interval=DEFAULT_COMMIT_INTERVAL,
+            seed=42, file_format=None, max_segments=None, target=None, say=print):
+    """
+    Generate a routine for every valid profile in input_path
+    Output: job_dir/segment_NNNNNN.jsonl, one {"profile", "routine"} per line
+    Resumes from job_dir/checkpoint.json if present (its chunk size, commit
+    interval, seed and date win, so resumed output matches an unbroken run)
+    target is the plan date (see make_generation_context), default now
+    max_segments stops early after that many commits (for testing)
+    Returns the final checkpoint
+    """
+
+    os.makedirs(job_dir, exist_ok=True)
+    checkpoint = load_checkpoint(job_dir)
+
+    if checkpoint is None:
+        file_format = file_format or detect_format(input_path)
+        checkpoint = new_checkpoint(input_path, file_format, chunk_size, commit_interval, seed,
+                                    make_generation_context(target))
+        save_checkpoint(job_dir, checkpoint)
+    else:
+        if checkpoint['input'] != os.path.abspath(input_path):
+            raise ValueError(f"{job_dir} belongs to another input: {checkpoint['input']}")
+        if checkpoint['done']:
+            say(f"✅ Job already finished - {checkpoint['valid']:,} routines in {len(checkpoint['segments'])} segments")
+            return checkpoint
+        say(f"🔁 Resuming after {checkpoint['records']:,} records ({len(checkpoint['segments'])} segments done)")
+
+    chunk_size = checkpoint['chunk_size']
+    commit_interval = checkpoint['commit_interval']
+    context = make_generation_context(datetime.strptime(checkpoint['created_date'], "%Y-%m-%d %H:%M:%S"))
+
+    records = read_records_from(checkpoint['input'], checkpoint['format'], checkpoint['input_offset'])
+    committed_now = 0
+
+    # The per-segment seeds below would otherwise leave the caller's random
+    # module reseeded - put its state back when the job stops
+    outer_state = random.getstate()
+    try:
+        while max_segments is None or committed_now < max_segments:
+            # Meals and tips use random - seed per segment so a rerun matches
+            random.seed(f"{checkpoint['seed']}:{len(checkpoint['segments'])}")
+
+            lines = []
+            counts = {'records': 0, 'valid': 0, 'rejected': 0}
+            end_offset = checkpoint['input_offset']
+
+            for chunk_number in range(commit_interval):
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    break
+
+                started = time.perf_counter()
+                for end_offset, record in chunk:
+                    user_data, errors = validate_profile(record) if record is not None else (None, [('record', 'bad JSON')])
+                    if errors:
+                        counts['rejected'] += 1
+                        continue
+                    routine = create_routine(user_data, context)
+                    lines.append(json.dumps({'profile': user_data, 'routine': routine}, ensure_ascii=False) + "\n")
+                    counts['valid'] += 1
+                counts['records'] += len(chunk)
+
+                elapsed = time.perf_counter() - started
+                say(f"   chunk {len(checkpoint['segments'])}.{chunk_number}: {len(chunk):,} records | "
+                    f"{len(chunk) / max(elapsed, 1e-9):,.0f} records/second")
+
+            if not counts['records']:
+                checkpoint['done'] = True
+                save_checkpoint(job_dir, checkpoint)
+                break
+
+            _commit_segment(job_dir, checkpoint, lines, end_offset, counts)
+            committed_now += 1
+            say(f"💾 Committed {checkpoint['segments'][-1]} | {checkpoint['records']:,} records so far")
+    finally:
+        random.setstate(outer_state)
+
+    return checkpoint
+
+def iter_job_output(job_dir):
+    """
+    Stream (profile, routine) from a job's committed segments in order
+    """
+
+    checkpoint = load_checkpoint(job_dir) or {'segments': []}
+    for name in checkpoint['segments']:
+        with open(os.path.join(job_dir, name), 'r', encoding='utf-8') as file:
+            for line in file:
+                entry = json.loads(line)
+                yield entry['profile'], entry['routine']
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumable bulk routine generation")
+    parser.add_argument("input", help="profile file (.csv or .jsonl)")
+    parser.add_argument("job_dir", help="folder for output segments and the checkpoint")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--commit-interval", type=int, default=DEFAULT_COMMIT_INTERVAL, metavar="CHUNKS",
+                        help="chunks per output segment and checkpoint")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=['csv', 'jsonl'], help="default: from file extension")
+    parser.add_argument("--date", type=lambda text: datetime.strptime(text, "%Y-%m-%d"), metavar="YYYY-MM-DD",
+                        help="plan date for a new job (default: now)")
+    parser.add_argument("--max-segments", type=int, help="stop after this many commits (resume later)")
+    parser.add_argument("--log-file", metavar="PATH",
+                        help="JSON-lines log of generation errors (default: job_dir/job_log.jsonl)")
+    args = parser.parse_args()
+
+    try:
+        os.makedirs(args.job_dir, exist_ok=True)
+        start_batch_logging(args.log_file or os.path.join(args.job_dir, "job_log.jsonl"))
+        result = run_job(args.input, args.job_dir, args.chunk_size, args.commit_interval,
+                         args.seed, args.format, args.max_segments, args.date)
+    except (OSError, ValueError) as e:
+        print(f"❌ Job failed: {e}")
+        sys.exit(1)
+    finally:
+        stop_batch_logging()
+
+    status = "finished" if result['done'] else "paused"
+    print(f"📦 Job {status}: {result['valid']:,} routines | {result['rejected']:,} rejected | "
+          f"{len(result['segments'])} segments")
@@ -0,0 +1,211 @@
+# coalesce.py - Single-flight request coalescing
+# When identical requests (same profile, same plan date) arrive together,
+# the first one computes the routine and the rest wait for its result
+# instead of computing it again. Works from threads and from asyncio
+
+import asyncio
+import sys
+import threading
+import time
+
+def new_flight_group():
+    """
+    Empty coalescing group - a dictionary used by the other functions
+    Share one group between every thread / task that serves requests
+    """
+
+    return {
+        'lock': threading.Lock(),
+        'calls': {},        # key -> in-flight call (threads)
+        'tasks': {},        # key -> in-flight task (asyncio)
+        'metrics': {'requests': 0, 'computations': 0, 'coalesced': 0, 'errors': 0, 'max_waiters': 0}
+    }
+
+def _join(group, call):
+    """Count one more request joining an in-flight call (lock held)"""
+
+    metrics = group['metrics']
+    call['waiters'] += 1
+    metrics['coalesced'] += 1
+    metrics['max_waiters'] = max(metrics['max_waiters'], call['waiters'])
+
+def run_once(group, key, function, *args):
+    """
+    Call function(*args), unless a call with the same key is already
+    running in another thread - then wait for that call and return its
+    result (or raise its error)
+    """
+
+    with group['lock']:
+        group['metrics']['requests'] += 1
+        call = group['calls'].get(key)
+        leader = call is None
+        if leader:
+            call = group['calls'][key] = {'done': threading.Event(), 'result': None, 'error': None, 'waiters': 0}
+            group['metrics']['computations'] += 1
+        else:
+            _join(group, call)
+
+    if not leader:
+        call['done'].wait()
+        if call['error'] is not None:
+            raise call['error']
+        return call['result']
+
+    try:
+        call['result'] = function(*args)
+        return call['result']
+    except Exception as e:
+        call['error'] = e
+        with group['lock']:
+            group['metrics']['errors'] += 1
+        raise
+    finally:
+        # Requests after this point start a fresh call - nothing is cached
+        with group['lock']:
+            del group['calls'][key]
+        call['done'].set()
+
+async def run_once_async(group, key, function, *args):
+    """
+    asyncio version of run_once - function may be a coroutine function or a
+    plain function (run in the loop's default executor)
+    A cancelled caller doesn't cancel the shared call for the others
+    """
+
+    with group['lock']:
+        group['metrics']['requests'] += 1
+        entry = group['tasks'].get(key)
+        if entry is None:
+            if asyncio.iscoroutinefunction(function):
+                task = asyncio.ensure_future(function(*args))
+            else:
+                task = asyncio.get_running_loop().run_in_executor(None, function, *args)
+            entry = group['tasks'][key] = {'task': task, 'waiters': 0}
+            group['metrics']['computations'] += 1
+            task.add_done_callback(lambda finished: _task_done(group, key, finished))
+        else:
+            _join(group, entry)
+
+    return await asyncio.shield(entry['task'])
+
+def _task_done(group, key, task):
+    """Forget a finished asyncio call and count its error"""
+
+    with group['lock']:
+        del group['tasks'][key]
+        if not task.cancelled() and task.exception() is not None:
+            group['metrics']['errors'] += 1
+
+def flight_metrics(group):
+    """
+    Counters so far - 'coalesced' requests are computations saved
+    """
+
+    with group['lock']:
+        metrics = dict(group['metrics'])
+        metrics['in_flight'] = len(group['calls']) + len(group['tasks'])
+    metrics['saved_share'] = metrics['coalesced'] / metrics['requests'] if metrics['requests'] else 0.0
+    return metrics
+
+def routine_key(user_data, context):
+    """
+    Requests with the same key get the same routine: the profile's class
+    (profile_classes.profile_class), plus the plan date
+    """
+
+    from profile_classes import profile_class
+    return (profile_class(user_data), context['created_date'])
+
+def _own_copy(routine, user_data):
+    """A caller's copy of a shared routine, with its own goal and time filled in"""
+
+    from planner import copy_routine
+
+    routine = copy_routine(routine)
+    routine['user_goal'] = user_data['goal']
+    routine['total_time'] = user_data['time']
+    return routine
+
+def create_routine_once(group, user_data, context):
+    """create_routine through the group; every caller gets its own copy"""
+
+    from planner import create_routine
+    return _own_copy(run_once(group, routine_key(user_data, context), create_routine, user_data, context), user_data)
+
+async def create_routine_once_async(group, user_data, context):
+    """create_routine_once for asyncio servers (planning runs in the executor)"""
+
+    from planner import create_routine
+    routine = await run_once_async(group, routine_key(user_data, context), create_routine, user_data, context)
+    return _own_copy(routine, user_data)
+
+def _burst_profiles(requests, distinct, seed):
+    """A burst where many requests repeat a few profiles"""
+
+    from profilegen import generate_profiles
+
+    profiles = list(generate_profiles(distinct, seed))
+    return [profiles[number % distinct] for number in range(requests)]
+
+def benchmark_burst(requests=2000, distinct=20, workers=32, delay=0.002, seed=42):
+    """
+    Serve a burst of requests with and without coalescing, from a thread
+    pool and from asyncio. delay stands in for the rest of each planning
+    request (template lookups, storage) so calls overlap as in a service
+    Returns seconds and metrics per mode
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+    from planner import create_routine, make_generation_context
+
+    burst = _burst_profiles(requests, distinct, seed)
+    context = make_generation_context()
+
+    def plan(user_data, context):
+        routine = create_routine(user_data, context)
+        time.sleep(delay)
+        return routine
+
+    results = {}
+
+    with ThreadPoolExecutor(workers) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda user_data: plan(user_data, context), burst))
+        results['threads_plain'] = {'seconds': time.perf_counter() - start, 'computations': requests}
+
+        group = new_flight_group()
+        start = time.perf_counter()
+        list(pool.map(lambda user_data: run_once(group, routine_key(user_data, context), plan, user_data, context),
+                      burst))
+        results['threads_coalesced'] = {'seconds': time.perf_counter() - start, **flight_metrics(group)}
+
+    async def serve(group):
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(workers))
+        if group is None:
+            await asyncio.gather(*[loop.run_in_executor(None, plan, user_data, context) for user_data in burst])
+        else:
+            await asyncio.gather(*[run_once_async(group, routine_key(user_data, context), plan, user_data, context)
+                                   for user_data in burst])
+
+    start = time.perf_counter()
+    asyncio.run(serve(None))
+    results['asyncio_plain'] = {'seconds': time.perf_counter() - start, 'computations': requests}
+
+    group = new_flight_group()
+    start = time.perf_counter()
+    asyncio.run(serve(group))
+    results['asyncio_coalesced'] = {'seconds': time.perf_counter() - start, **flight_metrics(group)}
+
+    return results
+
+if __name__ == "__main__":
+    # Usage: python coalesce.py [requests] [distinct profiles] [workers]
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    print(f"🚦 Burst of {requests:,} requests for {distinct} profiles on {workers} workers...")
+    for mode, result in benchmark_burst(requests, distinct, workers).items():
+        print(f"   {mode}: {result['seconds']:.2f}s | {result['computations']:,} computations"
+              + (f" | {result['coalesced']:,} coalesced ({result['saved_share']:.0%})" if 'coalesced' in result else ""))
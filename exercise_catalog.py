@@ -0,0 +1,170 @@
+# exercise_catalog.py - One catalog of every exercise with lookup indexes
+# Exercises live in exercise_catalog.json; equipment, goal and level indexes
+# are built once so finding candidates is a few set intersections.
+# Routine generation only uses the names (rule_engine resolves exercise IDs
+# with exercise_name); usable_exercises, candidate_exercises and
+# exercises_for_profile are a query API for other tools and don't affect plans
+
+import json
+import os
+import sys
+import time
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exercise_catalog.json")
+
+EXERCISE_FIELDS = ('id', 'name', 'equipment', 'goals', 'levels', 'minutes')
+
+_catalog = None
+
+def load_exercises(path=CATALOG_PATH):
+    """
+    Read the exercise list - each entry has id, name, equipment (items it
+    needs, empty for bodyweight), goals, levels and minutes
+    """
+
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def build_catalog(exercises):
+    """
+    Index exercises for fast lookup
+    Returns a catalog dictionary used by the other functions
+    """
+
+    by_id = {}
+    by_goal = {}
+    by_level = {}
+    needs = {}
+
+    for exercise in exercises:
+        missing = [field for field in EXERCISE_FIELDS if field not in exercise]
+        if missing:
+            raise ValueError(f"Exercise {exercise.get('id')!r} is missing {', '.join(missing)}")
+        if exercise['id'] in by_id:
+            raise ValueError(f"Duplicate exercise ID: {exercise['id']}")
+
+        exercise_id = exercise['id']
+        by_id[exercise_id] = exercise
+        for goal in exercise['goals']:
+            by_goal.setdefault(goal, set()).add(exercise_id)
+        for level in exercise['levels']:
+            by_level.setdefault(level, set()).add(exercise_id)
+        for item in exercise['equipment']:
+            needs.setdefault(item, set()).add(exercise_id)
+
+    return {
+        'by_id': by_id,
+        'all': frozenset(by_id),
+        'by_goal': {goal: frozenset(ids) for goal, ids in by_goal.items()},
+        'by_level': {level: frozenset(ids) for level, ids in by_level.items()},
+        'needs': {item: frozenset(ids) for item, ids in needs.items()},
+        'usable': {},       # owned equipment -> exercises it allows (filled as we go)
+        'candidates': {}    # (goal, level, owned equipment) -> candidate IDs
+    }
+
+def get_catalog():
+    """Catalog from CATALOG_PATH, built on first use"""
+
+    global _catalog
+    if _catalog is None:
+        _catalog = build_catalog(load_exercises())
+    return _catalog
+
+def exercise_name(exercise_id, catalog=None):
+    """Display text of an exercise"""
+
+    catalog = catalog or get_catalog()
+    try:
+        return catalog['by_id'][exercise_id]['name']
+    except KeyError:
+        raise ValueError(f"Unknown exercise ID: {exercise_id}")
+
+def _owned_key(catalog, equipment):
+    """Only equipment some exercise needs matters - 'none' and unknown items drop out"""
+    return frozenset(item for item in catalog['needs'] if item in equipment)
+
+def usable_exercises(equipment, catalog=None):
+    """
+    IDs of exercises whose every required item is in equipment
+    """
+
+    catalog = catalog or get_catalog()
+    owned = _owned_key(catalog, equipment)
+
+    usable = catalog['usable'].get(owned)
+    if usable is None:
+        # Everything minus what needs equipment we don't have
+        blocked = set()
+        for item, ids in catalog['needs'].items():
+            if item not in owned:
+                blocked |= ids
+        usable = catalog['usable'][owned] = catalog['all'] - blocked
+
+    return usable
+
+def candidate_exercises(goal, equipment, fitness_level=None, catalog=None):
+    """
+    IDs of exercises that suit the goal (and level, if given) and can be
+    done with the equipment. Results are cached per combination, so repeat
+    lookups are a single dictionary hit
+    """
+
+    catalog = catalog or get_catalog()
+    owned = _owned_key(catalog, equipment)
+    key = (goal, fitness_level, owned)
+
+    candidates = catalog['candidates'].get(key)
+    if candidates is None:
+        candidates = catalog['by_goal'].get(goal, frozenset()) & usable_exercises(owned, catalog)
+        if fitness_level is not None:
+            candidates = candidates & catalog['by_level'].get(fitness_level, frozenset())
+        catalog['candidates'][key] = candidates
+
+    return candidates
+
+def exercises_for_profile(user_data, catalog=None):
+    """
+    Candidate exercises for a user profile, as catalog entries sorted by ID
+    """
+
+    catalog = catalog or get_catalog()
+    ids = candidate_exercises(user_data['goal'], user_data['equipment'], user_data['fitness_level'], catalog)
+    return [catalog['by_id'][exercise_id] for exercise_id in sorted(ids)]
+
+def benchmark_catalog(size=5000, lookups=200000):
+    """
+    Build a large synthetic catalog and time candidate lookups
+    Returns catalog build time and lookups per second
+    """
+
+    goals = ['weight_loss', 'weight_gain', 'muscle_building', 'endurance', 'flexibility', 'general_fitness']
+    levels = ['beginner', 'intermediate', 'advanced']
+    items = ['dumbbells', 'resistance_bands', 'yoga_mat', 'pull_up_bar', 'jump_rope', 'treadmill', 'bicycle']
+
+    exercises = [{
+        'id': f"exercise_{i}", 'name': f"Exercise {i}",
+        'equipment': [items[i % 7]] if i % 3 else [],
+        'goals': [goals[i % 6], goals[(i // 6) % 6]],
+        'levels': levels[:1 + i % 3], 'minutes': 1 + i % 15
+    } for i in range(size)]
+
+    results = {}
+    start = time.perf_counter()
+    catalog = build_catalog(exercises)
+    results['build_ms'] = (time.perf_counter() - start) * 1000
+
+    kits = [['none'], ['dumbbells'], ['treadmill', 'yoga_mat'], ['jump_rope', 'resistance_bands', 'bicycle']]
+    start = time.perf_counter()
+    for i in range(lookups):
+        candidate_exercises(goals[i % 6], kits[i % 4], levels[i % 3], catalog)
+    results['lookups_per_sec'] = lookups / (time.perf_counter() - start)
+    results['cached_combinations'] = len(catalog['candidates'])
+
+    return results
+
+if __name__ == "__main__":
+    # Usage: python exercise_catalog.py [catalog_size]
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(f"🏋️ Looking up candidates in a {size:,} exercise catalog...")
+    for name, value in benchmark_catalog(size).items():
+        print(f"   {name}: {value:,.2f}")
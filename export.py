@@ -0,0 +1,186 @@
+# export.py - Stream selected routines into one zip or tar.gz archive
+# Used for support requests ("all routines for user X") and full backups
+
+import argparse
+import io
+import os
+import re
+import sys
+import tarfile
+import time
+import zipfile
+
+from storage import open_store, iter_routines, get_user, DEFAULT_DB_PATH
+from renderer import render_routine, FILE_EXTENSIONS
+
+ROUTINES_DIR = "saved_routines"
+
+# Where export_archive takes routines from. Every routine main.save_routine
+# saves is both in the database and a text file, so 'both' repeats those
+EXPORT_SOURCES = ('db', 'files', 'both')
+
+# Text files written by main.save_routine: routine_<name>_<YYYYMMDD>_<user ID prefix>.txt
+# (files saved before user IDs were added have no ID part)
+SAVED_FILE_PATTERN = re.compile(r"^routine_(?P<name>.+?)_(?P<date>\d{8})(?:_(?P<user>[0-9a-f]{8}))?\.txt$")
+
+def detect_archive_format(path):
+    """
+    Guess archive type from the output name - 'zip' or 'tar.gz'
+    """
+
+    lower = path.lower()
+    if lower.endswith(('.tar.gz', '.tgz')):
+        return 'tar.gz'
+    return 'zip'
+
+def _compact_date(date_text):
+    """'2025-03-05' or '20250305' -> '20250305' (None stays None)"""
+    return date_text.replace('-', '') if date_text else None
+
+def iter_saved_files(routines_dir=ROUTINES_DIR, name=None, start_date=None, end_date=None):
+    """
+    Yield (path, filename) for saved .txt routines matching name/date filters
+    Dates are 'YYYY-MM-DD' and inclusive; os.scandir keeps memory flat
+    """
+
+    if not os.path.isdir(routines_dir):
+        return
+
+    start, end = _compact_date(start_date), _compact_date(end_date)
+
+    with os.scandir(routines_dir) as entries:
+        for entry in entries:
+            match = SAVED_FILE_PATTERN.match(entry.name)
+            if not match or not entry.is_file():
+                continue
+            if name is not None and match.group('name') != name:
+                continue
+            if start and match.group('date') < start:
+                continue
+            if end and match.group('date') > end:
+                continue
+            yield entry.path, entry.name
+
+class _ZipWriter:
+    """Adds entries to a zip archive one at a time"""
+
+    def __init__(self, output):
+        self.archive = zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    def add_bytes(self, name, data):
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with self.archive.open(info, 'w') as entry:
+            entry.write(data)
+
+    def add_file(self, name, path):
+        # ZipFile.write copies the file in small blocks
+        self.archive.write(path, name)
+
+    def close(self):
+        self.archive.close()
+
+class _TarWriter:
+    """Adds entries to a gzip-compressed tar stream one at a time"""
+
+    def __init__(self, output):
+        # 'w|gz' writes a pure stream, so stdout and pipes work too
+        if isinstance(output, str):
+            self.archive = tarfile.open(output, 'w:gz')
+        else:
+            self.archive = tarfile.open(fileobj=output, mode='w|gz')
+
+    def add_bytes(self, name, data):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def add_file(self, name, path):
+        self.archive.add(path, arcname=name)
+
+    def close(self):
+        self.archive.close()
+
+def export_archive(output, conn=None, user_id=None, name=None, start_date=None, end_date=None,
+                   file_format='text', archive_format=None, routines_dir=ROUTINES_DIR, source=None):
+    """
+    Stream matching routines into one archive without temp files
+    output is a path or a writable binary stream (e.g. sys.stdout.buffer)
+    source (see EXPORT_SOURCES) picks the history database (rendered in
+    file_format, under <user_id>/), the saved text files in routines_dir
+    (under files/) or both. Default: the database when conn is given,
+    else the files - each saved routine is exported once
+    Files carry no full user ID, so a user_id filter only reads the database
+    Returns number of entries written
+    """
+
+    if source is None:
+        source = 'db' if conn is not None else 'files'
+    if source not in EXPORT_SOURCES:
+        raise ValueError(f"Unknown export source: {source}")
+    if source != 'files' and conn is None:
+        raise ValueError(f"Export source {source!r} needs a history database")
+
+    if archive_format is None:
+        archive_format = detect_archive_format(output) if isinstance(output, str) else 'zip'
+
+    writer = _TarWriter(output) if archive_format == 'tar.gz' else _ZipWriter(output)
+    extension = FILE_EXTENSIONS[file_format]
+    count = 0
+    users = {}
+
+    try:
+        # Routines from the database - rendered one at a time
+        if source in ('db', 'both'):
+            for routine_user_id, routine_date, routine in iter_routines(conn, user_id, start_date, end_date):
+                if routine_user_id not in users:
+                    # Only the current user's profile is kept - memory stays flat
+                    users = {routine_user_id: get_user(conn, routine_user_id)}
+                user_data = users[routine_user_id]
+                if user_data is None:
+                    continue
+                if name is not None and user_data['name'] != name:
+                    continue
+
+                content = render_routine(routine, user_data, file_format)
+                writer.add_bytes(f"{routine_user_id}/{routine_date}{extension}", content.encode('utf-8'))
+                count += 1
+
+        # Saved text files - copied block by block
+        if source in ('files', 'both') and user_id is None:
+            for path, filename in iter_saved_files(routines_dir, name, start_date, end_date):
+                writer.add_file(f"files/{filename}", path)
+                count += 1
+
+    finally:
+        writer.close()
+
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export HealthMate routines into one zip or tar.gz archive")
+    parser.add_argument("output", help="archive path (.zip, .tar.gz) or '-' for stdout")
+    parser.add_argument("--user", help="only routines of this user ID")
+    parser.add_argument("--name", help="only routines of users with this name")
+    parser.add_argument("--from", dest="start_date", metavar="YYYY-MM-DD", help="first routine date")
+    parser.add_argument("--to", dest="end_date", metavar="YYYY-MM-DD", help="last routine date")
+    parser.add_argument("--format", default='text', choices=sorted(FILE_EXTENSIONS), help="file format inside the archive")
+    parser.add_argument("--archive", choices=['zip', 'tar.gz'], help="archive type (default: from output name)")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="history database path")
+    parser.add_argument("--source", choices=EXPORT_SOURCES,
+                        help="routines from the database, the saved text files or both "
+                             "(default: database if it exists, else files)")
+    args = parser.parse_args()
+
+    conn = open_store(args.db) if os.path.exists(args.db) else None
+    output = sys.stdout.buffer if args.output == '-' else args.output
+
+    try:
+        written = export_archive(output, conn, args.user, args.name, args.start_date, args.end_date,
+                                 args.format, args.archive, source=args.source)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    print(f"✅ Exported {written:,} routines", file=sys.stderr)
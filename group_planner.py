@@ -0,0 +1,231 @@
+# group_planner.py - Routines for households and teams planned together
+# Members whose diets one plan can suit eat the same meals (the strictest
+# diet that suits them all), everyone shares one evening wind-down; morning,
+# workout and tip stay personal. Pre- and post-workout meals follow each
+# member's own goal. Shared sections are planned once however big the group is
+
+import sys
+import time
+from time import perf_counter_ns
+
+from latency import histogram, observe
+from structured_log import log_error
+
+GROUP_ROUTINES_LATENCY = histogram('healthmate_create_group_routines_seconds', "Time to plan one group")
+
+# When several diets suit the same members, meals follow the first of them;
+# diets not listed rank after all of them
+DIET_STRICTNESS = ('jain', 'vegan', 'vegetarian', 'keto', 'non_vegetarian', 'no_preference')
+
+# Which members' diets a diet's meals suit - e.g. jain meals use dairy, so
+# they don't suit vegans (a group with both gets two meal plans)
+DIET_SUITS = {
+    'jain': {'jain', 'vegetarian', 'non_vegetarian', 'no_preference'},
+    'vegan': {'vegan', 'vegetarian', 'non_vegetarian', 'no_preference'},
+    'vegetarian': {'vegetarian', 'non_vegetarian', 'no_preference'},
+    'keto': {'keto', 'non_vegetarian', 'no_preference'},
+    'non_vegetarian': {'non_vegetarian', 'no_preference'},
+    'no_preference': {'no_preference'}
+}
+
+# Meal lines that depend on the goal - redone for members whose goal isn't the group's
+PRE_WORKOUT_PREFIX = "💪 Pre-workout: "
+POST_WORKOUT_PREFIX = "🥗 Post-workout: "
+
+def meal_diets(profiles):
+    """
+    Split the members into as few meal plans as their diets allow
+    Each plan takes the diet that suits the most remaining members -
+    a member's own diet before any other, then the earliest in DIET_STRICTNESS
+    Returns [(diet, [user_data, ...]), ...]; one entry when a single diet suits everyone
+    """
+
+    rank = {diet: position for position, diet in enumerate(DIET_STRICTNESS)}
+    remaining = list(profiles)
+    plans = []
+
+    while remaining:
+        counts = {}
+        for user_data in remaining:
+            counts[user_data['diet']] = counts.get(user_data['diet'], 0) + 1
+
+        def suited(diet):
+            return sum(count for member_diet, count in counts.items()
+                       if member_diet in DIET_SUITS.get(diet, {diet}))
+
+        diet = min(set(DIET_STRICTNESS) | set(counts),
+                   key=lambda diet: (-suited(diet), diet not in counts, rank.get(diet, len(rank)), diet))
+        suits = DIET_SUITS.get(diet, {diet})
+        plans.append((diet, [user_data for user_data in remaining if user_data['diet'] in suits]))
+        remaining = [user_data for user_data in remaining if user_data['diet'] not in suits]
+
+    return plans
+
+def group_profile(profiles):
+    """
+    One profile standing for the whole group when planning shared sections:
+    most common goal and fitness level (first listed on a tie), oldest age,
+    shortest and longest available time, no equipment
+    Meals add the diet of each plan from meal_diets
+    """
+
+    goals, levels = {}, {}
+    for user_data in profiles:
+        goals[user_data['goal']] = goals.get(user_data['goal'], 0) + 1
+        levels[user_data['fitness_level']] = levels.get(user_data['fitness_level'], 0) + 1
+    times = [user_data['time'] for user_data in profiles]
+
+    return {
+        'name': 'Group',
+        'goal': max(goals, key=goals.get),      # max keeps the first of equal counts
+        'fitness_level': max(levels, key=levels.get),
+        'equipment': [],
+        'age': max(user_data['age'] for user_data in profiles),
+        'shortest_time': min(times),
+        'longest_time': max(times)
+    }
+
+def meals_for_goal(meals, group, goal):
+    """
+    The group's meals with the goal-dependent lines (pre-workout snack,
+    post-workout meal, closing note) planned for another goal instead
+    group is the profile the meals were planned for (with its diet)
+    """
+
+    from planner import get_goal_meal_note, get_post_workout_meal, get_pre_workout_snack
+
+    group_note = get_goal_meal_note(group['goal'])
+    lines = []
+    for line in meals:
+        if line.startswith(PRE_WORKOUT_PREFIX):
+            line = PRE_WORKOUT_PREFIX + get_pre_workout_snack(group['diet'], goal)
+        elif line.startswith(POST_WORKOUT_PREFIX):
+            line = POST_WORKOUT_PREFIX + get_post_workout_meal(group['diet'], goal)
+        elif line == group_note:
+            continue
+        lines.append(line)
+
+    note = get_goal_meal_note(goal)
+    if note:
+        lines.append(note)
+    return lines
+
+def create_group_routines(profiles, context=None):
+    """
+    Plan routines for everyone in a group at once
+    Meals are planned once per diet plan (meal_diets - usually one for the
+    whole group), with a pre-workout snack if anyone trains long enough; the
+    evening is planned once for the oldest member's age and the shortest
+    time. Members whose goal isn't the group's get its goal-dependent meal
+    lines planned once per diet and goal (meals_for_goal), and members with
+    too little time for a pre-workout snack on their own don't get one.
+    Each member gets their own morning, workout and tip
+    Returns {'group': group_profile, 'meals': {diet: the group goal's meals},
+    'evening', 'routines': [(user_data, routine), ...]} - every routine holds
+    its own copy of the shared lists
+    """
+
+    from planner import (
+        PRE_WORKOUT_MIN_TIME, create_fallback_routine, generate_evening_routine, generate_meal_plan,
+        generate_morning_routine, generate_workout_routine, get_daily_tip, make_generation_context
+    )
+
+    profiles = list(profiles)
+    if not profiles:
+        raise ValueError("A group needs at least one profile")
+
+    started = perf_counter_ns()
+    try:
+        context = context or make_generation_context()
+        group = group_profile(profiles)
+        evening = generate_evening_routine({**group, 'time': group['shortest_time']})
+
+        meals = {}
+        member_meals = {}     # id(user_data) -> meals for their diet plan, goal and time
+        for diet, members in meal_diets(profiles):
+            plan = {**group, 'diet': diet, 'time': group['longest_time']}
+            meals[diet] = generate_meal_plan(plan)
+            goal_meals = {(group['goal'], True): meals[diet]}
+            for user_data in members:
+                key = (user_data['goal'], user_data['time'] >= PRE_WORKOUT_MIN_TIME)
+                if key not in goal_meals:
+                    lines = goal_meals.get((key[0], True))
+                    if lines is None:
+                        lines = goal_meals[(key[0], True)] = meals_for_goal(meals[diet], plan, key[0])
+                    if not key[1]:
+                        lines = [line for line in lines if not line.startswith(PRE_WORKOUT_PREFIX)]
+                    goal_meals[key] = lines
+                member_meals[id(user_data)] = goal_meals[key]
+
+        routines = []
+        for user_data in profiles:
+            try:
+                routine = {
+                    'morning': generate_morning_routine(user_data),
+                    'workout': generate_workout_routine(user_data),
+                    'meals': list(member_meals[id(user_data)]),
+                    'evening': list(evening),
+                    'tip': get_daily_tip(user_data),
+                    'created_date': context['created_date'],
+                    'user_goal': user_data['goal'],
+                    'total_time': user_data['time']
+                }
+            except Exception as e:
+                log_error('create_group_routine_failed',
+                          f"❌ Error creating routine for {user_data.get('name')}: {str(e)}", error_type=type(e).__name__, goal=user_data.get('goal'))
+                routine = create_fallback_routine(user_data, context)
+            routines.append((user_data, routine))
+
+        return {
+            'group': group,
+            'meals': meals,
+            'evening': evening,
+            'routines': routines
+        }
+
+    finally:
+        observe(GROUP_ROUTINES_LATENCY, perf_counter_ns() - started)
+
+def benchmark_groups(sizes=(4, 50, 500), members=20000, seed=42):
+    """
+    Plan the same members in groups of each size with create_group_routines
+    and, for comparison, one by one with create_routine
+    Returns microseconds per member for each size
+    """
+
+    from planner import create_routine, make_generation_context
+    from profilegen import generate_profiles
+
+    context = make_generation_context()
+    members = list(generate_profiles(members, seed))
+    results = {}
+
+    # Fill the rule tables first so neither way pays for it
+    for user_data in members:
+        create_routine(user_data, context)
+
+    for size in sizes:
+        batches = [members[start:start + size] for start in range(0, len(members), size)]
+
+        start = time.perf_counter()
+        for batch in batches:
+            for user_data in batch:
+                create_routine(user_data, context)
+        single_us = (time.perf_counter() - start) / len(members) * 1e6
+
+        start = time.perf_counter()
+        for batch in batches:
+            create_group_routines(batch, context)
+        group_us = (time.perf_counter() - start) / len(members) * 1e6
+
+        results[size] = {'single_us': single_us, 'group_us': group_us}
+
+    return results
+
+if __name__ == "__main__":
+    # Usage: python group_planner.py [group size ...]
+    sizes = tuple(int(size) for size in sys.argv[1:]) or (4, 50, 500)
+    print(f"👨‍👩‍👧‍👦 Planning groups of {', '.join(str(size) for size in sizes)}...")
+    for size, result in benchmark_groups(sizes).items():
+        print(f"   {size:>5} members: {result['group_us']:.1f} µs/member together"
+              f" | {result['single_us']:.1f} µs/member one by one")
@@ -0,0 +1,192 @@
+# importer.py - Bulk profile importer for CSV and JSONL exports
+# Reads HR exports in chunks and validates rows with the user_input.py rules
+
+import argparse
+import csv
+import io
+import json
+import os
+import time
+
+from user_input import validate_profile
+
+# Rows validated per chunk - memory use is bounded by this number
+DEFAULT_CHUNK_SIZE = 10000
+
+PROFILE_FIELDS = ['user_id', 'name', 'age', 'goal', 'time', 'equipment', 'diet', 'fitness_level']
+
+def detect_format(path):
+    """
+    Guess file format from extension - 'csv' or 'jsonl'
+    """
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    return 'csv'
+
+def read_csv_records(file):
+    """
+    Stream (line_number, record) pairs from a CSV file with a header row
+    Equipment can be written as "dumbbells;yoga_mat" inside one column
+    """
+
+    reader = csv.reader(file)
+    header = [column.strip().lower() for column in next(reader, [])]
+
+    for line_number, row in enumerate(reader, start=2):
+        if not row:
+            continue
+        yield line_number, dict(zip(header, row))
+
+def read_jsonl_records(file):
+    """
+    Stream (line_number, record) pairs from a JSONL file
+    Broken JSON lines come back as None so they can be reported
+    """
+
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            record = None
+        yield line_number, record
+
+def validate_records(records, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate a stream of (line_number, record) pairs chunk by chunk
+    Yields (valid_profiles, rejected_rows) per chunk, where each rejected
+    row is (line_number, errors)
+    """
+
+    valid = []
+    rejected = []
+
+    for line_number, record in records:
+        if record is None:
+            rejected.append((line_number, [('row', 'not a valid JSON object')]))
+        else:
+            user_data, errors = validate_profile(record)
+            if errors:
+                rejected.append((line_number, errors))
+            else:
+                valid.append(user_data)
+
+        if len(valid) + len(rejected) >= chunk_size:
+            yield valid, rejected
+            valid = []
+            rejected = []
+
+    if valid or rejected:
+        yield valid, rejected
+
+def import_profiles(path, chunk_size=DEFAULT_CHUNK_SIZE, rejects_path=None, file_format=None, stats=None):
+    """
+    Import a CSV or JSONL profile file in chunks
+    Yields lists of valid user_data dictionaries (at most chunk_size each)
+    Rejected rows are written to rejects_path as CSV (line, field, reason)
+    stats, if given, is a dictionary updated with row counts as we go
+    """
+
+    file_format = file_format or detect_format(path)
+    if stats is None:
+        stats = {}
+    stats.setdefault('rows', 0)
+    stats.setdefault('valid', 0)
+    stats.setdefault('rejected', 0)
+
+    rejects_file = open(rejects_path, 'w', newline='', encoding='utf-8') if rejects_path else None
+
+    try:
+        rejects_writer = None
+        if rejects_file:
+            rejects_writer = csv.writer(rejects_file)
+            rejects_writer.writerow(['line', 'field', 'reason'])
+
+        with open(path, 'r', newline='', encoding='utf-8') as file:
+            if file_format == 'jsonl':
+                records = read_jsonl_records(file)
+            else:
+                records = read_csv_records(file)
+
+            for valid, rejected in validate_records(records, chunk_size):
+                stats['rows'] += len(valid) + len(rejected)
+                stats['valid'] += len(valid)
+                stats['rejected'] += len(rejected)
+
+                if rejects_writer:
+                    rejects_writer.writerows(
+                        (line_number, field, reason)
+                        for line_number, errors in rejected
+                        for field, reason in errors
+                    )
+
+                if valid:
+                    yield valid
+
+    finally:
+        if rejects_file:
+            rejects_file.close()
+
+def benchmark_importer(rows=500000, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Measure validation throughput on an in-memory CSV
+    About 1 in 10 rows is invalid so the reject path is exercised too
+    Returns rows per second
+    """
+
+    goals = ['weight_loss', 'weight_gain', 'muscle_building', 'general_fitness', 'endurance', 'flexibility']
+    diets = ['vegetarian', 'vegan', 'non_vegetarian', 'jain', 'keto', 'no_preference']
+    levels = ['beginner', 'intermediate', 'advanced']
+    equipment = ['none', 'dumbbells;yoga_mat', 'treadmill', 'jump_rope;resistance_bands', 'none;dumbbells']
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(PROFILE_FIELDS)
+    for i in range(rows):
+        writer.writerow([
+            f"u{i}", "Asha Rao" if i % 10 else "R2D2", 18 + i % 60,
+            goals[i % 6], 10 + i % 100, equipment[i % 4],
+            diets[i % 6], levels[i % 3]
+        ])
+    buffer.seek(0)
+
+    start = time.perf_counter()
+    total = 0
+    for valid, rejected in validate_records(read_csv_records(buffer), chunk_size):
+        total += len(valid) + len(rejected)
+    elapsed = time.perf_counter() - start
+
+    return total / elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import HealthMate profiles from CSV or JSONL")
+    parser.add_argument("path", nargs="?", help="profile file (.csv or .jsonl)")
+    parser.add_argument("--rejects", help="write rejected rows report to this CSV file")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--store", metavar="DB", help="upsert valid profiles into this HealthMate database")
+    parser.add_argument("--benchmark", type=int, metavar="ROWS", help="measure validation throughput")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(f"⚡ {benchmark_importer(args.benchmark, args.chunk_size):,.0f} rows/second")
+    elif args.path:
+        from storage import open_store, upsert_profiles, ensure_user_id
+
+        conn = open_store(args.store) if args.store else None
+        stats = {}
+        for chunk in import_profiles(args.path, args.chunk_size, args.rejects, stats=stats):
+            if conn is not None:
+                for user_data in chunk:
+                    ensure_user_id(user_data)
+                upsert_profiles(conn, chunk)
+        if conn is not None:
+            conn.close()
+
+        print(f"✅ {stats['valid']:,} valid | ❌ {stats['rejected']:,} rejected | {stats['rows']:,} rows")
+    else:
+        parser.print_help()
@@ -0,0 +1,330 @@
+# itemstore.py - Deduplicated storage of routine items
+# Every distinct item string is stored once in a dictionary file and each
+# routine (or saved text file) becomes a short sequence of item IDs
+
+import glob
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+
+# Item IDs are the first 8 bytes of the item's BLAKE2 hash, so the same text
+# always gets the same ID - stores can be merged without renumbering
+ID_BYTES = 8
+
+ROUTINE_SECTIONS = ('morning', 'workout', 'meals', 'evening')
+
+ITEMS_FILE = "items.jsonl"
+RECORDS_FILE = "records.bin"
+
+KIND_ROUTINE = b'R'
+KIND_TEXT = b'T'
+
+_LENGTH = struct.Struct('<I')
+_COUNT = struct.Struct('<H')
+
+def item_id(text):
+    """
+    Content address of an item string (a 64-bit integer)
+    """
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=ID_BYTES).digest(), 'little')
+
+def open_item_store(path):
+    """
+    Open (or create) an item store folder
+    Returns a store dictionary used by the other functions
+    """
+
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+    items = {}
+    items_path = os.path.join(path, ITEMS_FILE)
+    if os.path.exists(items_path):
+        with open(items_path, 'r+b') as file:
+            complete = 0
+            for line in file:
+                if not line.endswith(b"\n"):
+                    # Cut short by a crash - drop it so new items start on a fresh line
+                    file.truncate(complete)
+                    break
+                key, text = json.loads(line)
+                items[key] = text
+                complete += len(line)
+
+    records_path = os.path.join(path, RECORDS_FILE)
+    if os.path.exists(records_path):
+        _drop_partial_record(records_path)
+
+    return {
+        'path': path,
+        'items': items,             # id -> text
+        'ids': {},                  # text -> id (cache, filled as we go)
+        'items_file': open(items_path, 'a', encoding='utf-8'),
+        'items_pending': False,     # items written to items_file's buffer but not flushed
+        'records_file': open(records_path, 'ab')
+    }
+
+def _drop_partial_record(records_path):
+    """
+    Cut a record left incomplete by a crash off the end of the records file,
+    so new records follow the last complete one (iter_records stops at a gap)
+    """
+
+    with open(records_path, 'r+b') as file:
+        size = os.fstat(file.fileno()).st_size
+        complete = 0
+        while complete + _LENGTH.size <= size:
+            (length,) = _LENGTH.unpack(file.read(_LENGTH.size))
+            if complete + _LENGTH.size + length > size:
+                break
+            complete += _LENGTH.size + length
+            file.seek(complete)
+        if complete < size:
+            file.truncate(complete)
+
+def close_item_store(store):
+    """Flush and close the store files"""
+
+    store['items_file'].close()
+    store['records_file'].close()
+
+def intern_item(store, text):
+    """
+    Return the ID for an item string, adding it to the dictionary if new
+    """
+
+    key = store['ids'].get(text)
+    if key is not None:
+        return key
+
+    key = item_id(text)
+    if key not in store['items']:
+        store['items'][key] = text
+        store['items_file'].write(json.dumps([key, text], ensure_ascii=False) + "\n")
+        store['items_pending'] = True
+    elif store['items'][key] != text:
+        raise ValueError(f"Item ID collision for {text!r}")
+
+    store['ids'][text] = key
+    return key
+
+def _ids_bytes(store, texts):
+    """Encode a list of strings as packed little-endian 64-bit IDs (same byte order as item_id)"""
+
+    keys = [intern_item(store, text) for text in texts]
+    return struct.pack(f'<{len(keys)}Q', *keys)
+
+def encode_routine(store, routine):
+    """
+    Encode a routine dictionary into record bytes
+    Sections and tip become item IDs, other keys are kept as small JSON
+    """
+
+    meta = {key: value for key, value in routine.items() if key not in ROUTINE_SECTIONS and key != 'tip'}
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+    parts = [KIND_ROUTINE, _LENGTH.pack(len(meta_bytes)), meta_bytes]
+    for section in ROUTINE_SECTIONS:
+        items = routine.get(section, [])
+        parts.append(_COUNT.pack(len(items)))
+        parts.append(_ids_bytes(store, items))
+
+    tip = routine.get('tip')
+    parts.append(_COUNT.pack(0 if tip is None else 1))
+    if tip is not None:
+        parts.append(_ids_bytes(store, [tip]))
+
+    return b"".join(parts)
+
+def encode_text(store, text):
+    """
+    Encode a text document (e.g. a save_routine .txt export) line by line
+    """
+
+    lines = text.split("\n")
+    return b"".join([KIND_TEXT, _LENGTH.pack(len(lines)), _ids_bytes(store, lines)])
+
+def _read_ids(store, data, position, count):
+    """Decode count IDs starting at position; returns (texts, new_position)"""
+
+    items = store['items']
+    return [items[key] for key in struct.unpack_from(f'<{count}Q', data, position)], position + count * ID_BYTES
+
+def decode_record(store, data):
+    """
+    Turn record bytes back into a routine dictionary or a text string
+    """
+
+    kind = data[:1]
+    if kind == KIND_TEXT:
+        (count,) = _LENGTH.unpack_from(data, 1)
+        lines, _ = _read_ids(store, data, 1 + _LENGTH.size, count)
+        return "\n".join(lines)
+
+    (meta_length,) = _LENGTH.unpack_from(data, 1)
+    position = 1 + _LENGTH.size
+    routine = {}
+    meta = json.loads(data[position:position + meta_length].decode('utf-8'))
+    position += meta_length
+
+    for section in ROUTINE_SECTIONS:
+        (count,) = _COUNT.unpack_from(data, position)
+        position += _COUNT.size
+        routine[section], position = _read_ids(store, data, position, count)
+
+    (count,) = _COUNT.unpack_from(data, position)
+    position += _COUNT.size
+    if count:
+        tips, position = _read_ids(store, data, position, count)
+        routine['tip'] = tips[0]
+
+    routine.update(meta)
+    return routine
+
+def _append_record(store, record):
+    """
+    Append one length-prefixed record; returns its offset
+    New items the record uses are flushed and synced to disk first, so the
+    records file never gets ahead of the dictionary - not even on power loss
+    """
+
+    if store['items_pending']:
+        store['items_file'].flush()
+        os.fsync(store['items_file'].fileno())
+        store['items_pending'] = False
+
+    file = store['records_file']
+    offset = file.tell()
+    file.write(_LENGTH.pack(len(record)))
+    file.write(record)
+    return offset
+
+def add_routine(store, routine):
+    """Store a routine; returns its offset (use with read_record)"""
+    return _append_record(store, encode_routine(store, routine))
+
+def add_text(store, text):
+    """Store a text export; returns its offset (use with read_record)"""
+    return _append_record(store, encode_text(store, text))
+
+def read_record(store, offset):
+    """
+    Read one record (routine dictionary or text) at the given offset
+    """
+
+    store['items_file'].flush()
+    store['records_file'].flush()
+    with open(os.path.join(store['path'], RECORDS_FILE), 'rb') as file:
+        file.seek(offset)
+        (length,) = _LENGTH.unpack(file.read(_LENGTH.size))
+        return decode_record(store, file.read(length))
+
+def iter_records(store):
+    """
+    Stream (offset, record) for every record in the store
+    """
+
+    store['records_file'].flush()
+    with open(os.path.join(store['path'], RECORDS_FILE), 'rb') as file:
+        while True:
+            offset = file.tell()
+            header = file.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                break
+            (length,) = _LENGTH.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                break   # Last record cut short by a crash - skip it
+            yield offset, decode_record(store, data)
+
+def migrate_saved_files(store, routines_dir="saved_routines", templates_dir="templates"):
+    """
+    Copy existing save_routine .txt files and save_routine_template .json
+    files into the store. Returns {filename: offset}
+    """
+
+    offsets = {}
+
+    for path in sorted(glob.glob(os.path.join(routines_dir, "routine_*.txt"))):
+        with open(path, 'r', encoding='utf-8') as file:
+            offsets[os.path.basename(path)] = add_text(store, file.read())
+
+    for path in sorted(glob.glob(os.path.join(templates_dir, "**", "*.json"), recursive=True)):
+        with open(path, 'r', encoding='utf-8') as file:
+            template_data = json.load(file)
+        routine = template_data.get('routine')
+        if isinstance(routine, dict):
+            offsets[os.path.basename(path)] = add_routine(store, routine)
+
+    return offsets
+
+def store_size(store):
+    """Bytes used on disk by the store"""
+
+    store['items_file'].flush()
+    store['records_file'].flush()
+    return sum(os.path.getsize(os.path.join(store['path'], name)) for name in (ITEMS_FILE, RECORDS_FILE))
+
+def benchmark_item_store(count=100000, path="itemstore_bench"):
+    """
+    Store many generated routines and compare size and read speed with JSON
+    """
+
+    import shutil
+    from planner import create_routines, make_generation_context
+    from user_input import GOAL_OPTIONS, FITNESS_LEVEL_OPTIONS
+
+    goals = [option['name'] for option in GOAL_OPTIONS.values()]
+    levels = [option['name'] for option in FITNESS_LEVEL_OPTIONS.values()]
+    profiles = ({
+        'name': 'Bench', 'age': 20 + i % 50, 'goal': goals[i % 6], 'time': 10 + i % 60,
+        'equipment': ['none'] if i % 2 else ['dumbbells', 'yoga_mat'],
+        'diet': 'vegetarian', 'fitness_level': levels[i % 3]
+    } for i in range(count))
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    store = open_item_store(path)
+    results = {}
+
+    try:
+        json_bytes = 0
+        start = time.perf_counter()
+        for user_data, routine in create_routines(profiles, make_generation_context()):
+            json_bytes += len(json.dumps(routine, ensure_ascii=False).encode('utf-8'))
+            add_routine(store, routine)
+        results['write_s'] = time.perf_counter() - start
+
+        results['json_mb'] = json_bytes / 1e6
+        results['dedup_mb'] = store_size(store) / 1e6
+        results['distinct_items'] = len(store['items'])
+
+        start = time.perf_counter()
+        read = sum(1 for _ in iter_records(store))
+        results['read_per_sec'] = read / (time.perf_counter() - start)
+
+    finally:
+        close_item_store(store)
+        shutil.rmtree(path)
+
+    return results
+
+if __name__ == "__main__":
+    # Usage: python itemstore.py [routine_count]
+    #        python itemstore.py migrate STORE_DIR   (copy saved files into a store)
+    if len(sys.argv) > 2 and sys.argv[1] == "migrate":
+        store = open_item_store(sys.argv[2])
+        try:
+            migrated = migrate_saved_files(store)
+            print(f"✅ Migrated {len(migrated):,} files | {len(store['items']):,} distinct items | "
+                  f"{store_size(store):,} bytes")
+        finally:
+            close_item_store(store)
+    else:
+        routine_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+        print(f"📦 Storing {routine_count:,} routines with item deduplication...")
+        for name, value in benchmark_item_store(routine_count).items():
+            print(f"   {name}: {value:,.2f}")
@@ -0,0 +1,300 @@
+# latency.py - HDR-style latency histograms with a Prometheus text dump
+# Each histogram is a fixed list of log-linear buckets (under 1% error
+# from 1 ns to ~18 minutes). Every thread counts into its own list, so
+# recording needs no lock; the lists are summed when metrics are read, and
+# a thread's list is folded into the histogram's base counts when it exits.
+# Dumps from several processes can be merged into one view
+
+import json
+import sys
+import threading
+import time
+import weakref
+
+# 2^SUB_BUCKET_BITS buckets per power of two below 2^SUB_BUCKET_BITS ns,
+# half that per power of two above it
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKETS = SUB_BUCKETS >> 1
+
+# Largest tracked value: 2^MAX_VALUE_BITS ns (~18 minutes); above is clamped
+MAX_VALUE_BITS = 40
+BUCKET_COUNT = (MAX_VALUE_BITS - SUB_BUCKET_BITS + 2) * HALF_SUB_BUCKETS
+
+# Per-thread list layout: BUCKET_COUNT counts, then the sum of values
+SUM_SLOT = BUCKET_COUNT
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+# name -> histogram, in creation order
+HISTOGRAMS = {}
+# Reentrant: a shard can be retired (see _new_shard) while this thread holds it
+_registry_lock = threading.RLock()
+
+def histogram(name, help_text=""):
+    """
+    The histogram called name, created on first use
+    name follows Prometheus rules (e.g. healthmate_create_routine_seconds)
+    """
+
+    with _registry_lock:
+        hist = HISTOGRAMS.get(name)
+        if hist is None:
+            hist = HISTOGRAMS[name] = _new_histogram(name, help_text)
+        return hist
+
+def _new_histogram(name, help_text):
+    """Histogram dictionary (not registered)"""
+    return {'name': name, 'help': help_text, 'local': threading.local(), 'shards': [], 'merged': None}
+
+def bucket_index(nanoseconds):
+    """Bucket of a value (see observe - same formula)"""
+
+    if nanoseconds < SUB_BUCKETS:
+        return max(nanoseconds, 0)
+    shift = nanoseconds.bit_length() - SUB_BUCKET_BITS
+    if shift > MAX_VALUE_BITS - SUB_BUCKET_BITS:
+        return BUCKET_COUNT - 1
+    return (shift << (SUB_BUCKET_BITS - 1)) + (nanoseconds >> shift)
+
+def bucket_value(index):
+    """Middle of a bucket's range in nanoseconds (reported for percentiles)"""
+
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    low = (index - (shift << (SUB_BUCKET_BITS - 1))) << shift
+    return low + ((1 << shift) >> 1)
+
+class _ShardOwner:
+    """Kept in a thread's local storage only - it is freed when the thread exits"""
+    __slots__ = ('__weakref__',)
+
+def _new_shard(hist):
+    """
+    Counting list for the calling thread
+    When the thread exits its counts move into hist['merged'], so processes
+    that start many short-lived threads don't keep one list per thread
+    """
+
+    local = hist['local']
+    counts = local.counts = [0] * (BUCKET_COUNT + 1)
+    local.owner = _ShardOwner()
+    weakref.finalize(local.owner, _retire_shard, hist, counts).atexit = False
+    with _registry_lock:
+        hist['shards'].append(counts)
+    return counts
+
+def _retire_shard(hist, counts):
+    """Fold an exited thread's counts into the base counts and drop its list"""
+
+    with _registry_lock:
+        if hist['merged'] is None:
+            hist['merged'] = [0] * (BUCKET_COUNT + 1)
+        merged = hist['merged']
+        for index, count in enumerate(counts):
+            if count:
+                merged[index] += count
+        hist['shards'].remove(counts)
+
+def observe(hist, nanoseconds):
+    """
+    Record one latency in nanoseconds, e.g.
+        started = time.perf_counter_ns()
+        ...
+        observe(hist, time.perf_counter_ns() - started)
+    """
+
+    try:
+        counts = hist['local'].counts
+    except AttributeError:
+        counts = _new_shard(hist)
+
+    # bucket_index inlined with the constants written out - this runs on
+    # every call (128 = SUB_BUCKETS, 7 = SUB_BUCKET_BITS, 33 = MAX_VALUE_BITS
+    # - SUB_BUCKET_BITS, 2239 = BUCKET_COUNT - 1, 2240 = SUM_SLOT)
+    if nanoseconds < 128:
+        index = nanoseconds if nanoseconds > 0 else 0
+    else:
+        shift = nanoseconds.bit_length() - 7
+        index = (shift << 6) + (nanoseconds >> shift) if shift <= 33 else 2239
+    counts[index] += 1
+    counts[2240] += nanoseconds
+
+def snapshot(hist):
+    """
+    Totals of every thread (plus merged dumps): (counts list, sum ns)
+    Threads keep recording while this runs; the result may miss a few
+    in-flight observations but never double counts
+    """
+
+    # Copied together, so a shard retired meanwhile is counted exactly once
+    with _registry_lock:
+        shards = list(hist['shards'])
+        totals = list(hist['merged']) if hist['merged'] is not None else [0] * (BUCKET_COUNT + 1)
+    for counts in shards:
+        for index, count in enumerate(counts):
+            if count:
+                totals[index] += count
+    return totals[:BUCKET_COUNT], totals[SUM_SLOT]
+
+def quantiles(counts, points=DEFAULT_QUANTILES):
+    """{quantile: nanoseconds} for bucket counts (None when empty)"""
+
+    total = sum(counts)
+    results = {}
+    if not total:
+        return {point: None for point in points}
+
+    targets = sorted(points)
+    seen = 0
+    position = 0
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        seen += count
+        while position < len(targets) and seen >= targets[position] * total:
+            results[targets[position]] = bucket_value(index)
+            position += 1
+        if position == len(targets):
+            break
+    return results
+
+def summary(hist, points=DEFAULT_QUANTILES):
+    """Count, sum, mean and quantiles (all in seconds) of one histogram"""
+
+    counts, total_ns = snapshot(hist)
+    count = sum(counts)
+    return {
+        'count': count,
+        'sum': total_ns / 1e9,
+        'mean': total_ns / count / 1e9 if count else None,
+        'quantiles': {point: (value / 1e9 if value is not None else None)
+                      for point, value in quantiles(counts, points).items()}
+    }
+
+def prometheus_text(points=DEFAULT_QUANTILES):
+    """Every histogram as a Prometheus summary (text exposition format)"""
+
+    lines = []
+    for name, hist in list(HISTOGRAMS.items()):
+        stats = summary(hist, points)
+        if hist['help']:
+            lines.append(f"# HELP {name} {hist['help']}")
+        lines.append(f"# TYPE {name} summary")
+        for point, value in stats['quantiles'].items():
+            lines.append(f'{name}{{quantile="{point}"}} {"NaN" if value is None else repr(value)}')
+        lines.append(f"{name}_sum {stats['sum']!r}")
+        lines.append(f"{name}_count {stats['count']}")
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path, points=DEFAULT_QUANTILES):
+    """Write prometheus_text to a file (e.g. for node_exporter's textfile collector)"""
+
+    from template_store import atomic_write_text
+    atomic_write_text(path, prometheus_text(points))
+
+def dump_histograms(path):
+    """
+    Save raw bucket counts (only non-empty buckets) so another process can
+    merge them - dump per worker, then merge_dumps in one place
+    """
+
+    from template_store import atomic_write_json
+
+    data = {}
+    for name, hist in list(HISTOGRAMS.items()):
+        counts, total_ns = snapshot(hist)
+        data[name] = {
+            'help': hist['help'],
+            'sum_ns': total_ns,
+            'buckets': {str(index): count for index, count in enumerate(counts) if count}
+        }
+    atomic_write_json(path, {'bucket_bits': SUB_BUCKET_BITS, 'histograms': data})
+
+def merge_dumps(paths):
+    """
+    Add dump_histograms files into this process's histograms
+    Bucket layouts always line up, so merged percentiles stay exact
+    """
+
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get('bucket_bits') != SUB_BUCKET_BITS:
+            raise ValueError(f"{path} uses a different bucket layout")
+
+        for name, entry in data['histograms'].items():
+            hist = histogram(name, entry.get('help', ""))
+            with _registry_lock:
+                if hist['merged'] is None:
+                    hist['merged'] = [0] * (BUCKET_COUNT + 1)
+                merged = hist['merged']
+                for index, count in entry['buckets'].items():
+                    merged[int(index)] += count
+                merged[SUM_SLOT] += entry['sum_ns']
+
+def serve_metrics(port=9464, host="127.0.0.1"):
+    """
+    Serve prometheus_text at http://host:port/metrics from a daemon thread
+    Returns the server (call shutdown() to stop it)
+    """
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes shouldn't print to the terminal
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def benchmark_observe(observations=1000000):
+    """
+    Cost of observe alone and of a timed call (two perf_counter_ns + observe)
+    Returns nanoseconds per observation
+    """
+
+    hist = _new_histogram('benchmark', "")
+    values = [(i * 7919) % 5000000 for i in range(1000)]
+
+    results = {}
+    start = time.perf_counter_ns()
+    for i in range(observations):
+        observe(hist, values[i % 1000])
+    results['observe_ns'] = (time.perf_counter_ns() - start) / observations
+
+    clock = time.perf_counter_ns
+    start = clock()
+    for i in range(observations):
+        started = clock()
+        observe(hist, clock() - started)
+    results['timed_observe_ns'] = (clock() - start) / observations
+
+    counts, total_ns = snapshot(hist)
+    results['recorded'] = sum(counts)
+    return results
+
+if __name__ == "__main__":
+    # Usage: python latency.py                      (observe overhead benchmark)
+    #        python latency.py merge OUT DUMP...    (merge worker dumps into a .prom file)
+    if len(sys.argv) > 3 and sys.argv[1] == "merge":
+        merge_dumps(sys.argv[3:])
+        write_prometheus(sys.argv[2])
+        print(f"✅ Merged {len(sys.argv) - 3} dumps into {sys.argv[2]}")
+    else:
+        print("⏱️ Measuring histogram overhead...")
+        for name, value in benchmark_observe().items():
+            print(f"   {name}: {value:,.1f}" if isinstance(value, float) else f"   {name}: {value:,}")
@@ -1,13 +1,16 @@
 # main.py - HealthMate Smart Daily Routine & Fitness Planner
 # This is the main controller file that runs everything
 
+import argparse
 import os
 import sys
-from datetime import datetime
+import time
 
 # Import our custom modules
+# Only what the first screen needs is imported here - planner, renderer,
+# storage and analytics are imported where they are first used, so the
+# CLI starts fast (see startup_check.py)
 from user_input import get_user_info
-from planner import create_routine
 from utils import show_welcome, show_goodbye, clear_screen
 
 def main():
@@ -16,6 +19,19 @@ def main():
     This function calls other modules in proper sequence
     """
 
+    # Keep running sessions while the user asks for a fresh start
+    # (a loop instead of recursion keeps the call stack flat)
+    while True:
+        result = run_session()
+        if result != 'restart':
+            break
+
+def run_session():
+    """
+    Run one complete HealthMate session from welcome to goodbye
+    Returns 'done', 'quit', 'restart' or 'eof' (input closed)
+    """
+
     try:
         # Clear screen for fresh start
         clear_screen()
@@ -30,14 +46,16 @@ def main():
         # Check if user wants to quit
         if user_data is None:
             print("\n👋 No worries! Come back anytime when you're ready.")
-            return
+            return 'quit'
 
         # Create personalized routine based on user input
         print("\n🎯 Creating your personalized routine...")
         print("⏳ Please wait a moment...")
 
-        # Generate the routine
-        routine = create_routine(user_data)
+        # Generate the routine (dates are worked out once for the session)
+        from planner import create_routine, make_generation_context
+        context = make_generation_context()
+        routine = create_routine(user_data, context)
 
         # Display the routine to user
         print("\n" + "="*50)
@@ -48,69 +66,106 @@ def main():
         display_routine(routine, user_data)
 
         # Ask if user wants to save or modify
-        handle_user_choice(routine, user_data)
+        if handle_user_choice(routine, user_data, context) == 'restart':
+            return 'restart'
 
         # Show goodbye message
         show_goodbye()
+        return 'done'
 
     except KeyboardInterrupt:
         # Handle when user presses Ctrl+C
         print("\n\n😊 Thanks for using HealthMate! Take care!")
         sys.exit(0)
 
+    except EOFError:
+        # Input stream closed - nothing more we can ask
+        return 'eof'
+
     except Exception as e:
         # Handle any unexpected errors gracefully
         print(f"\n❌ Oops! Something went wrong: {str(e)}")
         print("🔧 Don't worry, this happens sometimes. Please try again!")
 
         # Ask user if they want to restart
-        restart = input("\n🔄 Want to try again? (y/n): ").lower().strip()
+        try:
+            restart = input("\n🔄 Want to try again? (y/n): ").lower().strip()
+        except EOFError:
+            return 'eof'
         if restart == 'y' or restart == 'yes':
-            main()  # Restart the application
+            return 'restart'
+        return 'done'
 
-def display_routine(routine, user_data):
+def run_kiosk(max_sessions=None):
     """
-    Display the generated routine in a beautiful format
-    Makes it easy to read and follow
+    Serve HealthMate sessions one after another in a single process
+    Used for lobby kiosks that run all day - stack depth stays constant
+    and imported modules stay warm between visitors
+    Returns the list of per-session latencies in seconds
     """
 
-    print(f"\n👤 Hey {user_data['name']}! Here's your custom plan:")
-    print(f"🎯 Goal: {user_data['goal']}")
-    print(f"⏰ Daily Time: {user_data['time']} minutes")
-    print("\n" + "-"*40)
+    latencies = []
+
+    print("🖥️ HealthMate kiosk mode - press Ctrl+C to shut down")
+
+    try:
+        while max_sessions is None or len(latencies) < max_sessions:
+            started = time.perf_counter()
+            try:
+                result = run_session()
+            except SystemExit:
+                # Ctrl+C inside a session shuts the kiosk down
+                break
 
-    # Show morning routine
-    if 'morning' in routine:
-        print("\n🌅 MORNING ROUTINE:")
-        for item in routine['morning']:
-            print(f"   ✓ {item}")
+            # Input stream closed - nothing left to serve
+            if result == 'eof':
+                break
 
-    # Show workout routine
-    if 'workout' in routine:
-        print("\n💪 WORKOUT TIME:")
-        for item in routine['workout']:
-            print(f"   ✓ {item}")
+            elapsed = time.perf_counter() - started
+            latencies.append(elapsed)
+            print(f"⏱️ Session {len(latencies)} finished in {elapsed:.2f}s")
 
-    # Show meal suggestions
-    if 'meals' in routine:
-        print("\n🥗 MEAL SUGGESTIONS:")
-        for item in routine['meals']:
-            print(f"   ✓ {item}")
+    except (KeyboardInterrupt, EOFError):
+        pass
 
-    # Show evening routine
-    if 'evening' in routine:
-        print("\n🌙 EVENING ROUTINE:")
-        for item in routine['evening']:
-            print(f"   ✓ {item}")
+    # Show a short latency report when kiosk shuts down
+    if latencies:
+        average = sum(latencies) / len(latencies)
+        print(f"\n📊 Served {len(latencies)} sessions | "
+              f"avg {average:.2f}s | max {max(latencies):.2f}s")
 
-    # Show daily tip
-    if 'tip' in routine:
-        print(f"\n💡 TODAY'S TIP: {routine['tip']}")
+    return latencies
 
-def handle_user_choice(routine, user_data):
+def run_batch(count):
+    """
+    Generate routines for count synthetic sessions without any prompts
+    Same code path as real sessions (input validation + planner)
+    Returns the replay stats dictionary
+    """
+
+    # Only batch runs need the simulator
+    from simulate import replay_sessions, sample_transcripts
+
+    print(f"🏭 Generating routines for {count:,} sessions...")
+    stats = replay_sessions(sample_transcripts(count))
+    print(f"✅ {stats['completed']:,} routines | {stats['sessions_per_sec']:,.0f} sessions/second")
+    return stats
+
+def display_routine(routine, user_data):
+    """
+    Display the generated routine in a beautiful format
+    Makes it easy to read and follow
+    """
+
+    # Render everything into one string and print it in one go
+    from renderer import render_routine
+    print(render_routine(routine, user_data, 'display'), end='')
+
+def handle_user_choice(routine, user_data, context=None):
     """
     Handle what user wants to do after seeing their routine
     Options: save, modify, or just exit
+    Returns 'save', 'restart' or 'exit'
     """
 
     print("\n" + "-"*40)
@@ -124,31 +179,43 @@ def handle_user_choice(routine, user_data):
             choice = input("\n👉 Enter your choice (1/2/3): ").strip()
 
             if choice == '1':
-                save_routine(routine, user_data)
-                break
+                save_routine(routine, user_data, context)
+                return 'save'
             elif choice == '2':
                 print("\n🔄 Let's create a fresh routine for you!")
-                main()  # Restart the process
-                break
+                return 'restart'  # Caller starts a new session
             elif choice == '3':
                 print("\n✅ Perfect! Hope this routine helps you stay healthy!")
-                break
+                return 'exit'
             else:
                 print("❌ Please enter 1, 2, or 3 only!")
 
+        except EOFError:
+            raise
         except Exception as e:
             print(f"❌ Invalid input. Please try again!")
 
-def save_routine(routine, user_data):
+def save_routine(routine, user_data, context=None):
     """
     Save the generated routine to a file for future reference
     Creates a simple text file with user's routine
     """
 
+    from latency import observe
+    from planner import make_generation_context
+    from renderer import write_routines
+
+    latency = get_save_routine_latency()
+    started = time.perf_counter_ns()
     try:
-        # Create filename with current date and user name
-        current_date = datetime.now().strftime("%Y%m%d")
-        filename = f"routine_{user_data['name']}_{current_date}.txt"
+        if context is None:
+            context = make_generation_context()
+
+        # Create filename with user name, date and user ID - people who share
+        # a name get their own files; saving again the same day replaces the
+        # file (and the day's routine in the history database)
+        user_id = get_user_id(user_data)
+        filename = f"routine_{user_data['name']}_{context['file_date']}_{user_id[:8]}.txt"
 
         # Create routines folder if it doesn't exist
         if not os.path.exists("saved_routines"):
@@ -156,39 +223,148 @@ def save_routine(routine, user_data):
 
         filepath = os.path.join("saved_routines", filename)
 
-        # Write routine to file
-        with open(filepath, 'w', encoding='utf-8') as file:
-            file.write("🧠 HEALTHMATE - YOUR PERSONAL ROUTINE\n")
-            file.write("="*50 + "\n\n")
-            file.write(f"👤 Name: {user_data['name']}\n")
-            file.write(f"🎯 Goal: {user_data['goal']}\n")
-            file.write(f"⏰ Time Available: {user_data['time']} minutes\n")
-            file.write(f"📅 Created On: {datetime.now().strftime('%d %B %Y')}\n\n")
-
-            # Write each section
-            sections = ['morning', 'workout', 'meals', 'evening']
-            section_names = ['🌅 MORNING ROUTINE', '💪 WORKOUT TIME', '🥗 MEAL SUGGESTIONS', '🌙 EVENING ROUTINE']
-
-            for section, section_name in zip(sections, section_names):
-                if section in routine:
-                    file.write(f"{section_name}:\n")
-                    for item in routine[section]:
-                        file.write(f"  ✓ {item}\n")
-                    file.write("\n")
-
-            if 'tip' in routine:
-                file.write(f"💡 TODAY'S TIP: {routine['tip']}\n")
+        # Render the whole file in memory and write it in one go
+        write_routines(filepath, [(routine, user_data)], 'text', context['display_date'])
+
+        # Also keep the routine in the local database for history queries
+        record_routine_history(routine, user_data)
 
         print(f"\n✅ Routine saved successfully!")
         print(f"📁 File location: {filepath}")
         print("📝 You can open this file anytime to check your routine!")
 
     except Exception as e:
-        print(f"❌ Couldn't save the routine: {str(e)}")
+        from structured_log import log_error
+        log_error('save_routine_failed', f"❌ Couldn't save the routine: {str(e)}", error_type=type(e).__name__)
         print("🤷‍♂️ But don't worry, you can still follow the routine above!")
 
+    finally:
+        observe(latency, time.perf_counter_ns() - started)
+
+# Save latency histogram, created on the first save (latency.py stays off the first screen)
+_save_routine_latency = None
+
+def get_save_routine_latency():
+    """
+    Return the save_routine latency histogram, creating it on first use
+    """
+
+    global _save_routine_latency
+    if _save_routine_latency is None:
+        from latency import histogram
+        _save_routine_latency = histogram('healthmate_save_routine_seconds', "Time to save one routine (file + history)")
+    return _save_routine_latency
+
+# History database connection, opened once and kept warm across sessions
+_history_conn = None
+
+def get_history_store():
+    """
+    Return the shared history database connection, opening it on first use
+    """
+
+    global _history_conn
+    if _history_conn is None:
+        from storage import open_store
+        _history_conn = open_store()
+    return _history_conn
+
+def get_user_id(user_data):
+    """
+    Stable ID for this session's user - the stored one when they confirm
+    they've saved before (storage.find_returning_user), a new one otherwise
+    """
+
+    from storage import ensure_user_id
+
+    try:
+        return ensure_user_id(user_data, get_history_store(), confirm_returning_user)
+    except Exception:
+        # No history database - the file still gets saved under a new ID
+        return ensure_user_id(user_data)
+
+def confirm_returning_user(stored):
+    """
+    Ask whether a stored profile with the same name and a similar age is
+    this user - two people can share a name, so an ID is never reused unasked
+    """
+
+    goal = stored['goal'].replace('_', ' ') if stored['goal'] else 'no goal'
+    try:
+        answer = input(f"\n👋 Welcome back? Are you the {stored['name']} (age {stored['age']}, {goal}) "
+                       f"who saved a routine before? (y/n): ").lower().strip()
+    except EOFError:
+        return False
+    return answer in ('y', 'yes')
+
+def record_routine_history(routine, user_data):
+    """
+    Store profile and routine in the local SQLite history database
+    and append its summary to the analytics table
+    Failure here should never stop the text file from being saved
+    """
+
+    try:
+        from storage import save_user_routine
+        from analytics import append_to_saved_table, DEFAULT_TABLE_PATH
+
+        save_user_routine(get_history_store(), user_data, routine)
+        append_to_saved_table(DEFAULT_TABLE_PATH, [(routine, user_data)])
+    except Exception as e:
+        from structured_log import log_warning
+        log_warning('history_update_failed', f"⚠️ Could not update routine history: {str(e)}",
+                    error_type=type(e).__name__)
+
 # This is the entry point of our application
 # When someone runs this file, it will start here
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HealthMate - Smart Daily Routine & Fitness Planner")
+    parser.add_argument("--kiosk", action="store_true",
+                        help="serve sessions back to back without exiting (lobby kiosk mode)")
+    parser.add_argument("--batch", type=int, metavar="SESSIONS",
+                        help="generate routines for synthetic sessions instead of asking questions")
+    parser.add_argument("--profile-run", action="store_true",
+                        help="profile the run (cProfile + tracemalloc) and write reports")
+    parser.add_argument("--profile-dir", default="profile_reports",
+                        help="folder for --profile-run reports")
+    parser.add_argument("--profile-top", type=int, default=25, metavar="N",
+                        help="rows per --profile-run report")
+    parser.add_argument("--log-file", metavar="PATH",
+                        help="with --batch: JSON-lines log of errors and warnings (default: stderr)")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="write latency percentiles (Prometheus text format) here on exit")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve latency percentiles at http://127.0.0.1:PORT/metrics while running")
+    args = parser.parse_args()
+
     print("🚀 Starting HealthMate...")
-    main()
\ No newline at end of file
+    if args.batch:
+        workload = lambda: run_batch(args.batch)
+    elif args.kiosk:
+        workload = run_kiosk
+    else:
+        workload = main
+
+    if args.batch:
+        # Batch errors go to a structured, buffered log instead of the terminal
+        from structured_log import start_batch_logging, stop_batch_logging
+        start_batch_logging(args.log_file)
+
+    if args.metrics_port:
+        from latency import serve_metrics
+        serve_metrics(args.metrics_port)
+
+    try:
+        if args.profile_run:
+            # Imported only here - without the flag nothing is profiled or traced
+            from profiler import profile_run
+            profile_run(workload, args.profile_dir, args.profile_top)
+        else:
+            workload()
+    finally:
+        if args.batch:
+            stop_batch_logging()
+        if args.metrics_file:
+            from latency import write_prometheus
+            write_prometheus(args.metrics_file)
+            print(f"📈 Latency metrics written to {args.metrics_file}")
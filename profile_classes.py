@@ -0,0 +1,381 @@
+# profile_classes.py - Canonical profiles: one per class of profiles that get the same routine
+# The classes are derived, not written down: the thresholds, values and
+# equipment the rules compare (rule_engine.rule_dimensions of every section),
+# what the planner checks in code (planner.planner_dimensions) and which
+# catalog lists each diet ends up using. Those split profiles into cells;
+# cells whose rule sections come out the same are then merged, so two
+# profiles share a class exactly when they get the same routine.
+# Caches keyed on the class instead of raw user_data see far fewer profiles
+
+import random
+import sys
+import time
+from bisect import bisect_right
+
+# Stands for every goal / fitness level / diet nothing mentions - they all
+# behave the same ("" never names a rule value or catalog key)
+UNKNOWN = ""
+
+# Catalog prefixes whose keys name diets
+DIET_PREFIXES = ('breakfast/', 'lunch/', 'dinner/', 'post_workout/gain/')
+
+# Profile fields create_routine reads (the name isn't one of them)
+PROFILE_FIELDS = ('age', 'time', 'goal', 'fitness_level', 'diet', 'equipment')
+
+# Routine fields copied from the profile rather than planned from it
+ECHOED_FIELDS = ('user_goal', 'total_time', 'created_date')
+
+_classes = None
+
+def merge_dimensions(*dimension_sets):
+    """Union of several rule_dimensions results (same form)"""
+
+    numeric, values, members = {}, {}, {}
+    for dimensions in dimension_sets:
+        for fact, tests in dimensions['numeric'].items():
+            for test, thresholds in tests.items():
+                numeric.setdefault(fact, {}).setdefault(test, set()).update(thresholds)
+        for fact, known in dimensions['values'].items():
+            values.setdefault(fact, set()).update(known)
+        for fact, items in dimensions['members'].items():
+            members.setdefault(fact, set()).update(items)
+
+    return {
+        'numeric': {fact: {test: tuple(sorted(thresholds)) for test, thresholds in tests.items()}
+                    for fact, tests in numeric.items()},
+        'values': {fact: tuple(sorted(known)) for fact, known in values.items()},
+        'members': {fact: tuple(sorted(items)) for fact, items in members.items()}
+    }
+
+def _cuts(tests):
+    """
+    Whole numbers where some test changes its answer, sorted
+    at_least/below t flip at t, above t at t + 1 (ages and minutes are ints)
+    """
+
+    cuts = set()
+    for test, thresholds in tests.items():
+        cuts.update(threshold + 1 if test == 'above' else threshold for threshold in thresholds)
+    return tuple(sorted(cuts))
+
+def _diet_signatures(diet):
+    """
+    Contents of the lists a diet draws meals from: (all of them, the
+    breakfast/lunch/dinner and shared snack ones, the post-workout gain one)
+    Equal signatures, equal meals
+    """
+
+    from planner import _diet_list, _gain_list, _shared_list
+
+    def contents(items):
+        return tuple(items[index] for index in range(len(items)))
+
+    meals = (tuple(contents(_diet_list(meal, diet)) for meal in ('breakfast', 'lunch', 'dinner'))
+             + tuple(contents(_shared_list(name, diet)) for name in ('post_workout/other', 'evening_snack')))
+    gain = (contents(_gain_list(diet)),)
+    return meals + gain, meals, gain
+
+def build_profile_classes():
+    """
+    Work out the classes from the loaded rules, planner and catalog
+    Returns a dictionary used by profile_class / canonical_profile
+    """
+
+    from rule_engine import get_rules, section_dimensions
+    from planner import GAIN_GOALS, planner_dimensions
+    from shared_catalog import catalog_keys
+
+    own = planner_dimensions()
+    sections = tuple(get_rules()['sections'])
+    dimensions = merge_dimensions(own, *[section_dimensions(name) for name in sections])
+
+    # Diets are grouped by signature (whole, meals only, gain meal only),
+    # each group named by its first known diet - UNKNOWN (the catalog's
+    # fallbacks) only keeps its own name if no known diet behaves like it
+    diets = {'signatures': ({}, {}, {}), 'names': {}}
+    for diet in sorted({diet for prefix in DIET_PREFIXES for diet in catalog_keys(prefix)}) + [UNKNOWN]:
+        _diet_class(diet, diets)
+
+    equipment = dimensions['members'].get('equipment', ())
+
+    return {
+        'dimensions': dimensions,
+        'sections': sections,
+        'age': _cuts(dimensions['numeric'].get('age', {})),
+        'time': _cuts(dimensions['numeric'].get('time', {})),
+        'goal': frozenset(dimensions['values'].get('goal', ())),
+        'fitness_level': frozenset(dimensions['values'].get('fitness_level', ())),
+        'diets': diets,                 # diet -> class names (unknown diets added on first sight)
+        'gain_goals': frozenset(GAIN_GOALS),
+        'equipment': tuple((item, 1 << index) for index, item in enumerate(equipment)),
+        # Bands of the planner's own checks (meals, tips, time adjustment)
+        'planner_age': _cuts(own['numeric'].get('age', {})),
+        'planner_time': _cuts(own['numeric'].get('time', {})),
+        'classes': {},                  # cell -> class key
+        'keys': {}                      # class key -> itself (cells of a class share one key object)
+    }
+
+def get_profile_classes():
+    """build_profile_classes once per process"""
+
+    global _classes
+    if _classes is None:
+        _classes = build_profile_classes()
+    return _classes
+
+def _diet_class(diet, diets):
+    """(whole, meals only, gain meal only) class names of a diet, worked out on first sight"""
+
+    names = diets['names'].get(diet)
+    if names is None:
+        names = diets['names'][diet] = tuple(named.setdefault(signature, diet) for named, signature
+                                             in zip(diets['signatures'], _diet_signatures(diet)))
+    return names
+
+def profile_cell(user_data, classes=None):
+    """
+    Which cell of the derived dimensions a profile falls in:
+    (age band, time band, goal, fitness level, diet class, equipment bits)
+    Every profile in a cell plans exactly like canonical_profile
+    """
+
+    classes = classes or get_profile_classes()
+    goal = user_data['goal']
+    level = user_data['fitness_level']
+    equipment = user_data['equipment']
+
+    return (bisect_right(classes['age'], user_data['age']),
+            bisect_right(classes['time'], user_data['time']),
+            goal if goal in classes['goal'] else UNKNOWN,
+            level if level in classes['fitness_level'] else UNKNOWN,
+            _diet_class(user_data['diet'], classes['diets'])[0],
+            sum([bit for item, bit in classes['equipment'] if item in equipment]))
+
+def profile_class(user_data, classes=None):
+    """
+    Hashable key of a profile's class: profiles with equal keys get the same
+    routine (with the same random seed)
+    The key holds the rule sections themselves plus the goal, level, diet
+    lists and bands the planner checks in code, so cells only stay apart
+    where something planned differs; it is worked out once per cell
+    """
+
+    classes = classes or get_profile_classes()
+    cell = profile_cell(user_data, classes)
+    key = classes['classes'].get(cell)
+    if key is None:
+        key = classes['classes'][cell] = _class_key(cell, classes)
+    return key
+
+def _class_key(cell, classes):
+    """Class key for a cell (see profile_class)"""
+
+    from rule_engine import evaluate_section
+
+    facts = _cell_profile(cell, classes)
+    diet, meals_diet, gain_diet = _diet_class(facts['diet'], classes['diets'])
+    key = (tuple(tuple(evaluate_section(name, facts)) for name in classes['sections']),
+           bisect_right(classes['planner_age'], facts['age']),
+           bisect_right(classes['planner_time'], facts['time']),
+           facts['goal'], facts['fitness_level'], meals_diet,
+           # Only gain goals get the diet's post-workout meal
+           gain_diet if facts['goal'] in classes['gain_goals'] else None)
+    return classes['keys'].setdefault(key, key)
+
+def _band_value(cuts, band):
+    """Smallest whole number in a band (just below the first cut for band 0)"""
+    return cuts[band - 1] if band else cuts[0] - 1
+
+def canonical_profile(user_data, classes=None):
+    """
+    The one profile that stands for user_data's cell - create_routine gives
+    it the same sections and tip as user_data (with the same random seed)
+    Only the fields create_routine reads are kept
+    """
+
+    classes = classes or get_profile_classes()
+    return _cell_profile(profile_cell(user_data, classes), classes)
+
+def _cell_profile(cell, classes):
+    """The canonical profile of a cell"""
+
+    age_band, time_band, goal, level, diet, bits = cell
+    return {
+        'age': _band_value(classes['age'], age_band),
+        'time': _band_value(classes['time'], time_band),
+        'goal': goal,
+        'fitness_level': level,
+        'diet': diet,
+        'equipment': [item for item, bit in classes['equipment'] if bits & bit]
+    }
+
+def cell_count(classes=None):
+    """Number of cells possible (every combination of bands and values)"""
+
+    classes = classes or get_profile_classes()
+    return ((len(classes['age']) + 1) * (len(classes['time']) + 1)
+            * (len(classes['goal']) + 1) * (len(classes['fitness_level']) + 1)
+            * len({names[0] for names in classes['diets']['names'].values()}) * (1 << len(classes['equipment'])))
+
+def _planned_sections(user_data, context, seed):
+    """create_routine's output without the echoed fields, plus the time-adjusted version"""
+
+    from planner import adjust_routine_for_time, copy_routine, create_routine
+
+    random.seed(seed)
+    routine = create_routine(user_data, context)
+    planned = {name: value for name, value in routine.items() if name not in ECHOED_FIELDS}
+    # Callers may apply adjust_routine_for_time afterwards, so its bands count too
+    adjusted = adjust_routine_for_time(copy_routine(planned), user_data['time'])
+    return planned, adjusted
+
+def _boundary_values(classes):
+    """Values on both sides of every cut, every known value and one unknown value per field"""
+
+    from user_input import MAX_AGE, MAX_TIME, MIN_AGE, MIN_TIME
+
+    def around(cuts, low, high):
+        return sorted({low, high} | {value for cut in cuts for value in (cut - 1, cut, cut + 1)})
+
+    items = [item for item, bit in classes['equipment']]
+    return {
+        'age': around(classes['age'], MIN_AGE, MAX_AGE),
+        'time': around(classes['time'], MIN_TIME, MAX_TIME),
+        'goal': sorted(classes['goal']) + ['not_a_goal'],
+        'fitness_level': sorted(classes['fitness_level']) + ['not_a_level'],
+        'diet': sorted(classes['diets']['names']) + ['no_preference', 'not_a_diet'],
+        'equipment': [[], ['none'], ['kettlebell']] + [[item] for item in items]
+                     + [items, items[::2] + ['kettlebell'], items[1::2]]
+    }
+
+def check_equivalence(profiles, seed=7):
+    """
+    Plan every profile, its canonical profile and the first canonical
+    profile seen in its class with the same random seed and compare
+    everything planned (sections, meals, tip, time adjustment)
+    Also checks canonical profiles map to themselves
+    Returns (profiles checked, list of mismatching profiles)
+    """
+
+    from planner import make_generation_context
+
+    classes = get_profile_classes()
+    context = make_generation_context()
+    first_in_class = {}
+    checked = 0
+    mismatches = []
+
+    for number, user_data in enumerate(profiles):
+        canonical = canonical_profile(user_data, classes)
+        first = first_in_class.setdefault(profile_class(user_data, classes), canonical)
+        planned = _planned_sections(user_data, context, seed + number)
+        same = (planned == _planned_sections(canonical, context, seed + number)
+                and planned == _planned_sections(first, context, seed + number)
+                and canonical_profile(canonical, classes) == canonical
+                and profile_cell(canonical, classes) == profile_cell(user_data, classes))
+        if not same:
+            mismatches.append(user_data)
+        checked += 1
+
+    return checked, mismatches
+
+def boundary_profiles(count, seed=42):
+    """count profiles mixing values right at the class edges (see _boundary_values)"""
+
+    values = _boundary_values(get_profile_classes())
+    rng = random.Random(seed)
+    for _ in range(count):
+        user_data = {field: rng.choice(values[field]) for field in PROFILE_FIELDS}
+        user_data['name'] = 'Edge'
+        yield user_data
+
+def class_report(profiles):
+    """
+    How many distinct raw profiles, cells, classes and routines (one
+    planned per class, all with seed 0) a set of profiles has
+    Routines can only merge classes by chance picks of meals and tips
+    """
+
+    from planner import create_routine, make_generation_context
+
+    classes = get_profile_classes()
+    context = make_generation_context()
+    raw, cells, keys, outputs = set(), set(), set(), set()
+    count = 0
+    started = time.perf_counter()
+
+    for user_data in profiles:
+        count += 1
+        raw.add(tuple(tuple(sorted(user_data[field])) if field == 'equipment' else user_data[field]
+                      for field in PROFILE_FIELDS))
+        cells.add(profile_cell(user_data, classes))
+        key = profile_class(user_data, classes)
+        if key in keys:
+            continue
+        keys.add(key)
+        random.seed(0)
+        routine = create_routine(canonical_profile(user_data, classes), context)
+        outputs.add(tuple(tuple(value) if isinstance(value, list) else value
+                          for name, value in sorted(routine.items()) if name not in ECHOED_FIELDS))
+
+    return {
+        'profiles': count,
+        'distinct_profiles': len(raw),
+        'cells': len(cells),
+        'classes': len(keys),
+        'distinct_outputs_seed0': len(outputs),
+        'possible_cells': cell_count(classes),
+        'seconds': time.perf_counter() - started
+    }
+
+def benchmark_profile_class(count=200000, seed=42):
+    """Microseconds per profile_class and per canonical_profile call"""
+
+    from profilegen import generate_profiles
+
+    profiles = list(generate_profiles(count, seed))
+    classes = get_profile_classes()
+    results = {}
+
+    start = time.perf_counter()
+    for user_data in profiles:
+        profile_class(user_data, classes)
+    results['profile_class_us'] = (time.perf_counter() - start) / count * 1e6
+
+    start = time.perf_counter()
+    for user_data in profiles:
+        canonical_profile(user_data, classes)
+    results['canonical_profile_us'] = (time.perf_counter() - start) / count * 1e6
+
+    return results
+
+if __name__ == "__main__":
+    # Usage: python profile_classes.py [profiles] [edge profiles]
+    # Checks generated and edge-of-band profiles plan exactly like their
+    # canonical profile and the rest of their class, then reports how many
+    # classes the profiles fall into
+    from profilegen import generate_profiles
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    edges = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    classes = get_profile_classes()
+    print(f"📐 Ages split at {list(classes['age'])}, minutes at {list(classes['time'])}")
+    print(f"   diet classes: {dict(sorted((diet, names[0]) for diet, names in classes['diets']['names'].items()))}")
+    print(f"   equipment that matters: {[item for item, bit in classes['equipment']]}")
+
+    failed = False
+    for label, profiles in (("generated", generate_profiles(count, 42)), ("edge", boundary_profiles(edges))):
+        checked, mismatches = check_equivalence(profiles)
+        failed = failed or bool(mismatches)
+        print(f"{'❌' if mismatches else '✅'} {checked:,} {label} profiles plan like their canonical profile"
+              + (f" - {len(mismatches):,} mismatches, e.g. {mismatches[0]}" if mismatches else ""))
+
+    report = class_report(generate_profiles(count, 42))
+    print(f"📊 {report['profiles']:,} profiles | {report['distinct_profiles']:,} distinct"
+          f" | {report['cells']:,} cells | {report['classes']:,} classes"
+          f" | {report['distinct_outputs_seed0']:,} distinct routines (seed 0)"
+          f" | {report['possible_cells']:,} cells possible")
+    for name, value in benchmark_profile_class(count).items():
+        print(f"   {name}: {value:.2f}")
+    sys.exit(1 if failed else 0)
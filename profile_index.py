@@ -0,0 +1,158 @@
+# profile_index.py - Nearest stored routine for a profile
+# Profiles in the same class (profile_classes.py) get the same plan, so a
+# routine generated once can be reused for its neighbours instead of being
+# generated again. Lookups never leave the class, so a reused routine is
+# always one the planner would have produced
+
+import sys
+import time
+from array import array
+from bisect import bisect_left
+
+from profile_classes import profile_class
+
+# Default tolerances - neighbours within both count as a match
+DEFAULT_AGE_TOLERANCE = 2       # years
+DEFAULT_TIME_TOLERANCE = 5      # minutes
+
+# Age and time are packed into one sortable integer: age * TIME_SPAN + time
+# Keys of neighbouring ages stay > TIME_SPAN - MAX_TIME apart, far beyond any
+# sensible time tolerance
+TIME_SPAN = 1024
+
+def new_profile_index(age_tolerance=DEFAULT_AGE_TOLERANCE, time_tolerance=DEFAULT_TIME_TOLERANCE):
+    """
+    Empty index - a dictionary used by the other functions
+    Stored and looked-up profiles must be in the same class; the
+    tolerances then pick the nearest one within it
+    """
+
+    return {
+        'age_tolerance': age_tolerance,
+        'time_tolerance': time_tolerance,
+        'buckets': {},      # profile class -> (sorted packed age/time array, routines)
+        'size': 0,
+        'hits': 0,
+        'misses': 0
+    }
+
+def profile_key(user_data):
+    """Exact-match part of a profile - its class, so no rule or planner cut is crossed"""
+    return profile_class(user_data)
+
+def add_profile(index, user_data, routine):
+    """
+    Store the routine generated for a profile
+    A profile with the same age and time replaces the older routine
+    """
+
+    key = profile_key(user_data)
+    bucket = index['buckets'].get(key)
+    if bucket is None:
+        bucket = index['buckets'][key] = (array('I'), [])
+    packed_keys, routines = bucket
+
+    packed = user_data['age'] * TIME_SPAN + user_data['time']
+    position = bisect_left(packed_keys, packed)
+    if position < len(packed_keys) and packed_keys[position] == packed:
+        routines[position] = routine
+        return
+
+    packed_keys.insert(position, packed)
+    routines.insert(position, routine)
+    index['size'] += 1
+
+def find_nearest(index, user_data):
+    """
+    Closest stored profile within both tolerances
+    Distance is age and time difference, each scaled by its tolerance
+    Returns (routine, age, time) of the match, or None
+    """
+
+    bucket = index['buckets'].get(profile_key(user_data))
+    if bucket is None:
+        index['misses'] += 1
+        return None
+    packed_keys, routines = bucket
+
+    age, minutes = user_data['age'], user_data['time']
+    age_tolerance, time_tolerance = index['age_tolerance'], index['time_tolerance']
+    age_scale, time_scale = 1 / (age_tolerance or 1), 1 / (time_tolerance or 1)
+
+    count = len(packed_keys)
+    best = None
+    best_distance = None
+
+    # Same age first, then one year further out each step - stop once the
+    # age difference alone can't beat the best match
+    for step in range(age_tolerance + 1):
+        age_distance = step * age_scale
+        if best_distance is not None and age_distance >= best_distance:
+            break
+
+        for other_age in ((age,) if step == 0 else (age - step, age + step)):
+            # Keys of one age are a sorted run; the closest time is right
+            # before or at the insertion point of this profile's time
+            target = other_age * TIME_SPAN + minutes
+            position = bisect_left(packed_keys, target)
+            for candidate in (position - 1, position):
+                if 0 <= candidate < count:
+                    time_difference = abs(packed_keys[candidate] - target)
+                    if time_difference <= time_tolerance:
+                        distance = age_distance + time_difference * time_scale
+                        if best_distance is None or distance < best_distance:
+                            best, best_distance = candidate, distance
+
+    if best is None:
+        index['misses'] += 1
+        return None
+
+    index['hits'] += 1
+    packed = packed_keys[best]
+    return routines[best], packed // TIME_SPAN, packed % TIME_SPAN
+
+def index_stats(index):
+    """Entries, classes and hit rate so far"""
+
+    lookups = index['hits'] + index['misses']
+    return {
+        'entries': index['size'],
+        'classes': len(index['buckets']),
+        'hits': index['hits'],
+        'misses': index['misses'],
+        'hit_rate': index['hits'] / lookups if lookups else 0.0
+    }
+
+def benchmark_index(entries=1000000, queries=100000, seed=42):
+    """
+    Fill an index from synthetic profiles and time nearest lookups
+    Returns build time, microseconds per query and hit rate
+    """
+
+    from profilegen import generate_profiles
+
+    results = {}
+    index = new_profile_index()
+    routine = {'workout': []}  # Lookups never look inside the routine
+
+    start = time.perf_counter()
+    for user_data in generate_profiles(entries, seed):
+        add_profile(index, user_data, routine)
+    results['build_seconds'] = time.perf_counter() - start
+
+    lookups = list(generate_profiles(queries, seed + 1))
+    start = time.perf_counter()
+    for user_data in lookups:
+        find_nearest(index, user_data)
+    results['us_per_query'] = (time.perf_counter() - start) / queries * 1e6
+
+    results.update(index_stats(index))
+    return results
+
+if __name__ == "__main__":
+    # Usage: python profile_index.py [entries] [queries]
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    print(f"🧭 Nearest-profile lookups against {entries:,} stored profiles...")
+    for name, value in benchmark_index(entries, queries).items():
+        print(f"   {name}: {value:,.2f}" if isinstance(value, float) else f"   {name}: {value:,}")
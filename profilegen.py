@@ -0,0 +1,254 @@
+# profilegen.py - Seeded synthetic user profiles for load and scaling tests
+# Streams millions of realistic user_data profiles as NDJSON or CSV; every
+# profile passes user_input.validate_profile
+
+import argparse
+import json
+import random
+import sys
+import time
+from itertools import accumulate, combinations
+
+from user_input import (
+    EQUIPMENT_OPTIONS, MIN_AGE, MAX_AGE, MIN_TIME, MAX_TIME,
+    NAME_MAX_LENGTH, NAME_MIN_LENGTH, NAME_PATTERN,
+    VALID_DIETS, VALID_EQUIPMENT, VALID_FITNESS_LEVELS, VALID_GOALS, validate_profile
+)
+
+DEFAULT_BATCH_SIZE = 10000
+
+PROFILE_COLUMNS = ['name', 'age', 'goal', 'time', 'equipment', 'diet', 'fitness_level']
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Amit', 'Ananya', 'Anita', 'Arjun', 'Deepak', 'Divya', 'Farhan', 'Gaurav',
+    'Ishaan', 'Kavya', 'Kiran', 'Meera', 'Neha', 'Nikhil', 'Pooja', 'Priya', 'Rahul', 'Rajesh',
+    'Rohan', 'Sanjay', 'Sara', 'Shivam', 'Sneha', 'Sunita', 'Tanvi', 'Varun', 'Vikram', 'Zoya'
+]
+
+LAST_NAMES = [
+    'Agarwal', 'Bhat', 'Chopra', 'Das', 'Dubey', 'Gupta', 'Iyer', 'Joshi', 'Kapoor', 'Khan',
+    'Kumar', 'Mehta', 'Menon', 'Nair', 'Patel', 'Pillai', 'Rao', 'Reddy', 'Shah', 'Sharma',
+    'Singh', 'Verma'
+]
+
+# Weights are relative; age/time are [low, high, weight] bands (inclusive)
+# equipment_count 0 means bodyweight only ('none')
+DEFAULT_DISTRIBUTIONS = {
+    'age': [[14, 17, 5], [18, 29, 35], [30, 44, 30], [45, 59, 20], [60, 80, 10]],
+    'time': [[5, 15, 15], [16, 30, 35], [31, 60, 35], [61, 120, 12], [121, 180, 3]],
+    'goal': {'weight_loss': 30, 'weight_gain': 8, 'muscle_building': 20,
+             'general_fitness': 25, 'endurance': 10, 'flexibility': 7},
+    'equipment_count': {'0': 40, '1': 30, '2': 20, '3': 10},
+    'equipment_items': {'dumbbells': 30, 'resistance_bands': 25, 'pull_up_bar': 10, 'yoga_mat': 30,
+                        'jump_rope': 15, 'kettlebell': 8, 'treadmill': 8, 'bicycle': 10},
+    'diet': {'vegetarian': 35, 'vegan': 5, 'non_vegetarian': 35, 'jain': 5, 'keto': 5, 'no_preference': 15},
+    'fitness_level': {'beginner': 50, 'intermediate': 35, 'advanced': 15}
+}
+
+def _check_weights(field, weights, valid):
+    """Weights must name valid values and add up to something positive"""
+
+    unknown = [value for value in weights if value not in valid]
+    if unknown:
+        raise ValueError(f"{field}: invalid value {unknown[0]!r}")
+    if any(weight < 0 for weight in weights.values()) or sum(weights.values()) <= 0:
+        raise ValueError(f"{field}: weights must be >= 0 with a positive total")
+
+def _band_weights(field, bands, low, high):
+    """Spread each [low, high, weight] band evenly over its whole numbers"""
+
+    weights = {}
+    for band_low, band_high, weight in bands:
+        if band_low < low or band_high > high or band_low > band_high:
+            raise ValueError(f"{field}: band {band_low}-{band_high} must be inside {low}-{high}")
+        for value in range(band_low, band_high + 1):
+            weights[value] = weights.get(value, 0) + weight / (band_high - band_low + 1)
+    _check_weights(field, weights, range(low, high + 1))
+    return weights
+
+def _equipment_weights(counts, items):
+    """
+    Weight of every allowed equipment list
+    Each list size gets its equipment_count share, split between the lists
+    of that size by the product of their item weights
+    """
+
+    _check_weights('equipment_items', items, VALID_EQUIPMENT - {'none'})
+    order = [item for item in EQUIPMENT_OPTIONS.values() if items.get(item, 0) > 0]
+    weights = {}
+
+    for size, share in counts.items():
+        size = int(size)
+        if share <= 0:
+            continue
+        if size == 0:
+            weights[('none',)] = share
+            continue
+        if size > len(order):
+            raise ValueError(f"equipment_count: only {len(order)} items to pick from, not {size}")
+
+        products = {}
+        for combo in combinations(order, size):
+            product = 1
+            for item in combo:
+                product *= items[item]
+            products[combo] = product
+        total = sum(products.values())
+        for combo, product in products.items():
+            weights[combo] = share * product / total
+
+    if not weights:
+        raise ValueError("equipment_count: weights must have a positive total")
+    return weights
+
+def _choice_table(weights):
+    """(values, cumulative weights) ready for Random.choices"""
+
+    values = list(weights)
+    return values, list(accumulate(weights[value] for value in values))
+
+def build_distributions(overrides=None):
+    """
+    Check and compile distributions (DEFAULT_DISTRIBUTIONS with overrides
+    replacing whole keys). Raises ValueError for anything the prompts would
+    reject, so generated profiles are valid by construction
+    """
+
+    config = dict(DEFAULT_DISTRIBUTIONS)
+    config.update(overrides or {})
+
+    for field, valid in (('goal', VALID_GOALS), ('diet', VALID_DIETS), ('fitness_level', VALID_FITNESS_LEVELS)):
+        _check_weights(field, config[field], valid)
+
+    for first in FIRST_NAMES:
+        for last in LAST_NAMES:
+            name = f"{first} {last}"
+            if not (NAME_MIN_LENGTH <= len(name) <= NAME_MAX_LENGTH and NAME_PATTERN.match(name)):
+                raise ValueError(f"name: {name!r} would be rejected")
+
+    return {
+        'age': _choice_table(_band_weights('age', config['age'], MIN_AGE, MAX_AGE)),
+        'time': _choice_table(_band_weights('time', config['time'], MIN_TIME, MAX_TIME)),
+        'goal': _choice_table(config['goal']),
+        'equipment': _choice_table(_equipment_weights(config['equipment_count'], config['equipment_items'])),
+        'diet': _choice_table(config['diet']),
+        'fitness_level': _choice_table(config['fitness_level'])
+    }
+
+def load_distributions(path):
+    """Read distribution overrides from a JSON file and compile them"""
+
+    with open(path, 'r', encoding='utf-8') as file:
+        return build_distributions(json.load(file))
+
+def _column_batches(count, seed, distributions, batch_size):
+    """
+    Yield batches as columns (one list per field)
+    One Random.choices call per column keeps this fast and the sequence
+    depends only on seed, distributions and batch_size
+    """
+
+    rng = random.Random(seed)
+    tables = [distributions[field] for field in ('age', 'goal', 'time', 'equipment', 'diet', 'fitness_level')]
+
+    remaining = count
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        remaining -= size
+        firsts = rng.choices(FIRST_NAMES, k=size)
+        lasts = rng.choices(LAST_NAMES, k=size)
+        columns = [rng.choices(values, cum_weights=cumulative, k=size) for values, cumulative in tables]
+        yield [f"{first} {last}" for first, last in zip(firsts, lasts)], *columns
+
+def generate_profiles(count, seed=42, distributions=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream count user_data dictionaries, deterministic for a given seed
+    """
+
+    distributions = distributions or build_distributions()
+
+    for names, ages, goals, times, equipment, diets, levels in _column_batches(count, seed, distributions, batch_size):
+        for row in zip(names, ages, goals, times, equipment, diets, levels):
+            yield {
+                'name': row[0], 'age': row[1], 'goal': row[2], 'time': row[3],
+                'equipment': list(row[4]), 'diet': row[5], 'fitness_level': row[6]
+            }
+
+def write_profiles(file, count, seed=42, file_format='jsonl', distributions=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Write count profiles to an open text file as 'jsonl' (NDJSON) or 'csv'
+    Lines are built from pre-encoded pieces and written one batch at a time
+    Produces the same profiles as generate_profiles with the same arguments
+    Returns number of profiles written
+    """
+
+    distributions = distributions or build_distributions()
+
+    if file_format == 'csv':
+        file.write(",".join(PROFILE_COLUMNS) + "\n")
+        # Equipment uses the importer's "a;b" form; no value needs quoting
+        equipment_text = {combo: ";".join(combo) for combo in distributions['equipment'][0]}
+        line = "{},{},{},{},{},{},{}\n".format
+    else:
+        equipment_text = {combo: json.dumps(list(combo)) for combo in distributions['equipment'][0]}
+        line = ('{{"name": "{}", "age": {}, "goal": "{}", "time": {}, '
+                '"equipment": {}, "diet": "{}", "fitness_level": "{}"}}\n').format
+
+    written = 0
+    for names, ages, goals, times, equipment, diets, levels in _column_batches(count, seed, distributions, batch_size):
+        file.write("".join([
+            line(name, age, goal, minutes, equipment_text[combo], diet, level)
+            for name, age, goal, minutes, combo, diet, level in zip(names, ages, goals, times, equipment, diets, levels)
+        ]))
+        written += len(names)
+
+    return written
+
+def verify_profiles(profiles):
+    """
+    Run every profile through validate_profile
+    Returns (checked, first_error) - first_error is None when all pass
+    """
+
+    checked = 0
+    for profile in profiles:
+        checked += 1
+        user_data, errors = validate_profile(profile)
+        if errors:
+            return checked, (profile, errors)
+    return checked, None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic HealthMate profiles")
+    parser.add_argument("count", type=int, help="number of profiles")
+    parser.add_argument("output", nargs="?", default="-", help="output file or '-' for stdout")
+    parser.add_argument("--format", choices=['jsonl', 'csv'], help="default: from output name, else jsonl")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--config", help="JSON file overriding DEFAULT_DISTRIBUTIONS keys")
+    parser.add_argument("--verify", action="store_true", help="check every profile with validate_profile instead of writing")
+    args = parser.parse_args()
+
+    try:
+        distributions = load_distributions(args.config) if args.config else build_distributions()
+    except (OSError, ValueError) as e:
+        print(f"❌ Bad distribution config: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+
+    if args.verify:
+        checked, failure = verify_profiles(generate_profiles(args.count, args.seed, distributions))
+        if failure:
+            print(f"❌ Profile {checked:,} failed validation: {failure}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ {checked:,} profiles passed validation", file=sys.stderr)
+    else:
+        file_format = args.format or ('csv' if args.output.lower().endswith('.csv') else 'jsonl')
+        if args.output == '-':
+            written = write_profiles(sys.stdout, args.count, args.seed, file_format, distributions)
+        else:
+            with open(args.output, 'w', encoding='utf-8', newline='') as file:
+                written = write_profiles(file, args.count, args.seed, file_format, distributions)
+        elapsed = time.perf_counter() - start
+        print(f"✅ Wrote {written:,} profiles in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f}/second)",
+              file=sys.stderr)
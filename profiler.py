@@ -0,0 +1,135 @@
+# profiler.py - Profile a HealthMate workload with cProfile and tracemalloc
+# Used by main.py --profile-run; only imported when profiling is asked for,
+# so normal runs pay nothing
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+DEFAULT_REPORT_DIR = "profile_reports"
+
+HOTSPOTS_FILE = "hotspots.txt"
+ALLOCATIONS_FILE = "allocations.txt"
+COLLAPSED_FILE = "stacks.collapsed"
+
+# Frames kept per allocation traceback - tracemalloc's cost grows with this
+TRACE_FRAMES = 5
+
+# Stack sampling period for the collapsed-stack (flamegraph) file
+SAMPLE_INTERVAL = 0.005
+
+def _frame_label(code):
+    """'planner.py:create_routine' style label for a stack frame"""
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+def _sample_stacks(thread_id, samples, stop, interval):
+    """Sampler thread: record the profiled thread's stack until stopped"""
+
+    root = profile_run.__code__
+    while not stop.is_set():
+        frame = sys._current_frames().get(thread_id)
+        stack = []
+        # Walk up to (not including) profile_run so stacks start at the workload
+        while frame is not None and frame.f_code is not root:
+            stack.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        if stack and frame is not None:
+            samples[";".join(reversed(stack))] += 1
+        stop.wait(interval)
+
+def _write_hotspots(profiler, path, top):
+    """Sorted cProfile report - by own time, then by cumulative time"""
+
+    buffer = io.StringIO()
+    for title, sort_key in (("Own time (tottime)", 'tottime'), ("Cumulative time", 'cumulative')):
+        buffer.write(f"=== {title} - top {top} ===\n")
+        pstats.Stats(profiler, stream=buffer).strip_dirs().sort_stats(sort_key).print_stats(top)
+        buffer.write("\n")
+
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(buffer.getvalue())
+
+def _write_allocations(snapshot, peak, path, top):
+    """Top-N allocation sites, plus full tracebacks for the biggest few"""
+
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        tracemalloc.Filter(False, "<unknown>")
+    ])
+
+    lines = [f"Peak traced memory: {peak / 1024:,.1f} KiB", "", f"=== Top {top} allocation sites ==="]
+    by_line = snapshot.statistics('lineno')
+    for rank, stat in enumerate(by_line[:top], start=1):
+        frame = stat.traceback[0]
+        lines.append(f"{rank:>3}. {frame.filename}:{frame.lineno}  "
+                     f"{stat.size / 1024:,.1f} KiB in {stat.count:,} blocks")
+
+    lines.extend(["", "=== Biggest allocation tracebacks ==="])
+    for stat in snapshot.statistics('traceback')[:5]:
+        lines.append(f"{stat.size / 1024:,.1f} KiB in {stat.count:,} blocks")
+        lines.extend(f"    {line}" for line in stat.traceback.format())
+
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write("\n".join(lines) + "\n")
+
+def _write_collapsed(samples, path):
+    """One 'frame;frame;frame count' line per stack (flamegraph.pl, speedscope)"""
+
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write("".join(f"{stack} {count}\n" for stack, count in samples.most_common()))
+
+def profile_run(workload, report_dir=DEFAULT_REPORT_DIR, top=25, interval=SAMPLE_INTERVAL):
+    """
+    Run workload() under cProfile, tracemalloc and a stack sampler
+    Reports are written even if the workload raises or exits
+    Returns (workload result, {report name: path})
+    """
+
+    os.makedirs(report_dir, exist_ok=True)
+    paths = {
+        'hotspots': os.path.join(report_dir, HOTSPOTS_FILE),
+        'allocations': os.path.join(report_dir, ALLOCATIONS_FILE),
+        'collapsed': os.path.join(report_dir, COLLAPSED_FILE)
+    }
+
+    samples = Counter()
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_stacks, args=(threading.get_ident(), samples, stop, interval),
+                               daemon=True)
+
+    profiler = cProfile.Profile()
+    tracemalloc.start(TRACE_FRAMES)
+    sampler.start()
+    started = time.perf_counter()
+
+    try:
+        profiler.enable()
+        try:
+            result = workload()
+        finally:
+            profiler.disable()
+
+    finally:
+        elapsed = time.perf_counter() - started
+        stop.set()
+        sampler.join()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        _write_hotspots(profiler, paths['hotspots'], top)
+        _write_allocations(snapshot, peak, paths['allocations'], top)
+        _write_collapsed(samples, paths['collapsed'])
+
+        print(f"\n🔬 Profiled run took {elapsed:.2f}s (peak memory {peak / 1024:,.0f} KiB)", file=sys.stderr)
+        for name, path in paths.items():
+            print(f"   {name}: {path}", file=sys.stderr)
+
+    return result, paths
@@ -0,0 +1,268 @@
+# renderer.py - Render routines as text, JSON, CSV, Markdown or HTML
+# Each format is compiled once into templates; a routine (or many routines)
+# is rendered into one in-memory string and written with a single write
+
+import argparse
+import csv
+import html
+import io
+import json
+import time
+from datetime import datetime
+
+# Sections in display order with their headings
+SECTIONS = [
+    ('morning', '🌅 MORNING ROUTINE'),
+    ('workout', '💪 WORKOUT TIME'),
+    ('meals', '🥗 MEAL SUGGESTIONS'),
+    ('evening', '🌙 EVENING ROUTINE')
+]
+
+# Template based formats - every format fills in the same set of parts
+TEMPLATE_FORMATS = {
+    # Saved .txt file (same layout save_routine always used)
+    'text': {
+        'document_start': "",
+        'header': ("🧠 HEALTHMATE - YOUR PERSONAL ROUTINE\n" + "=" * 50 + "\n\n"
+                   "👤 Name: {name}\n"
+                   "🎯 Goal: {goal}\n"
+                   "⏰ Time Available: {time} minutes\n"
+                   "📅 Created On: {created_on}\n\n"),
+        'section': "{title}:\n{items}\n",
+        'item': "  ✓ {item}\n",
+        'tip': "💡 TODAY'S TIP: {tip}\n",
+        'routine_end': "",
+        'separator': "\n" + "-" * 50 + "\n\n",
+        'document_end': ""
+    },
+    # Terminal output shown right after a routine is created
+    'display': {
+        'document_start': "",
+        'header': ("\n👤 Hey {name}! Here's your custom plan:\n"
+                   "🎯 Goal: {goal}\n"
+                   "⏰ Daily Time: {time} minutes\n"
+                   "\n" + "-" * 40 + "\n"),
+        'section': "\n{title}:\n{items}",
+        'item': "   ✓ {item}\n",
+        'tip': "\n💡 TODAY'S TIP: {tip}\n",
+        'routine_end': "",
+        'separator': "\n",
+        'document_end': ""
+    },
+    'markdown': {
+        'document_start': "",
+        'header': ("# 🧠 HealthMate Routine - {name}\n\n"
+                   "- **Goal:** {goal}\n"
+                   "- **Time Available:** {time} minutes\n"
+                   "- **Created On:** {created_on}\n\n"),
+        'section': "## {title}\n\n{items}\n",
+        'item': "- [ ] {item}\n",
+        'tip': "> 💡 **Today's tip:** {tip}\n",
+        'routine_end': "",
+        'separator': "\n---\n\n",
+        'document_end': ""
+    },
+    'html': {
+        'document_start': ("<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n"
+                           "<meta charset=\"utf-8\">\n<title>HealthMate Routines</title>\n"
+                           "</head>\n<body>\n"),
+        'header': ("<article class=\"routine\">\n"
+                   "<h1>🧠 HealthMate Routine - {name}</h1>\n"
+                   "<ul class=\"profile\">\n"
+                   "<li>🎯 Goal: {goal}</li>\n"
+                   "<li>⏰ Time Available: {time} minutes</li>\n"
+                   "<li>📅 Created On: {created_on}</li>\n"
+                   "</ul>\n"),
+        'section': "<h2>{title}</h2>\n<ul>\n{items}</ul>\n",
+        'item': "<li>{item}</li>\n",
+        'tip': "<p class=\"tip\">💡 TODAY'S TIP: {tip}</p>\n",
+        'routine_end': "</article>\n",
+        'separator': "",
+        'document_end': "</body>\n</html>\n"
+    }
+}
+
+# Values that need escaping per format (identity for plain text formats)
+ESCAPERS = {
+    'html': html.escape
+}
+
+CSV_COLUMNS = ['name', 'goal', 'time', 'created_on', 'section', 'position', 'item']
+
+FORMATS = ['text', 'display', 'json', 'csv', 'markdown', 'html']
+
+FILE_EXTENSIONS = {
+    'text': '.txt', 'display': '.txt', 'json': '.json',
+    'csv': '.csv', 'markdown': '.md', 'html': '.html'
+}
+
+def _compile_template(parts):
+    """Bind every template string's format method once"""
+    return {name: text.format for name, text in parts.items()}
+
+# Compiled at import - rendering never re-parses template strings
+COMPILED_TEMPLATES = {name: _compile_template(parts) for name, parts in TEMPLATE_FORMATS.items()}
+
+def default_created_on():
+    """Date text used in rendered files, e.g. '05 March 2025'"""
+    return datetime.now().strftime('%d %B %Y')
+
+def _created_on_for(routine, created_on):
+    """Explicit date text wins, then the routine's own created_date, then today"""
+
+    if created_on:
+        return created_on
+    created_date = routine.get('created_date')
+    if created_date:
+        try:
+            return datetime.strptime(created_date[:10], "%Y-%m-%d").strftime('%d %B %Y')
+        except ValueError:
+            pass
+    return default_created_on()
+
+def _render_with_template(entries, file_format, created_on):
+    """Render (routine, user_data) pairs with a compiled template"""
+
+    template = COMPILED_TEMPLATES[file_format]
+    escape = ESCAPERS.get(file_format, str)
+    header, section, item, tip = template['header'], template['section'], template['item'], template['tip']
+    separator = template['separator']()
+    routine_end = template['routine_end']()
+
+    parts = [template['document_start']()]
+
+    for index, (routine, user_data) in enumerate(entries):
+        if index:
+            parts.append(separator)
+
+        parts.append(header(
+            name=escape(str(user_data['name'])),
+            goal=escape(str(user_data['goal'])),
+            time=escape(str(user_data['time'])),
+            created_on=escape(_created_on_for(routine, created_on))
+        ))
+
+        for key, title in SECTIONS:
+            if key in routine:
+                items = "".join([item(item=escape(str(entry))) for entry in routine[key]])
+                parts.append(section(title=title, items=items))
+
+        if 'tip' in routine:
+            parts.append(tip(tip=escape(str(routine['tip']))))
+
+        parts.append(routine_end)
+
+    parts.append(template['document_end']())
+    return "".join(parts)
+
+def _render_json(entries, created_on):
+    """Render pairs as one JSON array"""
+
+    documents = [{
+        'name': user_data['name'],
+        'goal': user_data['goal'],
+        'time': user_data['time'],
+        'created_on': _created_on_for(routine, created_on),
+        'routine': {key: routine[key] for key in ('morning', 'workout', 'meals', 'evening', 'tip') if key in routine}
+    } for routine, user_data in entries]
+
+    return json.dumps(documents, ensure_ascii=False, indent=2) + "\n"
+
+def _render_csv(entries, created_on):
+    """Render pairs as one CSV table with a row per routine item"""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(CSV_COLUMNS)
+
+    for routine, user_data in entries:
+        prefix = (user_data['name'], user_data['goal'], user_data['time'], _created_on_for(routine, created_on))
+        for key, title in SECTIONS:
+            if key in routine:
+                writer.writerows(prefix + (key, position, entry) for position, entry in enumerate(routine[key], start=1))
+        if 'tip' in routine:
+            writer.writerow(prefix + ('tip', 1, routine['tip']))
+
+    return buffer.getvalue()
+
+def render_routines(entries, file_format='text', created_on=None):
+    """
+    Render many (routine, user_data) pairs into one string
+    file_format is one of FORMATS; created_on overrides each routine's date
+    """
+
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format: {file_format}")
+
+    if file_format == 'json':
+        return _render_json(entries, created_on)
+    if file_format == 'csv':
+        return _render_csv(entries, created_on)
+    return _render_with_template(entries, file_format, created_on)
+
+def render_routine(routine, user_data, file_format='text', created_on=None):
+    """
+    Render one routine into a string
+    """
+    return render_routines([(routine, user_data)], file_format, created_on)
+
+def write_routines(path, entries, file_format='text', created_on=None):
+    """
+    Render routines and write them to path with a single write call
+    Returns number of characters written
+    """
+
+    content = render_routines(entries, file_format, created_on)
+    with open(path, 'w', encoding='utf-8') as file:
+        return file.write(content)
+
+def benchmark_renderer(count=10000):
+    """
+    Render the same generated routine many times in every format
+    Returns routines per second for each format
+    """
+
+    from planner import create_routine
+
+    user_data = {
+        'name': 'Bench', 'age': 30, 'goal': 'muscle_building', 'time': 45,
+        'equipment': ['dumbbells'], 'diet': 'vegetarian', 'fitness_level': 'intermediate'
+    }
+    entries = [(create_routine(user_data), user_data)] * count
+
+    results = {}
+    for file_format in FORMATS:
+        start = time.perf_counter()
+        render_routines(entries, file_format, created_on='01 January 2025')
+        results[file_format] = count / (time.perf_counter() - start)
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render saved HealthMate routines into one file")
+    parser.add_argument("output", nargs="?", help="output file")
+    parser.add_argument("--format", choices=FORMATS, default='text')
+    parser.add_argument("--user", help="only routines of this user ID")
+    parser.add_argument("--benchmark", type=int, metavar="ROUTINES", help="measure rendering throughput")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        for name, value in benchmark_renderer(args.benchmark).items():
+            print(f"   {name}: {value:,.0f} routines/second")
+    elif args.output:
+        from storage import open_store, iter_routines, get_user
+
+        conn = open_store()
+        users = {}
+        entries = []
+        for user_id, routine_date, routine in iter_routines(conn, user_id=args.user):
+            if user_id not in users:
+                users[user_id] = get_user(conn, user_id)
+            if users[user_id] is not None:
+                entries.append((routine, users[user_id]))
+        conn.close()
+
+        write_routines(args.output, entries, args.format)
+        print(f"✅ Wrote {len(entries):,} routines to {args.output}")
+    else:
+        parser.print_help()
@@ -0,0 +1,135 @@
+# routine_schema.py - Declarative routine schema compiled into a fast validator
+# Used by planner.validate_routine and for bulk ingestion of stored routines
+
+import sys
+import time
+
+# Each section: expected type, whether it must be present, whether it may be
+# empty, and (optionally) the type every list item must have
+ROUTINE_SCHEMA = {
+    'morning': {'type': list, 'required': True, 'non_empty': True},
+    'workout': {'type': list, 'required': True, 'non_empty': True},
+    'meals':   {'type': list, 'required': True, 'non_empty': True},
+    'evening': {'type': list, 'required': True, 'non_empty': True},
+    'tip':     {'type': str,  'required': True, 'non_empty': True}
+}
+
+# Stricter schema for third-party / historical routines we ingest in bulk
+INGEST_ROUTINE_SCHEMA = {
+    'morning':      {'type': list, 'required': True, 'non_empty': True, 'items': str},
+    'workout':      {'type': list, 'required': True, 'non_empty': True, 'items': str},
+    'meals':        {'type': list, 'required': True, 'non_empty': True, 'items': str},
+    'evening':      {'type': list, 'required': True, 'non_empty': True, 'items': str},
+    'tip':          {'type': str,  'required': True, 'non_empty': True},
+    'created_date': {'type': str,  'required': False},
+    'user_goal':    {'type': str,  'required': False},
+    'total_time':   {'type': int,  'required': False}
+}
+
+_MISSING = object()
+
+TYPE_NAMES = {list: 'list', str: 'string', int: 'number', dict: 'dictionary'}
+
+def compile_schema(schema):
+    """
+    Turn a declarative schema into a checker function
+    The checker is check(routine, first_error=False) and returns a list of
+    (section, reason) tuples - an empty list means the routine is valid
+    """
+
+    # Flatten the schema into plain tuples once so checking is a tight loop
+    rules = tuple(
+        (section,
+         spec['type'],
+         TYPE_NAMES.get(spec['type'], spec['type'].__name__),
+         spec.get('required', True),
+         spec.get('non_empty', False),
+         spec.get('items'))
+        for section, spec in schema.items()
+    )
+
+    def check(routine, first_error=False):
+        if not isinstance(routine, dict):
+            return [('routine', 'not a dictionary')]
+
+        errors = []
+        get = routine.get
+
+        for section, expected, type_name, required, non_empty, item_type in rules:
+            value = get(section, _MISSING)
+
+            if value is _MISSING:
+                if required:
+                    errors.append((section, 'missing'))
+                    if first_error:
+                        return errors
+                continue
+
+            if not isinstance(value, expected):
+                errors.append((section, f'expected {type_name}'))
+            elif non_empty and not value:
+                errors.append((section, 'empty'))
+            elif item_type is not None:
+                for position, item in enumerate(value):
+                    if not isinstance(item, item_type):
+                        errors.append((section, f'item {position} is not a {TYPE_NAMES.get(item_type, item_type.__name__)}'))
+                        break
+
+            if first_error and errors:
+                return errors
+
+        return errors
+
+    return check
+
+# Default checker used by planner.validate_routine
+check_routine = compile_schema(ROUTINE_SCHEMA)
+
+def validate_routines(routines, schema=None, first_error=False):
+    """
+    Check a whole batch of routines against a schema
+    Yields (index, errors) only for routines that failed
+    """
+
+    check = compile_schema(schema) if schema is not None else check_routine
+
+    for index, routine in enumerate(routines):
+        errors = check(routine, first_error)
+        if errors:
+            yield index, errors
+
+def benchmark_validation(count=1_000_000, schema=INGEST_ROUTINE_SCHEMA):
+    """
+    Measure validation throughput over many stored routines
+    About 1% of the routines are broken in different ways
+    Returns routines per second for full and first-error checking
+    """
+
+    from planner import create_routine
+
+    sample = create_routine({
+        'name': 'Bench', 'age': 30, 'goal': 'general_fitness', 'time': 30,
+        'equipment': ['none'], 'diet': 'vegetarian', 'fitness_level': 'intermediate'
+    })
+    broken = [
+        {key: value for key, value in sample.items() if key != 'meals'},
+        dict(sample, tip=''),
+        dict(sample, workout='push-ups'),
+        dict(sample, evening=['sleep', 42])
+    ]
+    routines = [broken[(i // 100) % 4] if i % 100 == 0 else sample for i in range(count)]
+
+    results = {}
+    for label, first_error in (('full_per_sec', False), ('first_error_per_sec', True)):
+        start = time.perf_counter()
+        failed = sum(1 for _ in validate_routines(routines, schema, first_error))
+        results[label] = count / (time.perf_counter() - start)
+    results['failed'] = failed
+
+    return results
+
+if __name__ == "__main__":
+    routine_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"📊 Validating {routine_count:,} routines...")
+    for name, value in benchmark_validation(routine_count).items():
+        print(f"   {name}: {value:,.0f}")
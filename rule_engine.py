@@ -0,0 +1,301 @@
+# rule_engine.py - Routine rules as data, compiled into decision tables
+# Rules live in routine_rules.json; each section is compiled once into a
+# table keyed by the few facts the rules actually look at
+# Workout steps name exercises by catalog ID (see exercise_catalog.py)
+
+import json
+import os
+import sys
+import time
+from bisect import bisect_left, bisect_right
+
+from exercise_catalog import get_catalog, exercise_name
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routine_rules.json")
+
+# Condition name -> (fact it reads, test)
+CONDITIONS = {
+    'time_at_least': ('time', 'at_least'),
+    'age_below': ('age', 'below'),
+    'age_above': ('age', 'above'),
+    'level': ('fitness_level', 'is'),
+    'level_in': ('fitness_level', 'in'),
+    'goal': ('goal', 'is'),
+    'goal_in': ('goal', 'in'),
+    'has_equipment': ('equipment', 'has'),
+    'has_any_equipment': ('equipment', 'has_any')
+}
+
+NUMERIC_TESTS = ('at_least', 'below', 'above')
+
+_rules = None
+_compiled = {}
+
+def _resolve_exercises(steps, catalog):
+    """Turn {"exercises": [IDs]} steps into plain items (in place)"""
+
+    for step in steps:
+        if 'exercises' in step:
+            step['items'] = step.get('items', []) + [exercise_name(exercise_id, catalog)
+                                                     for exercise_id in step.pop('exercises')]
+        _resolve_exercises(step.get('choose', []), catalog)
+        _resolve_exercises(step.get('steps', []), catalog)
+
+def load_rules(path=RULES_PATH, catalog=None):
+    """
+    Read the rule file - {"sections": {...}, "groups": {...}}
+    Exercise IDs are swapped for their catalog names once, here
+    """
+
+    with open(path, 'r', encoding='utf-8') as file:
+        rules = json.load(file)
+    rules.setdefault('groups', {})
+
+    catalog = catalog or get_catalog()
+    for steps in list(rules['sections'].values()) + list(rules['groups'].values()):
+        _resolve_exercises(steps, catalog)
+
+    return rules
+
+def get_rules():
+    """Rules from RULES_PATH, read on first use"""
+
+    global _rules
+    if _rules is None:
+        _rules = load_rules()
+    return _rules
+
+def _check_condition(condition, facts):
+    """Evaluate one rule condition against real fact values"""
+
+    for name, expected in condition.items():
+        if name == 'any':
+            if not any(_check_condition(option, facts) for option in expected):
+                return False
+            continue
+
+        fact, test = CONDITIONS[name]
+        value = facts[fact]
+        if test == 'at_least':
+            matched = value >= expected
+        elif test == 'below':
+            matched = value < expected
+        elif test == 'above':
+            matched = value > expected
+        elif test == 'is':
+            matched = value == expected
+        elif test == 'in':
+            matched = value in expected
+        elif test == 'has':
+            matched = expected in value
+        else:  # has_any
+            matched = any(item in value for item in expected)
+
+        if not matched:
+            return False
+
+    return True
+
+def _run_steps(steps, facts, groups, items):
+    """Interpret a list of steps, appending the chosen items"""
+
+    for step in steps:
+        if 'when' in step and not _check_condition(step['when'], facts):
+            continue
+
+        if 'choose' in step:
+            for option in step['choose']:
+                if 'when' not in option or _check_condition(option['when'], facts):
+                    _run_steps([{key: value for key, value in option.items() if key != 'when'}],
+                               facts, groups, items)
+                    break
+            continue
+
+        items.extend(step.get('items', []))
+        if 'steps' in step:
+            _run_steps(step['steps'], facts, groups, items)
+        if 'group' in step:
+            _run_steps(groups[step['group']], facts, groups, items)
+
+def interpret(steps, facts, groups=None):
+    """
+    Walk the rules directly (no table) - the reference the tables are filled from
+    """
+
+    items = []
+    _run_steps(steps, facts, groups or {}, items)
+    return items
+
+def _collect_condition(condition, dimensions):
+    """Record the thresholds / values / items a condition depends on"""
+
+    for name, expected in condition.items():
+        if name == 'any':
+            for option in expected:
+                _collect_condition(option, dimensions)
+            continue
+
+        if name not in CONDITIONS:
+            raise ValueError(f"Unknown rule condition: {name}")
+
+        fact, test = CONDITIONS[name]
+        if test in NUMERIC_TESTS:
+            dimensions['numeric'].setdefault(fact, {}).setdefault(test, set()).add(expected)
+        elif test in ('is', 'in'):
+            values = [expected] if test == 'is' else expected
+            dimensions['values'].setdefault(fact, set()).update(values)
+        else:
+            values = [expected] if test == 'has' else expected
+            dimensions['members'].setdefault(fact, set()).update(values)
+
+def _collect_steps(steps, groups, dimensions, seen):
+    """Walk steps (and any groups they use) collecting dimensions"""
+
+    for step in steps:
+        if 'when' in step:
+            _collect_condition(step['when'], dimensions)
+        for option in step.get('choose', []):
+            _collect_steps([option], groups, dimensions, seen)
+        if 'steps' in step:
+            _collect_steps(step['steps'], groups, dimensions, seen)
+        if 'group' in step:
+            name = step['group']
+            if name not in groups:
+                raise ValueError(f"Unknown rule group: {name}")
+            if name not in seen:
+                seen.add(name)
+                _collect_steps(groups[name], groups, dimensions, seen)
+
+def rule_dimensions(steps, groups=None):
+    """
+    Everything the rules can tell apart, as sorted tuples:
+    numeric   - {fact: {'at_least'|'below'|'above': thresholds}}
+    values    - {fact: compared values}  (goal, fitness_level)
+    members   - {fact: looked-up items}  (equipment)
+    Two fact sets that agree on all of these always get the same items
+    """
+
+    dimensions = {'numeric': {}, 'values': {}, 'members': {}}
+    _collect_steps(steps, groups or {}, dimensions, set())
+
+    return {
+        'numeric': {fact: {test: tuple(sorted(thresholds)) for test, thresholds in tests.items()}
+                    for fact, tests in dimensions['numeric'].items()},
+        'values': {fact: tuple(sorted(values)) for fact, values in dimensions['values'].items()},
+        'members': {fact: tuple(sorted(items)) for fact, items in dimensions['members'].items()}
+    }
+
+def _key_parts(dimensions):
+    """One small function per dimension, each turning facts into a key part"""
+
+    parts = []
+
+    for fact, tests in sorted(dimensions['numeric'].items()):
+        for test, thresholds in sorted(tests.items()):
+            # at_least/below flip once value reaches a threshold, above once it passes it
+            position = bisect_left if test == 'above' else bisect_right
+            parts.append(lambda facts, fact=fact, thresholds=thresholds, position=position:
+                         position(thresholds, facts[fact]))
+
+    for fact, values in sorted(dimensions['values'].items()):
+        known = frozenset(values)
+        # Values the rules never mention all behave the same
+        parts.append(lambda facts, fact=fact, known=known:
+                     facts[fact] if facts[fact] in known else None)
+
+    for fact, items in sorted(dimensions['members'].items()):
+        bits = tuple((item, 1 << index) for index, item in enumerate(items))
+        parts.append(lambda facts, fact=fact, bits=bits:
+                     sum([bit for item, bit in bits if item in facts[fact]]))
+
+    return parts
+
+def compile_rules(steps, groups=None):
+    """
+    Compile steps into evaluate(facts) -> list of items
+    The decision table is filled on first sight of each key, so evaluating
+    costs one key build and one dictionary lookup
+    """
+
+    groups = groups or {}
+    parts = _key_parts(rule_dimensions(steps, groups))
+    table = {}
+
+    def evaluate(facts):
+        key = tuple([part(facts) for part in parts])
+        items = table.get(key)
+        if items is None:
+            items = table[key] = tuple(interpret(steps, facts, groups))
+        return list(items)
+
+    evaluate.table = table
+    return evaluate
+
+def _compiled_rules(kind, name):
+    """Compiled evaluator for a section or group, built once"""
+
+    evaluate = _compiled.get((kind, name))
+    if evaluate is None:
+        rules = get_rules()
+        evaluate = _compiled[(kind, name)] = compile_rules(rules[kind][name], rules['groups'])
+    return evaluate
+
+def evaluate_section(name, facts):
+    """
+    Items for a routine section ('morning', 'workout', 'evening')
+    facts needs time, age, goal, equipment and fitness_level
+    """
+    return _compiled_rules('sections', name)(facts)
+
+def evaluate_group(name, facts):
+    """Items for a named rule group, e.g. 'weight_loss_workout'"""
+    return _compiled_rules('groups', name)(facts)
+
+def section_dimensions(name):
+    """rule_dimensions for one section of the loaded rules"""
+
+    rules = get_rules()
+    return rule_dimensions(rules['sections'][name], rules['groups'])
+
+def benchmark_rules(count=200000):
+    """
+    Compare table lookups with walking the rules for every profile
+    Returns sections per second for both
+    """
+
+    goals = ['weight_loss', 'weight_gain', 'muscle_building', 'endurance', 'flexibility', 'general_fitness']
+    levels = ['beginner', 'intermediate', 'advanced']
+    kits = [['none'], ['dumbbells'], ['treadmill', 'yoga_mat'], ['jump_rope', 'resistance_bands']]
+    profiles = [{
+        'age': 15 + i % 60, 'goal': goals[i % 6], 'time': 5 + i % 120,
+        'equipment': kits[i % 4], 'fitness_level': levels[i % 3]
+    } for i in range(1000)]
+
+    rules = get_rules()
+    sections = list(rules['sections'])
+    results = {}
+
+    start = time.perf_counter()
+    for i in range(count):
+        profile = profiles[i % 1000]
+        for section in sections:
+            interpret(rules['sections'][section], profile, rules['groups'])
+    results['interpreted'] = count * len(sections) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(count):
+        profile = profiles[i % 1000]
+        for section in sections:
+            evaluate_section(section, profile)
+    results['decision_table'] = count * len(sections) / (time.perf_counter() - start)
+
+    return results
+
+if __name__ == "__main__":
+    # Usage: python rule_engine.py [evaluations]
+    evaluations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print(f"📋 Evaluating rules for {evaluations:,} profiles...")
+    for name, value in benchmark_rules(evaluations).items():
+        print(f"   {name}: {value:,.0f} sections/second")
+    for section in get_rules()['sections']:
+        print(f"   {section}: {len(_compiled_rules('sections', section).table):,} table entries")
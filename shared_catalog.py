@@ -0,0 +1,217 @@
+# shared_catalog.py - Read-only planner catalogs shared between processes
+# Meal and tip lists (planner_catalog.json) can be packed once into a
+# memory-mapped file; every worker process maps the same pages and reads
+# items straight from them instead of holding its own copy
+
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+
+CATALOG_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "planner_catalog.json")
+
+# Set by the parent process; workers attach to this file on first use
+SHARED_CATALOG_ENV = "HEALTHMATE_SHARED_CATALOG"
+
+MAGIC = b"HMCAT001"
+_HEADER = struct.Struct('<8sII')   # magic, index length, item count
+
+_lists = None       # key -> sequence of strings (plain lists or mapped lists)
+_mapping = None     # keeps the shared file mapped while in use
+
+class _MappedList:
+    """Read-only sequence of strings stored in a shared mapping"""
+
+    __slots__ = ('_blob', '_offsets', '_start', '_count')
+
+    def __init__(self, blob, offsets, start, count):
+        self._blob = blob
+        self._offsets = offsets
+        self._start = start
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("catalog list index out of range")
+        position = self._start + index
+        return str(self._blob[self._offsets[position]:self._offsets[position + 1]], 'utf-8')
+
+def load_catalog_data(path=CATALOG_DATA_PATH):
+    """Catalog lists from JSON - {key: [text, ...]}"""
+
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)['lists']
+
+def pack_catalog(lists):
+    """
+    Serialize {key: [text, ...]} into one bytes block:
+    header | JSON index {key: [first item, count]} | item offsets | UTF-8 text
+    """
+
+    index = {}
+    encoded = []
+    for key, items in lists.items():
+        index[key] = [len(encoded), len(items)]
+        encoded.extend(item.encode('utf-8') for item in items)
+
+    offsets = array.array('I', [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    index_bytes = json.dumps(index).encode('utf-8')
+    # Offsets start 4-byte aligned so they can be read in place
+    padding = b"\0" * (-(_HEADER.size + len(index_bytes)) % 4)
+
+    return b"".join([_HEADER.pack(MAGIC, len(index_bytes) + len(padding), len(encoded)),
+                     index_bytes, padding, offsets.tobytes()] + encoded)
+
+def build_shared_catalog(path, lists=None):
+    """
+    Write the packed catalog to path (temp file + rename) for workers to map
+    Returns the number of bytes written
+    """
+
+    data = pack_catalog(lists if lists is not None else load_catalog_data())
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+    return len(data)
+
+def attach_shared_catalog(path):
+    """
+    Map a packed catalog file and serve catalog_list from it
+    Items are decoded from the shared pages on access; nothing is copied up front
+    """
+
+    global _lists, _mapping
+
+    with open(path, 'rb') as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, index_length, item_count = _HEADER.unpack_from(mapping, 0)
+    if magic != MAGIC:
+        mapping.close()
+        raise ValueError(f"{path} is not a packed HealthMate catalog")
+
+    view = memoryview(mapping)
+    index_start = _HEADER.size
+    offsets_start = index_start + index_length
+    blob_start = offsets_start + (item_count + 1) * 4
+
+    index = json.loads(bytes(view[index_start:offsets_start]).rstrip(b"\0"))
+    offsets = view[offsets_start:blob_start].cast('I')
+    blob = view[blob_start:]
+
+    _lists = {key: _MappedList(blob, offsets, start, count) for key, (start, count) in index.items()}
+    _mapping = mapping
+
+def catalog_list(key):
+    """
+    Sequence of strings for a catalog key (e.g. 'breakfast/vegan')
+    Uses the shared file named in HEALTHMATE_SHARED_CATALOG if set, else
+    loads planner_catalog.json into this process. Unknown keys give None
+    """
+
+    global _lists
+    if _lists is None:
+        shared_path = os.environ.get(SHARED_CATALOG_ENV)
+        if shared_path:
+            attach_shared_catalog(shared_path)
+        else:
+            _lists = load_catalog_data()
+    return _lists.get(key)
+
+def catalog_keys(prefix=""):
+    """Names after prefix of every catalog key starting with it, e.g. catalog_keys('tips/goal/')"""
+
+    catalog_list(prefix)    # Loads (or attaches) the catalog
+    return [key[len(prefix):] for key in _lists if key.startswith(prefix)]
+
+def _memory_usage():
+    """This process's memory in KiB from /proc (Linux) - Rss, Pss, Private"""
+
+    usage = {}
+    with open("/proc/self/smaps_rollup", 'r') as file:
+        for line in file:
+            name, _, value = line.partition(":")
+            if name in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                usage[name] = int(value.split()[0])
+    usage['Private'] = usage.pop('Private_Clean', 0) + usage.pop('Private_Dirty', 0)
+    return usage
+
+def _measure_worker(shared_path, routines, ready, release, results):
+    """Worker: generate routines, report memory while every worker is alive"""
+
+    if shared_path:
+        os.environ[SHARED_CATALOG_ENV] = shared_path
+    else:
+        os.environ.pop(SHARED_CATALOG_ENV, None)
+
+    from planner import create_routines, make_generation_context
+    from profilegen import generate_profiles
+
+    for _ in create_routines(generate_profiles(routines, seed=os.getpid()), make_generation_context()):
+        pass
+
+    ready.release()
+    release.wait()
+    results.put(_memory_usage())
+
+def measure_workers(workers=32, routines=2000, shared_path=None):
+    """
+    Start workers (fresh interpreters, like a process pool) that each generate
+    routines, then read their memory while all of them are running
+    Returns average Rss / Pss / Private KiB per worker
+    """
+
+    import multiprocessing
+
+    context = multiprocessing.get_context('spawn')
+    ready = context.Semaphore(0)
+    release = context.Event()
+    results = context.Queue()
+
+    processes = [context.Process(target=_measure_worker, args=(shared_path, routines, ready, release, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.acquire()
+
+    release.set()
+    usages = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    return {name: sum(usage[name] for usage in usages) / workers for name in usages[0]}
+
+if __name__ == "__main__":
+    # Usage: python shared_catalog.py [workers]      (memory per worker, Linux)
+    #        python shared_catalog.py build PATH     (pack the catalog file)
+    if len(sys.argv) > 2 and sys.argv[1] == "build":
+        size = build_shared_catalog(sys.argv[2])
+        print(f"✅ Packed catalog into {sys.argv[2]} ({size:,} bytes)")
+        print(f"   Set {SHARED_CATALOG_ENV}={sys.argv[2]} for worker processes")
+    else:
+        workers = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+        shared_path = "shared_catalog.bin"
+        build_shared_catalog(shared_path)
+
+        try:
+            print(f"🧮 Memory per worker with {workers} workers (KiB)")
+            for label, path in (("private catalogs", None), ("shared catalog", shared_path)):
+                usage = measure_workers(workers, shared_path=path)
+                print(f"   {label}: Rss {usage['Rss']:,.0f} | Pss {usage['Pss']:,.0f} | "
+                      f"Private {usage['Private']:,.0f}")
+        finally:
+            os.remove(shared_path)
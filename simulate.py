@@ -0,0 +1,124 @@
+# simulate.py - Replay recorded sessions headlessly as a load test
+# Drives the real user_input validation and planner code with scripted answers
+
+import json
+import random
+import sys
+import time
+
+from user_input import get_user_info, scripted_input, null_output
+from planner import create_routine, validate_routine, make_generation_context
+
+def load_transcripts(path):
+    """
+    Read recorded sessions from a JSONL file, one session per line
+    Each line is either a list of answers or {"answers": [...]}
+    Streams sessions so huge recordings don't need to fit in memory
+    """
+
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict):
+                record = record.get('answers', [])
+            yield record
+
+def sample_transcripts(count, seed=42):
+    """
+    Build realistic answer transcripts for benchmarking
+    Some sessions include typos so the validation retry paths are exercised
+    """
+
+    rng = random.Random(seed)
+    names = ['Shivam', 'Priya', 'Rajesh', 'Anita', 'Rahul', 'Meera', 'Arjun', 'Kavya']
+
+    for _ in range(count):
+        answers = []
+
+        # Name (sometimes with an invalid first attempt)
+        if rng.random() < 0.1:
+            answers.append("R2D2")
+        answers.append(rng.choice(names))
+
+        # Age (sometimes typed as words first)
+        if rng.random() < 0.1:
+            answers.append("twenty")
+        answers.append(str(rng.randint(14, 75)))
+
+        answers.append(str(rng.randint(1, 6)))       # goal
+        answers.append(str(rng.randint(5, 120)))     # time
+
+        # Equipment - either bodyweight only or a few items
+        if rng.random() < 0.4:
+            answers.append("9")
+        else:
+            picks = rng.sample(range(1, 9), rng.randint(1, 3))
+            answers.append(",".join(str(pick) for pick in picks))
+
+        answers.append(str(rng.randint(1, 6)))       # diet
+        answers.append(str(rng.randint(1, 3)))       # fitness level
+        answers.append("yes")                        # confirm
+
+        yield answers
+
+def replay_session(answers, say=null_output, context=None):
+    """
+    Run one recorded session through input collection and routine creation
+    Returns the routine, or None if the session quit or ran out of answers
+    """
+
+    try:
+        user_data = get_user_info(scripted_input(answers), say)
+    except EOFError:
+        return None
+
+    if user_data is None:
+        return None
+
+    return create_routine(user_data, context)
+
+def replay_sessions(transcripts, say=null_output):
+    """
+    Replay many sessions and measure throughput
+    Returns a stats dictionary with sessions/second
+    """
+
+    stats = {'sessions': 0, 'completed': 0, 'abandoned': 0, 'invalid_routines': 0}
+    start = time.perf_counter()
+    context = make_generation_context()  # One date for the whole replay
+
+    for answers in transcripts:
+        stats['sessions'] += 1
+        routine = replay_session(answers, say, context)
+
+        if routine is None:
+            stats['abandoned'] += 1
+        elif validate_routine(routine):
+            stats['completed'] += 1
+        else:
+            stats['invalid_routines'] += 1
+
+    elapsed = time.perf_counter() - start
+    stats['seconds'] = elapsed
+    stats['sessions_per_sec'] = stats['sessions'] / elapsed if elapsed > 0 else 0.0
+
+    return stats
+
+if __name__ == "__main__":
+    # Usage: python simulate.py [sessions.jsonl | session_count]
+    source = sys.argv[1] if len(sys.argv) > 1 else "20000"
+
+    if source.isdigit():
+        print(f"🧪 Replaying {int(source):,} synthetic sessions...")
+        transcripts = sample_transcripts(int(source))
+    else:
+        print(f"🧪 Replaying sessions from {source}...")
+        transcripts = load_transcripts(source)
+
+    results = replay_sessions(transcripts)
+    print(f"✅ {results['completed']:,} completed | {results['abandoned']:,} abandoned | "
+          f"{results['invalid_routines']:,} invalid")
+    print(f"⚡ {results['sessions_per_sec']:,.0f} sessions/second ({results['seconds']:.2f}s total)")
@@ -0,0 +1,89 @@
+# startup_check.py - Cold start budget check based on python -X importtime
+# Fails (exit code 1) when importing main.py gets slower than the budget or
+# pulls in modules that only later code paths need
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Median cumulative import time of main.py, in milliseconds
+DEFAULT_BUDGET_MS = 40.0
+
+DEFAULT_RUNS = 7
+
+# Must stay out of the first screen - each is imported on first use instead
+DEFERRED_MODULES = [
+    'planner', 'rule_engine', 'exercise_catalog', 'routine_schema', 'template_store',
+    'shared_catalog', 'profile_index', 'profile_classes', 'group_planner', 'latency', 'structured_log', 'renderer', 'storage', 'analytics', 'simulate', 'profiler',
+    'platform', 'json', 'datetime', 'sqlite3', 'multiprocessing', 'tempfile', 'mmap', 'asyncio'
+]
+
+def measure_import(module='main', cwd=None):
+    """
+    Import module once in a fresh interpreter with -X importtime
+    Returns {module name: (self_us, cumulative_us)}
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd or os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    )
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Header row
+        timings[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+
+    return timings
+
+def check_startup(budget_ms=DEFAULT_BUDGET_MS, runs=DEFAULT_RUNS, module='main'):
+    """
+    Measure cold import several times and compare against the budget
+    Returns a report dictionary - report['ok'] is False on a regression
+    """
+
+    samples = [measure_import(module) for _ in range(runs)]
+    median_ms = statistics.median(timings[module][1] for timings in samples) / 1000
+
+    loaded = set().union(*samples)
+    eager = [name for name in DEFERRED_MODULES if name in loaded]
+
+    # Slowest modules by cumulative time in the median-ish (last) run
+    slowest = sorted(samples[-1].items(), key=lambda item: item[1][1], reverse=True)[:10]
+
+    return {
+        'ok': median_ms <= budget_ms and not eager,
+        'median_ms': median_ms,
+        'budget_ms': budget_ms,
+        'eager_modules': eager,
+        'slowest': [(name, cumulative / 1000) for name, (own, cumulative) in slowest]
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check HealthMate cold start against a budget")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    args = parser.parse_args()
+
+    report = check_startup(args.budget_ms, args.runs)
+
+    print(f"⏱️ import main: {report['median_ms']:.1f} ms median of {args.runs} runs "
+          f"(budget {report['budget_ms']:.1f} ms)")
+    for name, cumulative_ms in report['slowest']:
+        print(f"   {cumulative_ms:7.1f} ms  {name}")
+
+    if report['eager_modules']:
+        print(f"❌ Imported at startup but should be deferred: {', '.join(report['eager_modules'])}")
+    if report['median_ms'] > report['budget_ms']:
+        print("❌ Cold start is over budget")
+
+    if not report['ok']:
+        sys.exit(1)
+    print("✅ Cold start within budget")
@@ -0,0 +1,380 @@
+# storage.py - Local SQLite store for user profiles and routine history
+# This module keeps profiles and saved routines in one queryable database
+
+import json
+import os
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import datetime
+
+# Default database location (next to saved_routines folder)
+DEFAULT_DB_PATH = os.path.join("saved_routines", "healthmate.db")
+
+# How many rows we send to SQLite in one executemany call
+DEFAULT_BATCH_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id       TEXT PRIMARY KEY,
+    name          TEXT NOT NULL,
+    age           INTEGER,
+    goal          TEXT,
+    time          INTEGER,
+    equipment     TEXT,
+    diet          TEXT,
+    fitness_level TEXT,
+    updated_at    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_users_goal ON users (goal);
+CREATE INDEX IF NOT EXISTS idx_users_name ON users (name COLLATE NOCASE);
+
+-- One routine per user per day: saving again on the same day replaces it
+CREATE TABLE IF NOT EXISTS routines (
+    user_id      TEXT NOT NULL,
+    routine_date TEXT NOT NULL,
+    created_date TEXT,
+    goal         TEXT,
+    total_time   INTEGER,
+    routine      TEXT NOT NULL,
+    PRIMARY KEY (user_id, routine_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_routines_date ON routines (routine_date);
+"""
+
+UPSERT_USER_SQL = """
+INSERT INTO users (user_id, name, age, goal, time, equipment, diet, fitness_level, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (user_id) DO UPDATE SET
+    name = excluded.name,
+    age = excluded.age,
+    goal = excluded.goal,
+    time = excluded.time,
+    equipment = excluded.equipment,
+    diet = excluded.diet,
+    fitness_level = excluded.fitness_level,
+    updated_at = excluded.updated_at
+"""
+
+UPSERT_ROUTINE_SQL = """
+INSERT INTO routines (user_id, routine_date, created_date, goal, total_time, routine)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (user_id, routine_date) DO UPDATE SET
+    created_date = excluded.created_date,
+    goal = excluded.goal,
+    total_time = excluded.total_time,
+    routine = excluded.routine
+"""
+
+def open_store(db_path=DEFAULT_DB_PATH):
+    """
+    Open (and create if needed) the HealthMate database
+    Returns a sqlite3 connection with the schema ready
+    """
+
+    # Create parent folder if it doesn't exist
+    folder = os.path.dirname(db_path)
+    if db_path != ":memory:" and folder and not os.path.exists(folder):
+        os.makedirs(folder)
+
+    conn = sqlite3.connect(db_path)
+
+    # WAL keeps readers unblocked while a bulk upsert is running
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    conn.commit()
+
+    return conn
+
+def new_user_id():
+    """
+    Create a unique user ID so two users with the same name never collide
+    """
+    return uuid.uuid4().hex
+
+def find_returning_user(conn, user_data):
+    """
+    Stored profile of someone who may be the same person: same name (any
+    case) and an age at most a year apart (a birthday since last time)
+    The most recently updated one wins; None if nobody matches
+    Different people can match too - only reuse the ID once the user confirms
+    """
+
+    row = conn.execute(
+        "SELECT user_id, name, age, goal, time, equipment, diet, fitness_level "
+        "FROM users WHERE name = ? COLLATE NOCASE AND age BETWEEN ? AND ? "
+        "ORDER BY updated_at DESC LIMIT 1",
+        (user_data['name'], user_data['age'] - 1, user_data['age'] + 1)
+    ).fetchone()
+
+    return _user_from_row(row) if row else None
+
+def ensure_user_id(user_data, conn=None, confirm=None):
+    """
+    Make sure user_data has a 'user_id' key and return it
+    With conn and confirm, a possible returning user (find_returning_user)
+    is passed to confirm(stored_user_data); their stored ID is reused only
+    when it returns True, so their history keeps adding up across sessions
+    Otherwise the user gets a new ID
+    """
+
+    if not user_data.get('user_id'):
+        match = find_returning_user(conn, user_data) if conn is not None and confirm is not None else None
+        user_data['user_id'] = match['user_id'] if match and confirm(match) else new_user_id()
+    return user_data['user_id']
+
+def _profile_row(user_data, updated_at):
+    """Convert a user_data dictionary into a users table row"""
+
+    return (
+        user_data['user_id'],
+        user_data['name'],
+        user_data.get('age'),
+        user_data.get('goal'),
+        user_data.get('time'),
+        json.dumps(user_data.get('equipment', [])),
+        user_data.get('diet'),
+        user_data.get('fitness_level'),
+        updated_at
+    )
+
+def _routine_row(user_id, routine):
+    """Convert a routine dictionary into a routines table row"""
+
+    created_date = routine.get('created_date') or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    return (
+        user_id,
+        created_date[:10],  # YYYY-MM-DD part is the routine date
+        created_date,
+        routine.get('user_goal'),
+        routine.get('total_time'),
+        json.dumps(routine, ensure_ascii=False)
+    )
+
+def _chunks(rows, batch_size):
+    """Yield lists of at most batch_size rows from any iterable"""
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def upsert_profiles(conn, profiles, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert or update many user profiles in a single transaction
+    Every profile must already have a 'user_id'
+    Returns number of rows written
+    """
+
+    updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    rows = (_profile_row(profile, updated_at) for profile in profiles)
+    count = 0
+
+    # One transaction for the whole batch - much faster than commit per row
+    with conn:
+        for batch in _chunks(rows, batch_size):
+            conn.executemany(UPSERT_USER_SQL, batch)
+            count += len(batch)
+
+    return count
+
+def upsert_routines(conn, entries, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert or update many routines in a single transaction
+    entries is an iterable of (user_id, routine) pairs
+    Returns number of rows written
+    """
+
+    rows = (_routine_row(user_id, routine) for user_id, routine in entries)
+    count = 0
+
+    with conn:
+        for batch in _chunks(rows, batch_size):
+            conn.executemany(UPSERT_ROUTINE_SQL, batch)
+            count += len(batch)
+
+    return count
+
+def save_user_routine(conn, user_data, routine):
+    """
+    Save one user's profile and routine together
+    A routine saved earlier the same day for this user is replaced
+    Returns the user_id used (a new one if user_data has none)
+    """
+
+    user_id = ensure_user_id(user_data)
+    upsert_profiles(conn, [user_data])
+    upsert_routines(conn, [(user_id, routine)])
+    return user_id
+
+def _user_from_row(row):
+    """Convert a users table row back into a user_data dictionary"""
+
+    return {
+        'user_id': row[0],
+        'name': row[1],
+        'age': row[2],
+        'goal': row[3],
+        'time': row[4],
+        'equipment': json.loads(row[5]) if row[5] else [],
+        'diet': row[6],
+        'fitness_level': row[7]
+    }
+
+def get_user(conn, user_id):
+    """
+    Get one user profile by ID
+    Returns user_data dictionary or None if not found
+    """
+
+    row = conn.execute(
+        "SELECT user_id, name, age, goal, time, equipment, diet, fitness_level "
+        "FROM users WHERE user_id = ?", (user_id,)
+    ).fetchone()
+
+    return _user_from_row(row) if row else None
+
+def get_users_by_goal(conn, goal, limit=None):
+    """
+    Get all users with a given fitness goal
+    Uses the goal index so it stays fast with millions of users
+    """
+
+    sql = ("SELECT user_id, name, age, goal, time, equipment, diet, fitness_level "
+           "FROM users WHERE goal = ? ORDER BY user_id")
+    params = [goal]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    return [_user_from_row(row) for row in conn.execute(sql, params)]
+
+def get_last_routines(conn, user_id, n=7):
+    """
+    Get the last N routines for a user, newest first
+    Served straight from the (user_id, routine_date) primary key
+    """
+
+    rows = conn.execute(
+        "SELECT routine FROM routines WHERE user_id = ? "
+        "ORDER BY routine_date DESC LIMIT ?", (user_id, n)
+    )
+
+    return [json.loads(row[0]) for row in rows]
+
+def iter_routines(conn, user_id=None, start_date=None, end_date=None):
+    """
+    Stream (user_id, routine_date, routine) for routines matching the filters
+    Dates are 'YYYY-MM-DD' strings and both ends are inclusive
+    """
+
+    sql = "SELECT user_id, routine_date, routine FROM routines"
+    conditions = []
+    params = []
+
+    if user_id is not None:
+        conditions.append("user_id = ?")
+        params.append(user_id)
+    if start_date is not None:
+        conditions.append("routine_date >= ?")
+        params.append(start_date)
+    if end_date is not None:
+        conditions.append("routine_date <= ?")
+        params.append(end_date)
+
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY user_id, routine_date"
+
+    # Cursor iteration keeps only one row in memory at a time
+    for row in conn.execute(sql, params):
+        yield row[0], row[1], json.loads(row[2])
+
+# Benchmark helpers - run "python storage.py [rows]" to measure at scale
+
+def benchmark_store(rows=1_000_000, db_path="healthmate_bench.db", batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Measure bulk upsert and query speed with the given number of rows
+    Writes to a throwaway database file which is removed afterwards
+    """
+
+    goals = ['weight_loss', 'weight_gain', 'muscle_building', 'general_fitness', 'endurance', 'flexibility']
+    levels = ['beginner', 'intermediate', 'advanced']
+    users_count = max(1, rows // 10)  # Ten days of history per user
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    conn = open_store(db_path)
+    results = {}
+
+    try:
+        user_ids = [f"user{i:08d}" for i in range(users_count)]
+        profiles = ({
+            'user_id': user_ids[i],
+            'name': f"User {i}",
+            'age': 18 + i % 60,
+            'goal': goals[i % len(goals)],
+            'time': 10 + i % 50,
+            'equipment': ['none'],
+            'diet': 'vegetarian',
+            'fitness_level': levels[i % len(levels)]
+        } for i in range(users_count))
+
+        start = time.perf_counter()
+        upsert_profiles(conn, profiles, batch_size)
+        results['profile_upsert_per_sec'] = users_count / (time.perf_counter() - start)
+
+        routine = {
+            'morning': ["🌅 Wake up 15 minutes earlier than usual"],
+            'workout': ["🔥 Warm-up: 3 minutes light movement"],
+            'meals': ["💧 Drink 8-10 glasses of water throughout the day"],
+            'evening': ["😴 Get 7-8 hours of quality sleep"],
+            'tip': "Health is a journey, not a destination.",
+            'user_goal': 'general_fitness',
+            'total_time': 30
+        }
+
+        def entries():
+            for i in range(rows):
+                day = i // users_count
+                entry = dict(routine)
+                entry['created_date'] = f"2025-01-{day % 28 + 1:02d} 08:00:00"
+                yield user_ids[i % users_count], entry
+
+        start = time.perf_counter()
+        upsert_routines(conn, entries(), batch_size)
+        results['routine_upsert_per_sec'] = rows / (time.perf_counter() - start)
+
+        # Query benchmarks
+        queries = min(1000, users_count)
+        start = time.perf_counter()
+        for i in range(queries):
+            get_last_routines(conn, user_ids[(i * 7919) % users_count], 5)
+        results['last_n_query_us'] = (time.perf_counter() - start) / queries * 1e6
+
+        start = time.perf_counter()
+        get_users_by_goal(conn, 'endurance', limit=1000)
+        results['goal_query_ms'] = (time.perf_counter() - start) * 1000
+
+    finally:
+        conn.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    return results
+
+if __name__ == "__main__":
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"📊 Benchmarking HealthMate store with {row_count:,} routine rows...")
+    for name, value in benchmark_store(row_count).items():
+        print(f"   {name}: {value:,.1f}")
@@ -0,0 +1,195 @@
+# structured_log.py - Leveled, structured error reporting for the generators
+# Interactive runs print every message exactly as before. Batch runs switch
+# to JSON lines: the generator only appends to an in-memory queue and a
+# background thread formats and writes whole batches to the log file
+
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+
+# Batch writer wakes up this often, or sooner once this many events wait
+FLUSH_SECONDS = 0.2
+FLUSH_EVENTS = 5000
+
+_state = {
+    'mode': 'console',      # 'console' prints messages, 'batch' queues events
+    'level': LEVELS['info'],
+    'queue': deque(),       # (time, level, event, message, fields) waiting to be written
+    'writer': None
+}
+
+def log_event(level, event, message, **fields):
+    """
+    Report something that happened while generating routines
+    level: 'debug', 'info', 'warning' or 'error'; event: short machine name
+    (e.g. 'create_routine_failed'); message: the text people read
+    fields: extra values for the JSON line in batch mode
+    """
+
+    if LEVELS[level] < _state['level']:
+        return
+    if _state['mode'] == 'console':
+        print(message)
+        return
+
+    # deque.append is atomic - no lock even with several generator threads
+    _state['queue'].append((time.time(), level, event, message, fields))
+    writer = _state['writer']
+    if writer is not None and len(_state['queue']) >= FLUSH_EVENTS:
+        writer['wake'].set()
+
+def log_error(event, message, **fields):
+    """log_event at error level"""
+    log_event('error', event, message, **fields)
+
+def log_warning(event, message, **fields):
+    """log_event at warning level"""
+    log_event('warning', event, message, **fields)
+
+# One encoder for every line - building one per json.dumps call costs more
+# than encoding a short string
+_encode = json.JSONEncoder(ensure_ascii=False, default=str).encode
+
+def format_event(created, level, event, message, fields):
+    """
+    One JSON line for a queued event
+    Level, event and field names come from our own code, so only values
+    need encoding
+    """
+
+    line = f'{{"time": {created:.6f}, "level": "{level}", "event": "{event}", "message": {_encode(message)}'
+    for name, value in fields.items():
+        line += f', "{name}": {_encode(value)}'
+    return line + "}\n"
+
+def _write_queued(writer):
+    """Write everything queued so far in one go"""
+
+    events = _state['queue']
+    lines = []
+    while events:
+        lines.append(format_event(*events.popleft()))
+    if lines:
+        writer['stream'].write("".join(lines))
+        writer['stream'].flush()
+        writer['written'] += len(lines)
+
+def _writer_loop(writer):
+    """Background thread: drain the queue until stopped"""
+
+    while not writer['stop']:
+        writer['wake'].wait(FLUSH_SECONDS)
+        writer['wake'].clear()
+        _write_queued(writer)
+
+def start_batch_logging(path=None, level='info'):
+    """
+    Switch to batch mode: events become JSON lines in path (stderr if None)
+    stop_batch_logging writes what's left and goes back to printing
+    """
+
+    stop_batch_logging()
+
+    if path is None:
+        stream, owned = sys.stderr, False
+    else:
+        stream, owned = open(path, 'a', encoding='utf-8'), True
+
+    writer = {'stream': stream, 'owned': owned, 'wake': threading.Event(), 'stop': False, 'written': 0}
+    writer['thread'] = threading.Thread(target=_writer_loop, args=(writer,), daemon=True)
+    writer['thread'].start()
+
+    _state['writer'] = writer
+    _state['level'] = LEVELS[level]
+    _state['mode'] = 'batch'
+
+def stop_batch_logging():
+    """
+    Write out everything queued and switch back to console mode
+    Returns the number of events written (0 if batch mode wasn't on)
+    """
+
+    writer = _state['writer']
+    if writer is None:
+        return 0
+
+    _state['mode'] = 'console'
+    _state['level'] = LEVELS['info']
+    _state['writer'] = None
+
+    writer['stop'] = True
+    writer['wake'].set()
+    writer['thread'].join()
+    _write_queued(writer)   # Anything queued while the thread was stopping
+    if writer['owned']:
+        writer['stream'].close()
+    return writer['written']
+
+def benchmark_error_reporting(errors=20000, log_path="structured_log_bench.jsonl"):
+    """
+    Cost of creating routines that fail (every call reports an error) when
+    messages go to a terminal and when they go to the batch log
+    The terminal is a pseudo-terminal drained by cat (Unix only)
+    Returns microseconds per failed routine for each mode
+    """
+
+    import os
+    import pty
+    import subprocess
+    from planner import create_routine, make_generation_context
+
+    # No diet -> the meal plan raises and create_routine reports the error
+    broken = {'name': 'Bench', 'age': 30, 'goal': 'endurance', 'time': 30,
+              'equipment': ['none'], 'fitness_level': 'beginner'}
+    context = make_generation_context()
+    results = {}
+
+    def timed():
+        start = time.perf_counter()
+        for _ in range(errors):
+            create_routine(broken, context)
+        return (time.perf_counter() - start) / errors * 1e6
+
+    # Same failing calls with reporting switched off, for reference
+    _state['level'] = LEVELS['error'] + 1
+    results['no_reporting_us'] = timed()
+    _state['level'] = LEVELS['info']
+
+    master, slave = pty.openpty()
+    drain = subprocess.Popen(['cat'], stdin=master, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    stdout = sys.stdout
+    try:
+        with os.fdopen(slave, 'w', encoding='utf-8', buffering=1) as terminal:
+            sys.stdout = terminal
+            results['terminal_us'] = timed()
+    finally:
+        sys.stdout = stdout
+        drain.kill()
+        drain.wait()
+        os.close(master)
+
+    start_batch_logging(log_path)
+    try:
+        results['batch_us'] = timed()
+    finally:
+        started = time.perf_counter()
+        results['batch_lines'] = stop_batch_logging()
+        results['batch_drain_ms'] = (time.perf_counter() - started) * 1000
+    os.remove(log_path)
+
+    return results
+
+if __name__ == "__main__":
+    # Usage: python structured_log.py [errors]
+    # planner imports this file as structured_log, not __main__ - use that
+    # copy so the benchmark switches the mode the planner actually sees
+    from structured_log import benchmark_error_reporting as run_benchmark
+
+    errors = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"🪵 Reporting {errors:,} routine errors per mode...")
+    for name, value in run_benchmark(errors).items():
+        print(f"   {name}: {value:,.2f}" if isinstance(value, float) else f"   {name}: {value:,}")
@@ -0,0 +1,235 @@
+# template_store.py - Sharded routine template files with atomic writes
+# templates/<shard>/<goal>_<level>_<time>min.json, where shard is a short
+# hash of goal and level. Files are written to a temp file and renamed into
+# place, so readers never see half-written JSON and need no locks
+
+import hashlib
+import json
+import os
+import sys
+import time
+
+TEMPLATES_DIR = "templates"
+
+# 2 hex characters -> at most 256 shard folders
+SHARD_CHARS = 2
+
+# os.replace can briefly fail on Windows while a reader has the file open
+REPLACE_ATTEMPTS = 5
+
+# mkstemp makes 0600 files; new files get the usual 0666 minus the umask
+# instead (read once here - os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+NEW_FILE_MODE = 0o666 & ~_UMASK
+
+def shard_name(goal, fitness_level):
+    """
+    Shard folder for a goal/level pair - every time variant of the same
+    profile lands in the same small folder, so lookups list one folder only
+    """
+
+    key = f"{goal}_{fitness_level}".encode('utf-8')
+    return hashlib.blake2b(key, digest_size=4).hexdigest()[:SHARD_CHARS]
+
+def template_filename(goal, fitness_level, time):
+    """Same file name save_routine_template always used"""
+    return f"{goal}_{fitness_level}_{time}min.json"
+
+def template_path(goal, fitness_level, time, templates_dir=TEMPLATES_DIR):
+    """Full path of a template inside its shard"""
+    return os.path.join(templates_dir, shard_name(goal, fitness_level), template_filename(goal, fitness_level, time))
+
+def atomic_write_text(path, text):
+    """
+    Write text to a temp file in the same folder, then rename it over path
+    Readers see either the old file or the new one, never a partial write
+    The file keeps the old file's permissions (NEW_FILE_MODE if it's new)
+    """
+
+    import tempfile  # Pulls in shutil/random - only writers need it
+
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+
+    # Leading dot keeps temp files out of *.json listings
+    handle, temp_path = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.chmod(temp_path, mode)
+
+        for attempt in range(REPLACE_ATTEMPTS):
+            try:
+                os.replace(temp_path, path)
+                break
+            except PermissionError:
+                if attempt == REPLACE_ATTEMPTS - 1:
+                    raise
+                time.sleep(0.01 * (attempt + 1))
+
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def atomic_write_json(path, data):
+    """atomic_write_text for a JSON document"""
+    atomic_write_text(path, json.dumps(data, indent=2, ensure_ascii=False))
+
+def write_template(template_data, templates_dir=TEMPLATES_DIR):
+    """
+    Save template data (as built by save_routine_template) into its shard
+    Returns the template path
+    """
+
+    profile = template_data['user_profile']
+    path = template_path(profile['goal'], profile['fitness_level'], profile['time'], templates_dir)
+    atomic_write_json(path, template_data)
+    return path
+
+def read_template(path):
+    """Read one template file; None if it is missing"""
+
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+def find_template(goal, fitness_level, templates_dir=TEMPLATES_DIR):
+    """
+    First template (by file name) saved for this goal and level
+    Looks in the profile's shard, then in old unsharded files
+    """
+
+    prefix = f"{goal}_{fitness_level}_"
+
+    for folder in (os.path.join(templates_dir, shard_name(goal, fitness_level)), templates_dir):
+        if not os.path.isdir(folder):
+            continue
+
+        with os.scandir(folder) as entries:
+            names = sorted(entry.name for entry in entries
+                           if entry.name.startswith(prefix) and entry.name.endswith('.json') and entry.is_file())
+
+        for name in names:
+            template_data = read_template(os.path.join(folder, name))
+            if template_data is None:
+                continue  # Removed since we listed the folder
+            profile = template_data.get('user_profile', {})
+            if profile.get('goal') == goal and profile.get('fitness_level') == fitness_level:
+                return template_data
+
+    return None
+
+def iter_template_paths(templates_dir=TEMPLATES_DIR):
+    """Yield every template path, sharded or not"""
+
+    if not os.path.isdir(templates_dir):
+        return
+
+    with os.scandir(templates_dir) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                with os.scandir(entry.path) as shard_entries:
+                    for shard_entry in shard_entries:
+                        if shard_entry.name.endswith('.json') and shard_entry.is_file():
+                            yield shard_entry.path
+            elif entry.name.endswith('.json') and entry.is_file():
+                yield entry.path
+
+def _stress_writer(templates_dir, worker, iterations, profiles):
+    """Stress test process: keep rewriting the same few templates"""
+
+    for i in range(iterations):
+        goal, level, minutes = profiles[(worker + i) % len(profiles)]
+        routine = {'workout': [f"writer {worker} pass {i}"] * (10 + i % 50)}
+        write_template({
+            'routine': routine,
+            'user_profile': {'goal': goal, 'fitness_level': level, 'time': minutes, 'equipment': ['none']},
+            'created_date': '2025-01-01 00:00:00',
+            'template_version': '1.0'
+        }, templates_dir)
+
+def _stress_reader(templates_dir, iterations, profiles, results):
+    """Stress test process: read templates while writers replace them"""
+
+    reads = torn = 0
+    for i in range(iterations):
+        goal, level, minutes = profiles[i % len(profiles)]
+        try:
+            template_data = read_template(template_path(goal, level, minutes, templates_dir))
+            if template_data is not None:
+                reads += 1
+        except (ValueError, UnicodeDecodeError):
+            torn += 1
+        if i % 50 == 0:
+            find_template(goal, level, templates_dir)
+    results.put((reads, torn))
+
+def stress_test(writers=8, readers=8, iterations=500, templates_dir="templates_stress"):
+    """
+    Run writer and reader processes against the same templates at once
+    Returns counts - torn_reads must be 0
+    """
+
+    import multiprocessing
+    import shutil
+
+    profiles = [(goal, level, minutes)
+                for goal in ('weight_loss', 'endurance')
+                for level in ('beginner', 'advanced')
+                for minutes in (15, 30)]
+
+    if os.path.exists(templates_dir):
+        shutil.rmtree(templates_dir)
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_stress_writer, args=(templates_dir, worker, iterations, profiles))
+                 for worker in range(writers)]
+    processes += [multiprocessing.Process(target=_stress_reader, args=(templates_dir, iterations * 4, profiles, results))
+                  for _ in range(readers)]
+
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    counts = [results.get() for _ in range(readers)]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    leftovers = sum(1 for root, folders, files in os.walk(templates_dir) for name in files if name.endswith('.tmp'))
+    shutil.rmtree(templates_dir)
+
+    return {
+        'writes': writers * iterations,
+        'reads': sum(reads for reads, torn in counts),
+        'torn_reads': sum(torn for reads, torn in counts),
+        'leftover_temp_files': leftovers,
+        'failed_processes': sum(1 for process in processes if process.exitcode != 0),
+        'seconds': elapsed
+    }
+
+if __name__ == "__main__":
+    # Usage: python template_store.py [writers] [readers] [iterations]
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+
+    print(f"🔀 Stress testing templates with {writers} writers and {readers} readers...")
+    results = stress_test(writers, readers, iterations)
+    for name, value in results.items():
+        print(f"   {name}: {value:,.2f}" if isinstance(value, float) else f"   {name}: {value:,}")
+
+    if results['torn_reads'] or results['leftover_temp_files'] or results['failed_processes']:
+        print("❌ Stress test failed")
+        sys.exit(1)
+    print("✅ No torn reads")
@@ -5,74 +5,133 @@ import re
 import sys
 from utils import print_with_delay, get_random_encouragement
 
-def get_user_info():
+# Validation rules shared by the interactive prompts and the bulk importer
+NAME_PATTERN = re.compile(r"^[a-zA-Z\s]+$")
+NAME_MIN_LENGTH = 2
+NAME_MAX_LENGTH = 30
+MIN_AGE = 10
+MAX_AGE = 100
+MIN_TIME = 5
+MAX_TIME = 180
+QUIT_WORDS = {'quit', 'exit', 'q'}
+
+GOAL_OPTIONS = {
+    '1': {'name': 'weight_loss', 'display': 'Weight Loss', 'desc': 'Lose weight and get fit'},
+    '2': {'name': 'weight_gain', 'display': 'Weight Gain', 'desc': 'Gain healthy weight and muscle'},
+    '3': {'name': 'muscle_building', 'display': 'Muscle Building', 'desc': 'Build strength and muscle mass'},
+    '4': {'name': 'general_fitness', 'display': 'General Fitness', 'desc': 'Stay healthy and active'},
+    '5': {'name': 'endurance', 'display': 'Endurance', 'desc': 'Improve stamina and cardio health'},
+    '6': {'name': 'flexibility', 'display': 'Flexibility', 'desc': 'Increase flexibility and mobility'}
+}
+
+EQUIPMENT_OPTIONS = {
+    '1': 'dumbbells',
+    '2': 'resistance_bands',
+    '3': 'pull_up_bar',
+    '4': 'yoga_mat',
+    '5': 'jump_rope',
+    '6': 'kettlebell',
+    '7': 'treadmill',
+    '8': 'bicycle',
+    '9': 'none'  # No equipment - bodyweight only
+}
+
+DIET_OPTIONS = {
+    '1': {'name': 'vegetarian', 'display': 'Vegetarian', 'desc': 'No meat, but dairy is okay'},
+    '2': {'name': 'vegan', 'display': 'Vegan', 'desc': 'No animal products at all'},
+    '3': {'name': 'non_vegetarian', 'display': 'Non-Vegetarian', 'desc': 'Everything including meat'},
+    '4': {'name': 'jain', 'display': 'Jain Food', 'desc': 'No root vegetables, strict vegetarian'},
+    '5': {'name': 'keto', 'display': 'Keto Diet', 'desc': 'Low carb, high fat diet'},
+    '6': {'name': 'no_preference', 'display': 'No Specific Preference', 'desc': 'I eat everything'}
+}
+
+FITNESS_LEVEL_OPTIONS = {
+    '1': {'name': 'beginner', 'display': 'Beginner', 'desc': 'Just starting out or returning after long break'},
+    '2': {'name': 'intermediate', 'display': 'Intermediate', 'desc': 'Exercise regularly, comfortable with basic moves'},
+    '3': {'name': 'advanced', 'display': 'Advanced', 'desc': 'Very active, can handle intense workouts'}
+}
+
+# Fast set lookups of the valid stored values
+VALID_GOALS = {goal['name'] for goal in GOAL_OPTIONS.values()}
+VALID_EQUIPMENT = set(EQUIPMENT_OPTIONS.values())
+VALID_DIETS = {diet['name'] for diet in DIET_OPTIONS.values()}
+VALID_FITNESS_LEVELS = {level['name'] for level in FITNESS_LEVEL_OPTIONS.values()}
+
+def get_user_info(ask=input, say=print):
     """
     Main function to collect all user information
     Returns a dictionary with user data or None if user wants to quit
+
+    ask and say default to input() and print(); pass scripted_input()
+    and null_output (or stream_output) to drive a session without a terminal
     """
 
-    print("\n🎯 Let's get to know you better!")
-    print("💡 Type 'quit' anytime to exit")
-    print("-" * 40)
+    say("\n🎯 Let's get to know you better!")
+    say("💡 Type 'quit' anytime to exit")
+    say("-" * 40)
 
-    try:
-        # Initialize user data dictionary
-        user_data = {}
+    # Loop instead of calling ourselves again, so restarts never grow the stack
+    while True:
+        try:
+            # Initialize user data dictionary
+            user_data = {}
 
-        # Get user's name
-        user_data['name'] = get_user_name()
-        if user_data['name'] is None:
-            return None
+            # Get user's name
+            user_data['name'] = get_user_name(ask, say)
+            if user_data['name'] is None:
+                return None
 
-        # Get user's age
-        user_data['age'] = get_user_age()
-        if user_data['age'] is None:
-            return None
+            # Get user's age
+            user_data['age'] = get_user_age(ask, say)
+            if user_data['age'] is None:
+                return None
 
-        # Get user's fitness goal
-        user_data['goal'] = get_user_goal()
-        if user_data['goal'] is None:
-            return None
+            # Get user's fitness goal
+            user_data['goal'] = get_user_goal(ask, say)
+            if user_data['goal'] is None:
+                return None
 
-        # Get available daily time
-        user_data['time'] = get_available_time()
-        if user_data['time'] is None:
-            return None
+            # Get available daily time
+            user_data['time'] = get_available_time(ask, say)
+            if user_data['time'] is None:
+                return None
 
-        # Get available equipment
-        user_data['equipment'] = get_available_equipment()
-        if user_data['equipment'] is None:
-            return None
+            # Get available equipment
+            user_data['equipment'] = get_available_equipment(ask, say)
+            if user_data['equipment'] is None:
+                return None
 
-        # Get dietary preferences
-        user_data['diet'] = get_dietary_preferences()
-        if user_data['diet'] is None:
-            return None
+            # Get dietary preferences
+            user_data['diet'] = get_dietary_preferences(ask, say)
+            if user_data['diet'] is None:
+                return None
 
-        # Get current fitness level
-        user_data['fitness_level'] = get_fitness_level()
-        if user_data['fitness_level'] is None:
-            return None
+            # Get current fitness level
+            user_data['fitness_level'] = get_fitness_level(ask, say)
+            if user_data['fitness_level'] is None:
+                return None
 
-        # Show summary and confirm
-        if not confirm_user_data(user_data):
-            print("\n🔄 No problem! Let's start fresh.")
-            return get_user_info()  # Restart the process
+            # Show summary and confirm
+            if not confirm_user_data(user_data, ask, say):
+                say("\n🔄 No problem! Let's start fresh.")
+                continue  # Restart the process
 
-        # Add some encouraging message
-        print(f"\n🎉 Great {user_data['name']}! " + get_random_encouragement())
+            # Add some encouraging message
+            say(f"\n🎉 Great {user_data['name']}! " + get_random_encouragement())
 
-        return user_data
+            return user_data
 
-    except KeyboardInterrupt:
-        print("\n\n👋 Thanks for trying HealthMate! Come back anytime.")
-        return None
-    except Exception as e:
-        print(f"\n❌ Something went wrong while collecting info: {str(e)}")
-        print("🔄 Let's try again from the beginning...")
-        return get_user_info()
+        except KeyboardInterrupt:
+            say("\n\n👋 Thanks for trying HealthMate! Come back anytime.")
+            return None
+        except EOFError:
+            # No more input available - let the caller decide what to do
+            raise
+        except Exception as e:
+            say(f"\n❌ Something went wrong while collecting info: {str(e)}")
+            say("🔄 Let's try again from the beginning...")
 
-def get_user_name():
+def get_user_name(ask=input, say=print):
     """
     Get user's name with proper validation
     Ensures name contains only letters and spaces
@@ -80,43 +139,46 @@ def get_user_name():
 
     while True:
         try:
-            print("\n👤 What should I call you?")
-            name = input("📝 Your name: ").strip()
+            say("\n👤 What should I call you?")
+            name = ask("📝 Your name: ").strip()
 
             # Check if user wants to quit
-            if name.lower() in ['quit', 'exit', 'q']:
+            if name.lower() in QUIT_WORDS:
                 return None
 
             # Check if name is empty
             if not name:
-                print("❌ Please enter your name!")
+                say("❌ Please enter your name!")
                 continue
 
             # Check if name is too short
-            if len(name) < 2:
-                print("❌ Name should be at least 2 characters long!")
+            if len(name) < NAME_MIN_LENGTH:
+                say("❌ Name should be at least 2 characters long!")
                 continue
 
             # Check if name is too long
-            if len(name) > 30:
-                print("❌ Name is too long! Please keep it under 30 characters.")
+            if len(name) > NAME_MAX_LENGTH:
+                say("❌ Name is too long! Please keep it under 30 characters.")
                 continue
 
             # Check if name contains only valid characters
-            if not re.match("^[a-zA-Z\s]+$", name):
-                print("❌ Name should contain only letters and spaces!")
+            if not NAME_PATTERN.match(name):
+                say("❌ Name should contain only letters and spaces!")
                 continue
 
             # Clean up the name (proper case)
             name = ' '.join(word.capitalize() for word in name.split())
 
-            print(f"✅ Nice to meet you, {name}!")
+            say(f"✅ Nice to meet you, {name}!")
             return name
 
+        except EOFError:
+            # Input stream closed - let the caller end the session
+            raise
         except Exception as e:
-            print("❌ Invalid input. Please try again!")
+            say("❌ Invalid input. Please try again!")
 
-def get_user_age():
+def get_user_age(ask=input, say=print):
     """
     Get user's age with proper validation
     Age should be between 10 and 100
@@ -124,80 +186,77 @@ def get_user_age():
 
     while True:
         try:
-            print(f"\n🎂 How old are you?")
-            age_input = input("📝 Your age: ").strip()
+            say(f"\n🎂 How old are you?")
+            age_input = ask("📝 Your age: ").strip()
 
             # Check if user wants to quit
-            if age_input.lower() in ['quit', 'exit', 'q']:
+            if age_input.lower() in QUIT_WORDS:
                 return None
 
             # Check if input is empty
             if not age_input:
-                print("❌ Please enter your age!")
+                say("❌ Please enter your age!")
                 continue
 
             # Convert to integer
             age = int(age_input)
 
             # Validate age range
-            if age < 10:
-                print("❌ You're too young for this app! Ask your parents for help.")
+            if age < MIN_AGE:
+                say("❌ You're too young for this app! Ask your parents for help.")
                 continue
-            elif age > 100:
-                print("❌ Age seems too high! Please enter a valid age.")
+            elif age > MAX_AGE:
+                say("❌ Age seems too high! Please enter a valid age.")
                 continue
             elif age < 18:
-                print("⚠️  You're under 18. We'll create a safe routine for you!")
+                say("⚠️  You're under 18. We'll create a safe routine for you!")
 
-            print(f"✅ Got it! You're {age} years old.")
+            say(f"✅ Got it! You're {age} years old.")
             return age
 
         except ValueError:
-            print("❌ Please enter a valid number for age!")
+            say("❌ Please enter a valid number for age!")
+        except EOFError:
+            # Input stream closed - let the caller end the session
+            raise
         except Exception as e:
-            print("❌ Invalid input. Please try again!")
+            say("❌ Invalid input. Please try again!")
 
-def get_user_goal():
+def get_user_goal(ask=input, say=print):
     """
     Get user's fitness goal from predefined options
     Provides multiple choices with clear descriptions
     """
 
-    goals = {
-        '1': {'name': 'weight_loss', 'display': 'Weight Loss', 'desc': 'Lose weight and get fit'},
-        '2': {'name': 'weight_gain', 'display': 'Weight Gain', 'desc': 'Gain healthy weight and muscle'},
-        '3': {'name': 'muscle_building', 'display': 'Muscle Building', 'desc': 'Build strength and muscle mass'},
-        '4': {'name': 'general_fitness', 'display': 'General Fitness', 'desc': 'Stay healthy and active'},
-        '5': {'name': 'endurance', 'display': 'Endurance', 'desc': 'Improve stamina and cardio health'},
-        '6': {'name': 'flexibility', 'display': 'Flexibility', 'desc': 'Increase flexibility and mobility'}
-    }
-
     while True:
         try:
-            print(f"\n🎯 What's your main fitness goal?")
-            print("Choose one option:")
+            say(f"\n🎯 What's your main fitness goal?")
+            say("Choose one option:")
 
-            for key, goal in goals.items():
-                print(f"  {key}. 💪 {goal['display']} - {goal['desc']}")
+            for key, goal in GOAL_OPTIONS.items():
+                say(f"  {key}. 💪 {goal['display']} - {goal['desc']}")
 
-            choice = input("\n📝 Enter your choice (1-6): ").strip()
+            choice = ask("\n📝 Enter your choice (1-6): ").strip()
 
             # Check if user wants to quit
-            if choice.lower() in ['quit', 'exit', 'q']:
+            if choice.lower() in QUIT_WORDS:
                 return None
 
             # Validate choice
-            if choice in goals:
-                selected_goal = goals[choice]
-                print(f"✅ Great choice! Goal: {selected_goal['display']}")
+            if choice in GOAL_OPTIONS:
+                selected_goal = GOAL_OPTIONS[choice]
+                say(f"✅ Great choice! Goal: {selected_goal['display']}")
                 return selected_goal['name']
             else:
-                print("❌ Please choose a number between 1 and 6!")
+                say("❌ Please choose a number between 1 and 6!")
 
+        except EOFError:
+            # Input stream closed - let the caller end the session
+            raise
         except Exception as e:
-            print("❌ Invalid input. Please try again!")
+            say("❌ Invalid input. Please try again!")
 
-def get_available_time():
+def get_available_time(ask=input, say=print):
     """
     Get user's available daily time for fitness
     Validates time is reasonable (5-180 minutes)
@@ -205,83 +264,74 @@ def get_available_time():
 
     while True:
         try:
-            print(f"\n⏰ How much time can you spend daily on fitness?")
-            print("💡 Include workout + meal prep time")
-            time_input = input("📝 Time in minutes (e.g., 30): ").strip()
+            say(f"\n⏰ How much time can you spend daily on fitness?")
+            say("💡 Include workout + meal prep time")
+            time_input = ask("📝 Time in minutes (e.g., 30): ").strip()
 
             # Check if user wants to quit
-            if time_input.lower() in ['quit', 'exit', 'q']:
+            if time_input.lower() in QUIT_WORDS:
                 return None
 
             # Check if input is empty
             if not time_input:
-                print("❌ Please enter the time!")
+                say("❌ Please enter the time!")
                 continue
 
             # Convert to integer
             time_minutes = int(time_input)
 
             # Validate time range
-            if time_minutes < 5:
-                print("❌ Too little time! At least 5 minutes needed.")
+            if time_minutes < MIN_TIME:
+                say("❌ Too little time! At least 5 minutes needed.")
                 continue
-            elif time_minutes > 180:
-                print("❌ That's too much time! Maximum 180 minutes (3 hours).")
+            elif time_minutes > MAX_TIME:
+                say("❌ That's too much time! Maximum 180 minutes (3 hours).")
                 continue
 
             # Give feedback based on time
             if time_minutes < 15:
-                print("⚠️  Short time! We'll focus on quick exercises.")
+                say("⚠️  Short time! We'll focus on quick exercises.")
             elif time_minutes > 60:
-                print("🔥 Great! You have good time for a complete routine.")
+                say("🔥 Great! You have good time for a complete routine.")
 
-            print(f"✅ Perfect! {time_minutes} minutes daily it is.")
+            say(f"✅ Perfect! {time_minutes} minutes daily it is.")
             return time_minutes
 
         except ValueError:
-            print("❌ Please enter a valid number for time!")
+            say("❌ Please enter a valid number for time!")
+        except EOFError:
+            # Input stream closed - let the caller end the session
+            raise
         except Exception as e:
-            print("❌ Invalid input. Please try again!")
+            say("❌ Invalid input. Please try again!")
 
-def get_available_equipment():
+def get_available_equipment(ask=input, say=print):
     """
     Get user's available equipment from multiple choices
     Users can select multiple equipment items
     """
 
-    equipment_options = {
-        '1': 'dumbbells',
-        '2': 'resistance_bands',
-        '3': 'pull_up_bar',
-        '4': 'yoga_mat',
-        '5': 'jump_rope',
-        '6': 'kettlebell',
-        '7': 'treadmill',
-        '8': 'bicycle',
-        '9': 'none'  # No equipment - bodyweight only
-    }
-
     while True:
         try:
-            print(f"\n🏋️ What equipment do you have access to?")
-            print("💡 You can select multiple options (separate by commas)")
-            print("Available equipment:")
+            say(f"\n🏋️ What equipment do you have access to?")
+            say("💡 You can select multiple options (separate by commas)")
+            say("Available equipment:")
 
-            for key, equipment in equipment_options.items():
+            for key, equipment in EQUIPMENT_OPTIONS.items():
                 display_name = equipment.replace('_', ' ').title()
                 if equipment == 'none':
                     display_name = "No Equipment (Bodyweight Only)"
-                print(f"  {key}. {display_name}")
+                say(f"  {key}. {display_name}")
 
-            choices = input("\n📝 Enter your choices (e.g., 1,4,5): ").strip()
+            choices = ask("\n📝 Enter your choices (e.g., 1,4,5): ").strip()
 
             # Check if user wants to quit
-            if choices.lower() in ['quit', 'exit', 'q']:
+            if choices.lower() in QUIT_WORDS:
                 return None
 
             # Check if input is empty
             if not choices:
-                print("❌ Please select at least one option!")
+                say("❌ Please select at least one option!")
                 continue
 
             # Parse multiple choices
@@ -291,12 +341,12 @@ def get_available_equipment():
             # Validate each choice
             valid_choices = True
             for choice in choice_list:
-                if choice in equipment_options:
-                    equipment_name = equipment_options[choice]
+                if choice in EQUIPMENT_OPTIONS:
+                    equipment_name = EQUIPMENT_OPTIONS[choice]
                     if equipment_name not in selected_equipment:
                         selected_equipment.append(equipment_name)
                 else:
-                    print(f"❌ Invalid choice: {choice}")
+                    say(f"❌ Invalid choice: {choice}")
                     valid_choices = False
                     break
 
@@ -305,143 +355,273 @@ def get_available_equipment():
 
             # Check if 'none' is selected with other equipment
             if 'none' in selected_equipment and len(selected_equipment) > 1:
-                print("❌ If you select 'No Equipment', don't select other items!")
+                say("❌ If you select 'No Equipment', don't select other items!")
                 continue
 
             # Display selected equipment
             if 'none' in selected_equipment:
-                print("✅ Bodyweight exercises it is! No equipment needed.")
+                say("✅ Bodyweight exercises it is! No equipment needed.")
             else:
                 equipment_display = [eq.replace('_', ' ').title() for eq in selected_equipment]
-                print(f"✅ Great! Equipment: {', '.join(equipment_display)}")
+                say(f"✅ Great! Equipment: {', '.join(equipment_display)}")
 
             return selected_equipment
 
+        except EOFError:
+            # Input stream closed - let the caller end the session
+            raise
         except Exception as e:
-            print("❌ Invalid input. Please try again!")
+            say("❌ Invalid input. Please try again!")
 
-def get_dietary_preferences():
+def get_dietary_preferences(ask=input, say=print):
     """
     Get user's dietary preferences and restrictions
     Helps in meal planning
     """
 
-    diet_options = {
-        '1': {'name': 'vegetarian', 'display': 'Vegetarian', 'desc': 'No meat, but dairy is okay'},
-        '2': {'name': 'vegan', 'display': 'Vegan', 'desc': 'No animal products at all'},
-        '3': {'name': 'non_vegetarian', 'display': 'Non-Vegetarian', 'desc': 'Everything including meat'},
-        '4': {'name': 'jain', 'display': 'Jain Food', 'desc': 'No root vegetables, strict vegetarian'},
-        '5': {'name': 'keto', 'display': 'Keto Diet', 'desc': 'Low carb, high fat diet'},
-        '6': {'name': 'no_preference', 'display': 'No Specific Preference', 'desc': 'I eat everything'}
-    }
-
     while True:
         try:
-            print(f"\n🥗 What are your dietary preferences?")
-            print("Choose your eating style:")
+            say(f"\n🥗 What are your dietary preferences?")
+            say("Choose your eating style:")
 
-            for key, diet in diet_options.items():
-                print(f"  {key}. {diet['display']} - {diet['desc']}")
+            for key, diet in DIET_OPTIONS.items():
+                say(f"  {key}. {diet['display']} - {diet['desc']}")
 
-            choice = input("\n📝 Enter your choice (1-6): ").strip()
+            choice = ask("\n📝 Enter your choice (1-6): ").strip()
 
             # Check if user wants to quit
-            if choice.lower() in ['quit', 'exit', 'q']:
+            if choice.lower() in QUIT_WORDS:
                 return None
 
             # Validate choice
-            if choice in diet_options:
-                selected_diet = diet_options[choice]
-                print(f"✅ Got it! Diet preference: {selected_diet['display']}")
+            if choice in DIET_OPTIONS:
+                selected_diet = DIET_OPTIONS[choice]
+                say(f"✅ Got it! Diet preference: {selected_diet['display']}")
                 return selected_diet['name']
             else:
-                print("❌ Please choose a number between 1 and 6!")
+                say("❌ Please choose a number between 1 and 6!")
 
+        except EOFError:
+            # Input stream closed - let the caller end the session
+            raise
         except Exception as e:
-            print("❌ Invalid input. Please try again!")
+            say("❌ Invalid input. Please try again!")
 
-def get_fitness_level():
+def get_fitness_level(ask=input, say=print):
     """
     Get user's current fitness level
     Helps in creating appropriate difficulty routines
     """
 
-    fitness_levels = {
-        '1': {'name': 'beginner', 'display': 'Beginner', 'desc': 'Just starting out or returning after long break'},
-        '2': {'name': 'intermediate', 'display': 'Intermediate', 'desc': 'Exercise regularly, comfortable with basic moves'},
-        '3': {'name': 'advanced', 'display': 'Advanced', 'desc': 'Very active, can handle intense workouts'}
-    }
-
     while True:
         try:
-            print(f"\n💪 What's your current fitness level?")
-            print("Be honest - this helps create the right routine for you:")
+            say(f"\n💪 What's your current fitness level?")
+            say("Be honest - this helps create the right routine for you:")
 
-            for key, level in fitness_levels.items():
-                print(f"  {key}. {level['display']} - {level['desc']}")
+            for key, level in FITNESS_LEVEL_OPTIONS.items():
+                say(f"  {key}. {level['display']} - {level['desc']}")
 
-            choice = input("\n📝 Enter your choice (1-3): ").strip()
+            choice = ask("\n📝 Enter your choice (1-3): ").strip()
 
             # Check if user wants to quit
-            if choice.lower() in ['quit', 'exit', 'q']:
+            if choice.lower() in QUIT_WORDS:
                 return None
 
             # Validate choice
-            if choice in fitness_levels:
-                selected_level = fitness_levels[choice]
-                print(f"✅ Perfect! Fitness level: {selected_level['display']}")
+            if choice in FITNESS_LEVEL_OPTIONS:
+                selected_level = FITNESS_LEVEL_OPTIONS[choice]
+                say(f"✅ Perfect! Fitness level: {selected_level['display']}")
                 return selected_level['name']
             else:
-                print("❌ Please choose a number between 1 and 3!")
+                say("❌ Please choose a number between 1 and 3!")
 
+        except EOFError:
+            # Input stream closed - let the caller end the session
+            raise
         except Exception as e:
-            print("❌ Invalid input. Please try again!")
+            say("❌ Invalid input. Please try again!")
 
-def confirm_user_data(user_data):
+def confirm_user_data(user_data, ask=input, say=print):
     """
     Show user their entered data and ask for confirmation
     Allows user to review and modify if needed
     """
 
     try:
-        print("\n" + "="*50)
-        print("📋 PLEASE REVIEW YOUR INFORMATION")
-        print("="*50)
+        say("\n" + "="*50)
+        say("📋 PLEASE REVIEW YOUR INFORMATION")
+        say("="*50)
 
         # Display all user data in a nice format
-        print(f"👤 Name: {user_data['name']}")
-        print(f"🎂 Age: {user_data['age']} years")
-        print(f"🎯 Goal: {user_data['goal'].replace('_', ' ').title()}")
-        print(f"⏰ Daily Time: {user_data['time']} minutes")
+        say(f"👤 Name: {user_data['name']}")
+        say(f"🎂 Age: {user_data['age']} years")
+        say(f"🎯 Goal: {user_data['goal'].replace('_', ' ').title()}")
+        say(f"⏰ Daily Time: {user_data['time']} minutes")
 
         # Format equipment display
         if 'none' in user_data['equipment']:
             equipment_display = "No Equipment (Bodyweight Only)"
         else:
             equipment_display = ', '.join([eq.replace('_', ' ').title() for eq in user_data['equipment']])
-        print(f"🏋️ Equipment: {equipment_display}")
+        say(f"🏋️ Equipment: {equipment_display}")
 
-        print(f"🥗 Diet: {user_data['diet'].replace('_', ' ').title()}")
-        print(f"💪 Fitness Level: {user_data['fitness_level'].title()}")
+        say(f"🥗 Diet: {user_data['diet'].replace('_', ' ').title()}")
+        say(f"💪 Fitness Level: {user_data['fitness_level'].title()}")
 
-        print("\n" + "-"*40)
+        say("\n" + "-"*40)
 
         while True:
-            confirm = input("✅ Is this information correct? (yes/no): ").strip().lower()
+            confirm = ask("✅ Is this information correct? (yes/no): ").strip().lower()
 
             if confirm in ['yes', 'y', 'correct', 'ok', 'right']:
                 return True
             elif confirm in ['no', 'n', 'wrong', 'incorrect']:
                 return False
-            elif confirm in ['quit', 'exit', 'q']:
+            elif confirm in QUIT_WORDS:
                 return None
             else:
-                print("❌ Please answer with 'yes' or 'no'!")
+                say("❌ Please answer with 'yes' or 'no'!")
 
+    except EOFError:
+        raise
     except Exception as e:
-        print("❌ Error while confirming data. Assuming it's correct...")
+        say("❌ Error while confirming data. Assuming it's correct...")
         return True
 
+# Non-interactive validation used for bulk imports and generated profiles
+
+EQUIPMENT_SEPARATOR = re.compile(r"[,;|]")
+
+# Precomputed text -> number lookups for every valid age and time
+# (a dict lookup is much cheaper than int() + range checks per row)
+AGE_BY_TEXT = {str(age): age for age in range(MIN_AGE, MAX_AGE + 1)}
+TIME_BY_TEXT = {str(minutes): minutes for minutes in range(MIN_TIME, MAX_TIME + 1)}
+
+# Parsed equipment strings - only a few hundred distinct values exist in practice
+_equipment_cache = {}
+EQUIPMENT_CACHE_LIMIT = 4096
+
+def _check_number(value, by_text, low, high, field, unit=""):
+    """Return (number, error) for an age/time value given as int or string"""
+
+    if isinstance(value, str):
+        number = by_text.get(value.strip())
+        if number is not None:
+            return number, None
+        value = value.strip()
+        digits = value[1:] if value.startswith('-') else value
+        # isdigit alone accepts digits int() rejects (e.g. '²')
+        if not (digits.isascii() and digits.isdigit()):
+            return None, (field, 'not a number')
+        value = int(value)
+    elif not isinstance(value, int) or isinstance(value, bool):
+        return None, (field, 'not a number')
+
+    if value < low or value > high:
+        return None, (field, f'must be {low}-{high}{unit}')
+    return value, None
+
+def _parse_equipment(equipment):
+    """Return (equipment_list, error) using the get_available_equipment rules"""
+
+    if isinstance(equipment, str):
+        cached = _equipment_cache.get(equipment)
+        if cached is not None:
+            return list(cached[0]), cached[1]
+        items = [item.strip() for item in EQUIPMENT_SEPARATOR.split(equipment) if item.strip()]
+    elif isinstance(equipment, list):
+        items = equipment
+        # JSON lists can hold anything - only strings can name equipment
+        wrong = [item for item in items if not isinstance(item, str)]
+        if wrong:
+            return [], ('equipment', f'invalid choice {wrong[0]!r}')
+    else:
+        items = []
+
+    error = None
+    items = list(dict.fromkeys(items))  # Remove duplicates, keep order
+    if not items:
+        error = ('equipment', 'select at least one option')
+    else:
+        unknown = [item for item in items if item not in VALID_EQUIPMENT]
+        if unknown:
+            error = ('equipment', f'invalid choice {unknown[0]!r}')
+        elif 'none' in items and len(items) > 1:
+            error = ('equipment', "'none' cannot be combined with other items")
+
+    if isinstance(equipment, str) and len(_equipment_cache) < EQUIPMENT_CACHE_LIMIT:
+        _equipment_cache[equipment] = (tuple(items), error)
+
+    return items, error
+
+def validate_profile(record):
+    """
+    Validate one profile record with the same rules as the prompts above
+    record values may be strings (CSV) or typed values (JSON)
+    Returns (user_data, errors) - user_data is None when errors is not empty
+    """
+
+    errors = []
+
+    # Name - same length and letters-only rules as get_user_name
+    name = record.get('name')
+    name = name.strip() if isinstance(name, str) else ''
+    if not name:
+        errors.append(('name', 'missing'))
+    elif len(name) < NAME_MIN_LENGTH:
+        errors.append(('name', 'too short'))
+    elif len(name) > NAME_MAX_LENGTH:
+        errors.append(('name', 'too long'))
+    elif not NAME_PATTERN.match(name):
+        errors.append(('name', 'only letters and spaces allowed'))
+
+    # Age and time - whole numbers within range
+    age, error = _check_number(record.get('age'), AGE_BY_TEXT, MIN_AGE, MAX_AGE, 'age')
+    if error:
+        errors.append(error)
+
+    time_minutes, error = _check_number(record.get('time'), TIME_BY_TEXT, MIN_TIME, MAX_TIME, 'time', ' minutes')
+    if error:
+        errors.append(error)
+
+    # Choice fields - simple set lookups (JSON lists/dicts can't be looked up)
+    goal = record.get('goal')
+    if not isinstance(goal, str) or goal not in VALID_GOALS:
+        errors.append(('goal', f'unknown goal {goal!r}'))
+
+    diet = record.get('diet')
+    if not isinstance(diet, str) or diet not in VALID_DIETS:
+        errors.append(('diet', f'unknown diet {diet!r}'))
+
+    fitness_level = record.get('fitness_level')
+    if not isinstance(fitness_level, str) or fitness_level not in VALID_FITNESS_LEVELS:
+        errors.append(('fitness_level', f'unknown level {fitness_level!r}'))
+
+    # Equipment - list or "a,b" / "a;b" / "a|b" string
+    equipment, error = _parse_equipment(record.get('equipment'))
+    if error:
+        errors.append(error)
+
+    if errors:
+        return None, errors
+
+    user_data = {
+        # Same result as capitalizing each word, for letters-and-spaces names
+        'name': ' '.join(name.split()).title(),
+        'age': age,
+        'goal': goal,
+        'time': time_minutes,
+        'equipment': equipment,
+        'diet': diet,
+        'fitness_level': fitness_level
+    }
+
+    # Keep an existing user ID (e.g. from an HR export)
+    if record.get('user_id'):
+        user_data['user_id'] = str(record['user_id'])
+
+    return user_data, errors
+
 # Helper function to validate if input is empty after stripping
 def is_empty_input(user_input):
     """
@@ -465,4 +645,41 @@ def sanitize_input(user_input, max_length=100):
     if len(cleaned) > max_length:
         cleaned = cleaned[:max_length]
 
-    return cleaned
\ No newline at end of file
+    return cleaned
+
+
+# Input providers and output sinks for running sessions without a terminal
+
+def scripted_input(answers):
+    """
+    Turn any iterable of answers (list, file lines, generator) into an
+    input()-like function. Raises EOFError when answers run out, exactly
+    like input() does when the terminal is closed
+    """
+
+    answer_iter = iter(answers)
+
+    def ask(prompt=""):
+        try:
+            return str(next(answer_iter)).rstrip("\n")
+        except StopIteration:
+            raise EOFError("No more scripted answers")
+
+    return ask
+
+def null_output(*args, **kwargs):
+    """
+    Output sink that throws everything away (fastest for load tests)
+    """
+    return None
+
+def stream_output(stream):
+    """
+    Create a print()-like function that writes to the given stream
+    (a file, io.StringIO, sys.stderr, ...)
+    """
+
+    def say(*args, sep=" ", end="\n", **kwargs):
+        stream.write(sep.join(str(arg) for arg in args) + end)
+
+    return say
@@ -2,7 +2,6 @@
 # This file contains helper functions for colors, welcome screen, clearing screen, etc.
 
 import os
-import platform
 import time
 
 # Simple function to clear the screen based on operating system
@@ -12,7 +11,8 @@ def clear_screen():
     Works on Windows, Mac, Linux, and even Replit.
     """
     try:
-        if platform.system() == "Windows":
+        # os.name is 'nt' on Windows - no need to import platform for this
+        if os.name == 'nt':
             os.system('cls')
         else:
             os.system('clear')